@@ -0,0 +1,240 @@
+# agent/call_graph.py
+import json
+import os
+import tempfile
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+from tree_sitter import Node
+from agent.import_table import ImportTable, ModuleIndex
+from agent.schemas import CallInfo
+from agent.symbol_index import qualified_name
+
+CALL_GRAPH_VERSION = 1
+
+TOP_LEVEL_CALLER = "<top-level>"
+
+
+class ScopeStack:
+    """
+    Enclosing class and function definitions of the node visited by a cursor walk.
+
+    The walk visits nodes in document order, so leaving every definition that
+    ends before the current node keeps the innermost enclosing one on top.
+    """
+
+    def __init__(self):
+        # (end byte, dotted names from the outermost definition, "class" or "function")
+        self.scopes: List[tuple[int, tuple[str, ...], str]] = []
+
+    def leave_before(self, start_byte: int):
+        while self.scopes and start_byte >= self.scopes[-1][0]:
+            self.scopes.pop()
+
+    def enter(self, end_byte: int, name: str, kind: str):
+        names = self.names() + (name,)
+        self.scopes.append((end_byte, names, kind))
+
+    def names(self) -> tuple[str, ...]:
+        """
+        Names of the innermost enclosing definition, () at module level.
+        """
+        return self.scopes[-1][1] if self.scopes else ()
+
+    def caller(self) -> str:
+        """
+        Dotted name of the innermost enclosing definition, "<top-level>" at module level.
+        """
+        return ".".join(self.names()) or TOP_LEVEL_CALLER
+
+    def innermost_class(self) -> Optional[tuple[str, ...]]:
+        for _, names, kind in reversed(self.scopes):
+            if kind == "class":
+                return names
+        return None
+
+
+def top_level_definitions(root_node: Node, source_code: bytes) -> Set[str]:
+    """
+    Names of the top-level classes and functions of a Python file, so calls made
+    before the definition in the file resolve as well.
+    """
+    definitions = set()
+    for child in root_node.children:
+        if child.type == "decorated_definition":
+            child = child.child_by_field_name("definition")
+        if child is not None and child.type in [
+            "class_definition",
+            "function_definition",
+        ]:
+            name_node = child.child_by_field_name("name")
+            definitions.add(
+                source_code[name_node.start_byte : name_node.end_byte].decode("utf-8")
+            )
+    return definitions
+
+
+def resolve_call_name(
+    call_name: str,
+    scopes: ScopeStack,
+    local_definitions: Set[str],
+    import_table: ImportTable,
+) -> Optional[tuple[str, bool]]:
+    """
+    Resolve the text of a called expression within its file.
+
+    Args:
+        call_name (str): e.g. "self.run", "helper" or "np.zeros".
+        scopes (ScopeStack): Definitions enclosing the call.
+        local_definitions (Set[str]): Names of the top-level definitions of the file.
+        import_table (ImportTable): Import table of the file.
+
+    Returns:
+        Optional[tuple[str, bool]]: The dotted name and False for a definition of the
+            file, the import target and True for an imported name, None for anything
+            else (builtins, locals).
+    """
+    head, _, rest = call_name.partition(".")
+    if head in ["self", "cls"] and rest and "." not in rest:
+        class_names = scopes.innermost_class()
+        if class_names is None:
+            return None
+        return ".".join(class_names + (rest,)), False
+
+    if head in local_definitions:
+        return call_name, False
+
+    target = import_table.resolve(call_name)
+    if target is None:
+        return None
+    return target, True
+
+
+class CallGraph:
+    """
+    Repository-wide call graph between qualified names such as "pkg/mod.py::Class.method".
+
+    Both directions are kept as adjacency sets, so callers and callees of a
+    definition are answered in time proportional to their number. Module-level
+    code is the caller "pkg/mod.py::<top-level>". Callees outside the repository
+    keep their dotted import name, e.g. "os.path.join".
+    """
+
+    def __init__(self):
+        self.callees_of: Dict[str, Set[str]] = {}
+        self.callers_of: Dict[str, Set[str]] = {}
+
+    def add_call(self, caller: str, callee: str):
+        self.callees_of.setdefault(caller, set()).add(callee)
+        self.callers_of.setdefault(callee, set()).add(caller)
+
+    def callees(self, name: str) -> Set[str]:
+        """
+        Get the definitions called by a definition.
+        """
+        return self.callees_of.get(name, set())
+
+    def callers(self, name: str) -> Set[str]:
+        """
+        Get the definitions calling a definition.
+        """
+        return self.callers_of.get(name, set())
+
+    def related(self, names: Iterable[str], depth: int = 1) -> Set[str]:
+        """
+        Collect the definitions within `depth` calls of the given ones, in either direction.
+
+        Args:
+            names (Iterable[str]): Qualified names to start from.
+            depth (int): Maximum number of call edges to follow.
+
+        Returns:
+            Set[str]: The related names, the starting ones excluded.
+        """
+        start = set(names)
+        seen = set(start)
+        queue = deque((name, 0) for name in start)
+        while queue:
+            name, distance = queue.popleft()
+            if distance == depth:
+                continue
+            for neighbor in self.callees(name) | self.callers(name):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append((neighbor, distance + 1))
+        return seen - start
+
+    def remove_file(self, file_path: str):
+        """
+        Drop the calls made from a file, before the file is analyzed again.
+        """
+        prefix = f"{file_path}::"
+        for caller in [name for name in self.callees_of if name.startswith(prefix)]:
+            for callee in self.callees_of.pop(caller):
+                callers = self.callers_of[callee]
+                callers.discard(caller)
+                if not callers:
+                    del self.callers_of[callee]
+
+    def add_file_calls(
+        self,
+        file_path: str,
+        calls: Iterable[CallInfo],
+        module_index: Optional[ModuleIndex] = None,
+    ):
+        """
+        Add the calls extracted into the `FileData` of a file.
+
+        Args:
+            file_path (str): Path of the file, as used in qualified names.
+            calls (Iterable[CallInfo]): The calls of the file.
+            module_index (Optional[ModuleIndex]): Modules of the repository, to turn
+                imported names into qualified names of repository definitions.
+        """
+        for call in calls:
+            callee = call.callee
+            if call.imported:
+                if module_index is not None:
+                    callee = module_index.locate_import(file_path, callee)
+                if callee is None:
+                    continue
+            else:
+                callee = qualified_name(file_path, callee)
+            self.add_call(qualified_name(file_path, call.caller), callee)
+
+    def merge(self, other: "CallGraph"):
+        for caller, callees in other.callees_of.items():
+            for callee in callees:
+                self.add_call(caller, callee)
+
+    def save(self, path: str):
+        """
+        Write the adjacency index to a JSON file, atomically.
+        """
+        index = {
+            "version": CALL_GRAPH_VERSION,
+            "callees": {k: sorted(v) for k, v in sorted(self.callees_of.items())},
+            "callers": {k: sorted(v) for k, v in sorted(self.callers_of.items())},
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "CallGraph":
+        """
+        Load an adjacency index written by `save`.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != CALL_GRAPH_VERSION:
+            raise ValueError(f"Unsupported call graph version in {path}")
+        graph = cls()
+        graph.callees_of = {k: set(v) for k, v in index["callees"].items()}
+        graph.callers_of = {k: set(v) for k, v in index["callers"].items()}
+        return graph
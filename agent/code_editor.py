@@ -1,21 +1,46 @@
 import tree_sitter
-from tree_sitter import Language, Parser
+from typing import Iterable, Optional
+from agent.definition_index import DefinitionIndex
+from agent.parser_registry import get_parser
+from agent.text_buffer import PieceTable
 
 
 class CodeEditor:
     def __init__(self, source_code: str, language: str):
-        self.source_code = source_code
+        self.buffer = PieceTable(source_code.encode("utf-8"))
+        self._source_code: Optional[str] = source_code
         self.language = language
-        self.parser = Parser()
-        self.parser.set_language(Language(language))
-        self.tree = self.parser.parse(source_code.encode("utf-8"))
+        self.parser = get_parser(language)
+        # Named definitions, indexed on the first lookup and kept up to date by edits.
+        self.definitions = DefinitionIndex.for_language(language, self.buffer.read)
+        self.parse()
+
+    @property
+    def source_code(self) -> str:
+        # 仅在需要时从 buffer 生成完整字符串
+        if self._source_code is None:
+            self._source_code = str(self.buffer)
+        return self._source_code
 
     def parse(self):
-        self.tree = self.parser.parse(self.source_code.encode("utf-8"))
+        self.tree = self.parser.parse(self.buffer.read_chunk)
+        self.nodes_by_type: dict[str, list[tree_sitter.Node]] = {}
+        if self.definitions is not None:
+            self.definitions.clear()
+
+    def get_node_text(self, node: tree_sitter.Node) -> str:
+        """
+        Get the source code of a node, read from the buffer: before tree-sitter 0.25
+        the nodes of a tree parsed from `read_chunk` have no text.
+        """
+        return self.buffer.read(node.start_byte, node.end_byte).decode("utf-8")
 
     def find_node_by_type(self, node_type: str) -> list[tree_sitter.Node]:
+        # 同一棵树上的重复查找直接返回缓存结果
+        if node_type in self.nodes_by_type:
+            return self.nodes_by_type[node_type]
         cursor = self.tree.walk()
-        nodes = []
+        nodes = self.nodes_by_type[node_type] = []
 
         while True:
             if cursor.node.type == node_type:
@@ -26,32 +51,127 @@ class CodeEditor:
                 if not cursor.goto_parent():
                     return nodes
 
+    def find_definitions(self, node_type: str, name: str) -> list[tree_sitter.Node]:
+        """
+        Get the definitions of a node type with a name, e.g. ("class_definition", "Example").
+
+        Looked up in the definition index of the language, falling back to a walk
+        over the tree for languages without a definition query.
+        """
+        if self.definitions is not None:
+            return self.definitions.find(self.tree, node_type, name)
+        nodes = []
+        for node in self.find_node_by_type(node_type):
+            name_node = node.child_by_field_name("name")
+            if name_node and self.get_node_text(name_node) == name:
+                nodes.append(node)
+        return nodes
+
     def insert_code(self, position: int, code: str):
-        self.source_code = (
-            self.source_code[:position] + code + self.source_code[position:]
-        )
-        self.parse()
+        self.apply_edits([(position, position, code)])
 
     def delete_code(self, start_position: int, end_position: int):
-        self.source_code = (
-            self.source_code[:start_position] + self.source_code[end_position:]
-        )
-        self.parse()
+        self.apply_edits([(start_position, end_position, "")])
 
     def replace_code(self, start_position: int, end_position: int, code: str):
-        self.source_code = (
-            self.source_code[:start_position] + code + self.source_code[end_position:]
+        self.apply_edits([(start_position, end_position, code)])
+
+    def replace_lines(self, start_line: int, end_line: int, code: str):
+        """
+        Replace whole lines, as numbered in `LineInfo` (1-based, `end_line` included).
+
+        `code` replaces the lines including their final newline, so it should end
+        with one unless the lines are removed with "". With `end_line` equal to
+        `start_line - 1` the code is inserted before `start_line`, or appended after
+        the last line for `start_line` one past it, starting a new line if the
+        source code does not end with a newline.
+        """
+        if not 1 <= start_line <= end_line + 1 or end_line > self.buffer.line_count:
+            raise ValueError(f"Invalid line range ({start_line}, {end_line})")
+        if start_line > self.buffer.line_count:
+            start_byte = len(self.buffer)
+            if start_byte and self.buffer.read(start_byte - 1) != b"\n":
+                code = "\n" + code
+        else:
+            start_byte = self.buffer.line_to_byte(start_line - 1)
+        if end_line < self.buffer.line_count:
+            end_byte = self.buffer.line_to_byte(end_line)
+        else:
+            end_byte = len(self.buffer)
+        self.apply_byte_edits([(start_byte, end_byte, code)])
+
+    def apply_edits(self, edits: Iterable[tuple[int, int, str]]):
+        """
+        Apply non-overlapping edits, then reparse once reusing the unchanged parts of the tree.
+
+        Args:
+            edits (Iterable[tuple[int, int, str]]): (start position, end position, code)
+                triples, positions are character offsets into the current source code.
+        """
+        edits = self.check_edits(edits, self.buffer.char_length)
+        self.apply_byte_edits(
+            [
+                (self.buffer.char_to_byte(start), self.buffer.char_to_byte(end), code)
+                for start, end, code in edits
+            ]
         )
-        self.parse()
+
+    def apply_byte_edits(self, edits: Iterable[tuple[int, int, str]]):
+        """
+        Like `apply_edits`, with positions as UTF-8 byte offsets, the unit of tree-sitter nodes.
+        """
+        edits = self.check_edits(edits, len(self.buffer))
+        if not edits:
+            return
+
+        # 从后往前编辑，前面的字节和行列坐标保持不变
+        for start_byte, old_end_byte, code in reversed(edits):
+            code = code.encode("utf-8")
+            start_point = self.buffer.byte_to_point(start_byte)
+            old_end_point = self.buffer.byte_to_point(old_end_byte)
+            self.buffer.replace(start_byte, old_end_byte, code)
+            new_end_byte = start_byte + len(code)
+            if self.definitions is not None:
+                self.definitions.edit(start_byte, old_end_byte, new_end_byte)
+            self.tree.edit(
+                start_byte=start_byte,
+                old_end_byte=old_end_byte,
+                new_end_byte=new_end_byte,
+                start_point=start_point,
+                old_end_point=old_end_point,
+                new_end_point=self.buffer.byte_to_point(new_end_byte),
+            )
+        self._source_code = None
+        old_tree = self.tree
+        self.tree = self.parser.parse(self.buffer.read_chunk, old_tree)
+        self.nodes_by_type = {}
+        if self.definitions is not None:
+            self.definitions.refresh(self.tree, old_tree.changed_ranges(self.tree))
+
+    @staticmethod
+    def check_edits(
+        edits: Iterable[tuple[int, int, str]], length: int
+    ) -> list[tuple[int, int, str]]:
+        """
+        Sort edits by position, rejecting overlapping ones and ranges outside the text.
+        """
+        edits = sorted(edits, key=lambda edit: (edit[0], edit[1]))
+        previous_end = 0
+        for start_position, end_position, _ in edits:
+            if start_position < previous_end or end_position < start_position:
+                raise ValueError(
+                    f"Invalid or overlapping edit range ({start_position}, {end_position})"
+                )
+            previous_end = end_position
+        if previous_end > length:
+            raise ValueError(f"Edit range ends past the source code ({previous_end})")
+        return edits
 
     def get_function_signature(
         self, function_name: str
     ) -> tuple[list[tuple[str, str]], str]:
-        nodes = self.find_node_by_type("function_definition")
-        for node in nodes:
-            name_node = node.child_by_field_name("name")
-            if name_node and name_node.text.decode("utf-8") == function_name:
-                return self._get_function_signature(node)
+        for node in self.find_definitions("function_definition", function_name):
+            return self._get_function_signature(node)
         return [], ""
 
     def _get_function_signature(
@@ -67,24 +187,21 @@ class CodeEditor:
                 if param.type == "typed_parameter":
                     for child in param.children:
                         if child.type == "identifier":
-                            param_name = child.text.decode("utf-8")
+                            param_name = self.get_node_text(child)
                         elif child.type == "type":
-                            param_type = child.text.decode("utf-8")
+                            param_type = self.get_node_text(child)
                 else:
-                    param_name = param.text.decode("utf-8")
+                    param_name = self.get_node_text(param)
                 if param_name:
                     parameters.append((param_name, param_type))
         return_type_node = node.child_by_field_name("return_type")
         if return_type_node:
-            return_type = return_type_node.text.decode("utf-8")
+            return_type = self.get_node_text(return_type_node)
         return parameters, return_type
 
     def get_class_definition(self, class_name: str) -> tree_sitter.Node:
-        nodes = self.find_node_by_type("class_definition")
-        for node in nodes:
-            name_node = node.child_by_field_name("name")
-            if name_node and name_node.text.decode("utf-8") == class_name:
-                return node
+        for node in self.find_definitions("class_definition", class_name):
+            return node
         return None
 
     def save(self, file_path: str):
@@ -107,7 +224,7 @@ class Example:
     functions = editor.find_node_by_type("function_definition")
     for func in functions:
         print(
-            f'Function name: {editor.get_node_text(func.child_by_field_name("name"), source_code)}'
+            f'Function name: {editor.get_node_text(func.child_by_field_name("name"))}'
         )
 
     # 插入代码
@@ -0,0 +1,216 @@
+# agent/definition_index.py
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+from tree_sitter import Node, Query, Range, Tree
+from agent.parser_registry import get_language, resolve_language_name
+
+try:
+    from tree_sitter import QueryCursor
+except ImportError:
+    # tree-sitter < 0.25 runs a query from the Query itself.
+    QueryCursor = None
+
+DEFINITION_QUERIES = {
+    "python": """
+        (function_definition name: (identifier) @name) @definition
+        (class_definition name: (identifier) @name) @definition
+    """,
+    "java": """
+        (class_declaration name: (identifier) @name) @definition
+        (interface_declaration name: (identifier) @name) @definition
+        (enum_declaration name: (identifier) @name) @definition
+        (method_declaration name: (identifier) @name) @definition
+        (constructor_declaration name: (identifier) @name) @definition
+    """,
+    "javascript": """
+        (function_declaration name: (identifier) @name) @definition
+        (class_declaration name: (identifier) @name) @definition
+        (method_definition name: (property_identifier) @name) @definition
+    """,
+}
+"""Tree-sitter queries capturing the named definitions of each language."""
+
+
+def get_definition_query(language: str) -> Optional[Query]:
+    """
+    Get the compiled definition query of a language, None if it has none.
+    """
+    return compile_definition_query(resolve_language_name(language))
+
+
+@lru_cache(maxsize=None)
+def compile_definition_query(language: str) -> Optional[Query]:
+    source = DEFINITION_QUERIES.get(language)
+    if source is None:
+        return None
+    return Query(get_language(language), source)
+
+
+MAX_EDIT_LOG = 256
+"""Edits kept in a `DefinitionIndex` log before all ranges are brought up to date."""
+
+
+class DefinitionIndex:
+    """
+    Byte ranges of the named definitions of a tree, keyed by node type and name.
+
+    The index is filled by one run of the definition query. Edits are appended
+    to a log rather than applied to every range: a range is replayed through the
+    edits logged after it was recorded when a lookup returns it, which shifts it
+    or, if an edit touched it, drops it. After a reparse the edited and the
+    syntactically changed ranges are logged as well and queried again, so the
+    definitions there are found anew. Ranges rather than nodes are kept, since
+    nodes belong to a single tree.
+    """
+
+    def __init__(self, query: Query, read_source: Callable[[int, int], bytes]):
+        """
+        Args:
+            query (Query): The definition query of the language.
+            read_source (Callable[[int, int], bytes]): Reads the source code between two
+                byte offsets. Before tree-sitter 0.25, nodes of a tree parsed from a
+                read callback have no text.
+        """
+        self.query = query
+        self.read_source = read_source
+        # (start byte, end byte, length of the log when recorded)
+        self.definitions: Dict[tuple[str, str], List[tuple[int, int, int]]] = {}
+        # (start byte, old end byte, new end byte) of each edit.
+        self.log: List[tuple[int, int, int]] = []
+        self.built = False
+        # Ranges edited since the last refresh, in current byte offsets.
+        self.dirty_ranges: List[tuple[int, int]] = []
+
+    @classmethod
+    def for_language(
+        cls, language: str, read_source: Callable[[int, int], bytes]
+    ) -> Optional["DefinitionIndex"]:
+        query = get_definition_query(language)
+        return cls(query, read_source) if query is not None else None
+
+    def add_matches(self, root_node: Node, start_byte: int, end_byte: int):
+        if QueryCursor is None:
+            cursor = self.query
+            cursor.set_byte_range((start_byte, end_byte))
+        else:
+            cursor = QueryCursor(self.query)
+            cursor.set_byte_range(start_byte, end_byte)
+        epoch = len(self.log)
+        for _, captures in cursor.matches(root_node):
+            node = captures["definition"][0]
+            name_node = captures["name"][0]
+            name = self.read_source(name_node.start_byte, name_node.end_byte).decode(
+                "utf-8"
+            )
+            self.definitions.setdefault((node.type, name), []).append(
+                (node.start_byte, node.end_byte, epoch)
+            )
+
+    def clear(self):
+        """
+        Forget the definitions, they are queried again on the next lookup.
+        """
+        self.definitions = {}
+        self.log = []
+        self.dirty_ranges = []
+        self.built = False
+
+    def build(self, root_node: Node):
+        self.clear()
+        self.add_matches(root_node, 0, root_node.end_byte)
+        self.built = True
+
+    def replay(self, start: int, end: int, epoch: int) -> Optional[tuple[int, int]]:
+        """
+        Bring a range recorded at a log length up to date, None if an edit touched it.
+        """
+        for edit_start, old_end, new_end in self.log[epoch:]:
+            if start >= old_end:
+                start += new_end - old_end
+                end += new_end - old_end
+            elif end >= edit_start:
+                return None
+        return start, end
+
+    def compact(self):
+        """
+        Replay every range and empty the log.
+        """
+        for key, ranges in list(self.definitions.items()):
+            ranges = [
+                (*current, 0)
+                for current in (self.replay(*recorded) for recorded in ranges)
+                if current is not None
+            ]
+            if ranges:
+                self.definitions[key] = ranges
+            else:
+                del self.definitions[key]
+        self.log = []
+
+    def edit(self, start_byte: int, old_end_byte: int, new_end_byte: int):
+        """
+        Follow an edit reported to the tree with `Tree.edit`.
+        """
+        if not self.built:
+            return
+        self.log.append((start_byte, old_end_byte, new_end_byte))
+        delta = new_end_byte - old_end_byte
+        self.dirty_ranges = [
+            (start + delta, end + delta) if start >= old_end_byte else (start, end)
+            for start, end in self.dirty_ranges
+        ]
+        self.dirty_ranges.append((start_byte, new_end_byte))
+
+    def refresh(self, tree: Tree, changed_ranges: Iterable[Range] = ()):
+        """
+        Query the edited ranges, and the ones whose syntax changed, in the reparsed tree.
+
+        Args:
+            tree (Tree): The tree after the reparse.
+            changed_ranges (Iterable[Range]): `Tree.changed_ranges` of the edited tree.
+        """
+        if not self.built:
+            return
+        ranges = self.dirty_ranges + [
+            (changed.start_byte, changed.end_byte) for changed in changed_ranges
+        ]
+        self.dirty_ranges = []
+        # Logged as edits that change nothing, so the definitions touching them are dropped.
+        self.log.extend((start, end + 1, end + 1) for start, end in ranges)
+        root_node = tree.root_node
+        for start, end in ranges:
+            # One byte of margin catches definitions that only touch the range.
+            self.add_matches(
+                root_node, max(start - 1, 0), min(end + 1, root_node.end_byte)
+            )
+        if len(self.log) > MAX_EDIT_LOG:
+            self.compact()
+
+    def find(self, tree: Tree, node_type: str, name: str) -> List[Node]:
+        """
+        Get the definitions of a type with a name, in document order.
+        """
+        if not self.built:
+            self.build(tree.root_node)
+        recorded = self.definitions.get((node_type, name), [])
+        # Ranges found again after an edit may also survive from before it.
+        current = {
+            position
+            for position in (self.replay(*entry) for entry in recorded)
+            if position is not None
+        }
+        epoch = len(self.log)
+        if current:
+            self.definitions[(node_type, name)] = [(*p, epoch) for p in current]
+        else:
+            self.definitions.pop((node_type, name), None)
+
+        nodes = []
+        for start, end in sorted(current):
+            node = tree.root_node.descendant_for_byte_range(start, end)
+            while node is not None and node.type != node_type:
+                node = node.parent
+            if node is not None and (node.start_byte, node.end_byte) == (start, end):
+                nodes.append(node)
+        return nodes
@@ -1,17 +1,63 @@
+import heapq
 import os
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Callable, Dict, Iterator, Optional
+from agent.tree_cache import TreeStringCache
+
+# Rough size of a token in the rendered tree, used to turn a token budget into characters.
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class TreeNode:
+    """A directory of the rendered tree."""
+
+    name: str
+    # Path parts from the checked directory, () for the root.
+    parts: tuple = ()
+    # Child name -> TreeNode for directories, None for files.
+    children: Dict[str, Optional["TreeNode"]] = field(default_factory=dict)
+    # Number of files in the whole subtree.
+    file_count: int = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self.parts)
+
+    def summary(self) -> str:
+        """
+        The line text of the directory when its subtree is collapsed, e.g. "tests/ (412 files)".
+        """
+        noun = "file" if self.file_count == 1 else "files"
+        return f"{self.name}/ ({self.file_count} {noun})"
+
+
+def default_score(node: TreeNode) -> float:
+    """
+    Expand shallow directories first, so the budget gives a breadth-first overview.
+    """
+    return -node.depth
 
 
 class DirectoryTreePrinter:
-    def __init__(self, directory_to_check, target_language="python"):
+    def __init__(
+        self,
+        directory_to_check,
+        target_language="python",
+        cache: Optional[TreeStringCache] = None,
+    ):
         """
         Initialize the DirectoryTreePrinter class.
 
         Args:
             directory_to_check (str): The directory to check.
             target_language (str): The target programming language.
+            cache (Optional[TreeStringCache]): Persistent cache of generated tree strings.
         """
         self.directory_to_check = directory_to_check
         self.target_language = target_language
+        self.cache = cache
         self.language_extensions = self.get_language_extensions()
 
     def get_language_extensions(self):
@@ -30,79 +76,341 @@ class DirectoryTreePrinter:
         }
         return language_extensions.get(self.target_language, [])
 
-    def add_to_tree(self, tree, parts):
+    def filter_and_convert_files(self, file_list):
         """
-        Add file parts to the directory tree.
+        Filter and convert file paths based on the target language extensions.
 
         Args:
-            tree (dict): The directory tree.
-            parts (list): The parts of the file path.
+            file_list (list): The list of files, relative to the checked directory or absolute.
+
+        Returns:
+            list: The path parts of the matching files as tuples, sorted and without duplicates.
         """
-        current = tree
-        for part in parts[:-1]:
-            current = current.setdefault(part, {})
-        current[parts[-1]] = None
+        extensions = set(self.language_extensions)
+        paths = set()
+        for file in file_list:
+            if os.path.splitext(file)[1] in extensions:
+                if os.path.isabs(file):
+                    file = os.path.relpath(file, self.directory_to_check)
+                paths.add(os.path.normpath(file))
+        # With the separator sorting before every other character, the paths
+        # are in the order of their parts tuples, which lists every directory's
+        # entries by name as the tree prints them.
+        sorted_paths = sorted(paths, key=lambda path: path.replace(os.sep, "\0"))
+        return [tuple(path.split(os.sep)) for path in sorted_paths]
 
-    def tree_to_string_helper(self, tree, prefix=""):
+    def build_tree(self, paths):
         """
-        Recursively generate the directory tree as a string.
+        Build the directory tree of the files matching the target language.
 
         Args:
-            tree (dict): The directory tree.
-            prefix (str): The prefix for each line of the tree.
+            paths (list): Sorted path parts from `filter_and_convert_files`.
 
         Returns:
-            str: The string representation of the directory tree.
+            TreeNode: The root of the tree, with file counts for every directory
+                and children in name order.
         """
-        lines = []
-        items = sorted(tree.items())
-        for i, (name, subtree) in enumerate(items):
-            is_last = i == len(items) - 1
-            lines.append(f"{prefix}{'└── ' if is_last else '├── '}{name}")
-            if subtree is not None:
-                extension = "    " if is_last else "│   "
-                lines.append(self.tree_to_string_helper(subtree, prefix + extension))
-        return "\n".join(lines)
+        root = TreeNode(os.path.basename(self.directory_to_check))
+        # Directories of the previous path, from the root down.
+        stack = [root]
+        previous = ()
+        for parts in paths:
+            common = self.common_prefix_length(previous, parts[:-1])
+            del stack[common + 1 :]
+            for index in range(common, len(parts) - 1):
+                child = TreeNode(parts[index], parts[: index + 1])
+                stack[-1].children[parts[index]] = child
+                stack.append(child)
+            stack[-1].children[parts[-1]] = None
+            for node in stack:
+                node.file_count += 1
+            previous = parts[:-1]
+        return root
 
-    def filter_and_convert_files(self, file_list):
+    @staticmethod
+    def common_prefix_length(a, b):
         """
-        Filter and convert file paths based on the target language extensions.
+        Number of leading path parts two paths share.
+        """
+        length = min(len(a), len(b))
+        for index in range(length):
+            if a[index] != b[index]:
+                return index
+        return length
+
+    def iter_sorted_lines(self, paths):
+        """
+        Generate the lines of the complete tree from sorted path parts in a single pass.
+
+        Whether an entry is the last one of its directory is computed first, by
+        a reverse pass over the paths, so the forward pass only keeps a stack
+        of line prefixes, one per depth.
+
+        Args:
+            paths (list): Sorted, unique path parts tuples from `filter_and_convert_files`.
+
+        Yields:
+            str: The lines of the tree below the root.
+        """
+        count_paths = len(paths)
+        # common[i]: parts shared by paths i - 1 and i.
+        common = [0] * (count_paths + 1)
+        for i in range(1, count_paths):
+            common[i] = self.common_prefix_length(paths[i - 1], paths[i])
+
+        # Bit k of has_sibling[i] is set when a later path shares the first k
+        # parts of path i and differs at part k, so its part k is not the last
+        # entry of that directory.
+        has_sibling = [0] * count_paths
+        mask = 0
+        for i in range(count_paths - 2, -1, -1):
+            shared = common[i + 1]
+            mask = (mask & ((1 << shared) - 1)) | (1 << shared)
+            has_sibling[i] = mask
+
+        prefixes = [""]
+        for i, parts in enumerate(paths):
+            mask = has_sibling[i]
+            last_index = len(parts) - 1
+            for depth in range(common[i], len(parts)):
+                prefix = prefixes[depth]
+                if mask >> depth & 1:
+                    yield f"{prefix}├── {parts[depth]}"
+                    extension = "│   "
+                else:
+                    yield f"{prefix}└── {parts[depth]}"
+                    extension = "    "
+                if depth < last_index:
+                    del prefixes[depth + 1 :]
+                    prefixes.append(prefix + extension)
+
+    @staticmethod
+    def line_cost(depth, text):
+        """
+        Number of characters of a tree line, newline included.
+
+        Args:
+            depth (int): Depth of the directory the line belongs to, 0 for the root's children.
+            text (str): The text after the connector.
+        """
+        return 4 * depth + 4 + len(text) + 1
+
+    def select_expanded(self, root, budget, score):
+        """
+        Choose the directories to expand so the rendered tree fits the budget.
+
+        Directories are taken in order of decreasing score. Expanding one
+        replaces its summary line with its name and adds a line per child, with
+        child directories collapsed. When that does not fit, a wide directory is
+        expanded with its subdirectories only and one "... (N files)" line for
+        its own files. A directory that fits neither way is left collapsed, and
+        the search moves on to cheaper ones.
+
+        Args:
+            root (TreeNode): The root of the tree.
+            budget (int): Maximum number of characters.
+            score (Callable[[TreeNode], float]): Priority of a directory, higher is expanded first.
+
+        Returns:
+            dict: Id of each expanded directory -> whether its files are listed.
+        """
+        expanded = {}
+        used = len(root.summary()) + 1
+        order = count()
+        heap = [(-score(root), next(order), root)]
+        while heap:
+            _, _, node = heapq.heappop(heap)
+            own_line = len(node.name) - len(node.summary())
+            file_count = 0
+            files_cost = 0
+            directories_cost = 0
+            for name, child in node.children.items():
+                if child is None:
+                    file_count += 1
+                    files_cost += self.line_cost(node.depth, name)
+                else:
+                    directories_cost += self.line_cost(node.depth, child.summary())
+
+            cost = own_line + directories_cost + files_cost
+            show_files = True
+            if used + cost > budget and file_count > 1 and directories_cost:
+                cost = own_line + directories_cost
+                cost += self.line_cost(node.depth, self.files_summary(file_count))
+                show_files = False
+            if used + cost > budget:
+                continue
+
+            used += cost
+            expanded[id(node)] = show_files
+            for child in node.children.values():
+                if child is not None:
+                    heapq.heappush(heap, (-score(child), next(order), child))
+        return expanded
+
+    @staticmethod
+    def files_summary(file_count):
+        """
+        The line text standing in for the files of a directory that are not listed.
+        """
+        return f"... ({file_count} files)"
+
+    def iter_tree_lines(
+        self,
+        file_list,
+        max_chars: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        score: Optional[Callable[[TreeNode], float]] = None,
+    ) -> Iterator[str]:
+        """
+        Generate the lines of the directory tree one at a time.
+
+        Without a budget every file is listed. With a budget, directories that
+        do not fit are collapsed into one summary line such as
+        "tests/ (412 files)", the directories with the highest score being
+        expanded first.
 
         Args:
             file_list (list): The list of files.
+            max_chars (Optional[int]): Maximum number of characters of the tree.
+            max_tokens (Optional[int]): Maximum number of tokens, estimated as CHARS_PER_TOKEN characters each.
+            score (Optional[Callable[[TreeNode], float]]): Priority of a directory, defaults to `default_score`.
+
+        Yields:
+            str: The lines of the tree, the root first.
+        """
+        yield from self.iter_path_lines(
+            self.filter_and_convert_files(file_list),
+            self.get_budget(max_chars, max_tokens),
+            score,
+        )
+
+    @staticmethod
+    def get_budget(max_chars=None, max_tokens=None):
+        """
+        Combine the character and token budgets into a number of characters.
 
         Returns:
-            list: A list of filtered and converted file paths.
+            Optional[int]: The smaller budget, or None when there is none.
         """
-        filtered_files = []
-        for file in file_list:
-            if os.path.splitext(file)[1] in self.language_extensions:
-                relative_path = os.path.relpath(
-                    os.path.join(self.directory_to_check, file), self.directory_to_check
+        budgets = [max_chars]
+        if max_tokens is not None:
+            budgets.append(max_tokens * CHARS_PER_TOKEN)
+        budgets = [budget for budget in budgets if budget is not None]
+        return min(budgets) if budgets else None
+
+    def iter_path_lines(self, paths, budget=None, score=None):
+        """
+        Generate the lines of the directory tree of filtered paths.
+
+        Args:
+            paths (list): Sorted path parts from `filter_and_convert_files`.
+            budget (Optional[int]): Maximum number of characters of the tree.
+            score (Optional[Callable[[TreeNode], float]]): Priority of a directory, defaults to `default_score`.
+
+        Yields:
+            str: The lines of the tree, the root first.
+        """
+        if budget is None:
+            yield os.path.basename(self.directory_to_check)
+            yield from self.iter_sorted_lines(paths)
+            return
+
+        root = self.build_tree(paths)
+        expanded = self.select_expanded(root, budget, score or default_score)
+        if id(root) not in expanded:
+            yield root.summary()
+            return
+
+        yield root.name
+        # Each frame is (iterator over the sorted children, prefix of their lines).
+        show_files = expanded[id(root)]
+        stack = [(iter(self.sorted_children(root, show_files)), "")]
+        while stack:
+            children, prefix = stack[-1]
+            item = next(children, None)
+            if item is None:
+                stack.pop()
+                continue
+            name, child, is_last = item
+            connector = "└── " if is_last else "├── "
+            if child is None:
+                yield f"{prefix}{connector}{name}"
+            elif id(child) in expanded:
+                yield f"{prefix}{connector}{name}"
+                extension = "    " if is_last else "│   "
+                show_files = expanded[id(child)]
+                stack.append(
+                    (iter(self.sorted_children(child, show_files)), prefix + extension)
                 )
-                parts = relative_path.split(os.sep)
-                filtered_files.append(parts)
-        return filtered_files
+            else:
+                yield f"{prefix}{connector}{child.summary()}"
 
-    def generate_tree_string(self, file_list):
+    def sorted_children(self, node, show_files=True):
+        """
+        List the children of a directory, which `build_tree` inserts in name order.
+
+        Args:
+            node (TreeNode): The directory.
+            show_files (bool): List the files, or summarize them in one last line.
+
+        Returns:
+            list: (name, TreeNode or None, is_last) tuples, files have no TreeNode.
+        """
+        items = list(node.children.items())
+        if not show_files:
+            directories = [item for item in items if item[1] is not None]
+            file_count = len(items) - len(directories)
+            items = directories + [(self.files_summary(file_count), None)]
+        last = len(items) - 1
+        return [(name, child, i == last) for i, (name, child) in enumerate(items)]
+
+    def generate_tree_string(
+        self, file_list, max_chars=None, max_tokens=None, score=None
+    ):
         """
         Generate the directory tree as a string for the given file list.
 
         Args:
             file_list (list): The list of files.
+            max_chars (Optional[int]): Maximum number of characters of the tree.
+            max_tokens (Optional[int]): Maximum number of tokens of the tree.
+            score (Optional[Callable[[TreeNode], float]]): Priority of a directory when collapsing.
 
         Returns:
             str: The string representation of the directory tree.
         """
-        filtered_files = self.filter_and_convert_files(file_list)
-        file_tree = {}
-        for parts in filtered_files:
-            self.add_to_tree(file_tree, parts)
+        paths = self.filter_and_convert_files(file_list)
+        budget = self.get_budget(max_chars, max_tokens)
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(
+                self.directory_to_check, self.target_language, paths, budget, score
+            )
+            if key is not None:
+                tree_string = self.cache.get_tree_string(key)
+                if tree_string is not None:
+                    return tree_string
 
-        tree_string = f"{os.path.basename(self.directory_to_check)}\n"
-        tree_string += self.tree_to_string_helper(file_tree, "")
+        lines = self.iter_path_lines(paths, budget, score)
+        root_line = next(lines)
+        tree_string = f"{root_line}\n" + "\n".join(lines)
+        if key is not None:
+            self.cache.put_tree_string(key, tree_string)
         return tree_string
 
+    def print_tree(self, file_list, max_chars=None, max_tokens=None, score=None):
+        """
+        Print the directory tree line by line.
+
+        Args:
+            file_list (list): The list of files.
+            max_chars (Optional[int]): Maximum number of characters of the tree.
+            max_tokens (Optional[int]): Maximum number of tokens of the tree.
+            score (Optional[Callable[[TreeNode], float]]): Priority of a directory when collapsing.
+        """
+        for line in self.iter_tree_lines(file_list, max_chars, max_tokens, score):
+            print(line)
+
 
 if __name__ == "__main__":
     import time
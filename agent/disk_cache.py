@@ -0,0 +1,130 @@
+# agent/disk_cache.py
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes_evicted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def merge(self, other: "CacheStats"):
+        self.hits += other.hits
+        self.misses += other.misses
+        self.evictions += other.evictions
+        self.bytes_evicted += other.bytes_evicted
+
+    def report(self) -> str:
+        return (
+            f"cache hits: {self.hits}, misses: {self.misses} "
+            f"(hit rate {self.hit_rate:.1%}), evicted: {self.evictions} entries "
+            f"/ {self.bytes_evicted} bytes"
+        )
+
+
+class DiskCache:
+    """
+    A size-bounded key/value store on disk, evicting least recently used entries.
+
+    Entries are stored as one file per key. Last access is tracked through the
+    entry's modification time, so several processes can share the same cache
+    directory without any extra bookkeeping.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str | Path): Directory where the entries are stored.
+            max_bytes (int): Total size the cache is trimmed to by `evict`.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get the value stored under `key`, refreshing its last access time.
+
+        Returns:
+            Optional[bytes]: The stored value, or None on a miss.
+        """
+        path = self.entry_path(key)
+        try:
+            value = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return value
+
+    def put(self, key: str, value: bytes):
+        """
+        Store `value` under `key`. The write is atomic, readers never see partial entries.
+        """
+        path = self.entry_path(key)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def discard(self, key: str):
+        try:
+            self.entry_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits in `max_bytes`.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        entries = []
+        total_size = 0
+        for path in self.cache_dir.glob("*/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            removed += 1
+            self.stats.evictions += 1
+            self.stats.bytes_evicted += size
+        return removed
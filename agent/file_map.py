@@ -1,56 +1,215 @@
 import os
-import json
-import pprint
-import tree_sitter_python
-from tree_sitter import Language, Parser, Node
-from typing import List
+import time
+from concurrent.futures import ProcessPoolExecutor
+from tree_sitter import Node
+from typing import Dict, Iterator, List, Literal, Optional
+from agent.call_graph import (
+    CallGraph,
+    ScopeStack,
+    resolve_call_name,
+    top_level_definitions,
+)
+from agent.import_table import ImportTable, ModuleIndex
 from agent.schemas import (
+    AttributeInfo,
+    CallInfo,
     FileData,
+    ParameterInfo,
     ClassInfo,
     FunctionInfo,
     ImportInfo,
     TopLevelInfo,
     ExpressionInfo,
-    FileMapType,
     DecoratorInfo,
 )
-from dataclasses import dataclass
+from agent.disk_cache import CacheStats
+from agent.language_extractors import get_extractor
+from agent.parser_registry import get_parser, language_for_extension, language_module
+from agent.structure_cache import StructureCache
+from agent.structure_binary import BinaryStructureWriter
+from agent.structure_writer import JsonStructureWriter
+from dataclasses import dataclass, field
 from pathlib import Path
+from loguru import logger
+
+
+def parse_file_data(
+    file_path: str,
+    cache: Optional[StructureCache] = None,
+    source_code: Optional[bytes] = None,
+) -> FileData:
+    """
+    Parse a single file and return its structure.
+
+    Args:
+        file_path (str): Path to the file to be processed.
+        cache (Optional[StructureCache]): Cache consulted before parsing, and updated on a miss.
+        source_code (Optional[bytes]): Content of the file, read from `file_path` if not given.
+
+    Returns:
+        FileData: The structure of the file.
+    """
+    file_map = SingleFileMap(file_path)
+    if source_code is None:
+        source_code = file_map.read_source()
+
+    if cache is not None:
+        key = cache.make_key(source_code, file_map.language_module)
+        file_data = cache.get_file_data(key)
+        if file_data is not None:
+            return file_data
+
+    tree = file_map.parse_source(source_code)
+    file_map.extract(tree.root_node, source_code)
+
+    if cache is not None:
+        cache.put_file_data(key, file_map.data)
+    return file_map.data
+
+
+def _parse_chunk(
+    file_paths: List[str], cache: Optional[StructureCache] = None
+) -> tuple[int, List[FileData], float, Optional[CacheStats]]:
+    """
+    Worker entry point: parse a chunk of files in a pool process.
+
+    Returns:
+        tuple[int, List[FileData], float, Optional[CacheStats]]: Worker pid, parsed data in
+            input order, seconds spent and the cache counters of this chunk.
+    """
+    start_time = time.perf_counter()
+    if cache is not None:
+        cache.stats = CacheStats()
+    results = [parse_file_data(file_path, cache) for file_path in file_paths]
+    return (
+        os.getpid(),
+        results,
+        time.perf_counter() - start_time,
+        cache.stats if cache is not None else None,
+    )
+
+
+@dataclass
+class WorkerStats:
+    """Throughput of a single parsing worker."""
 
+    files: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
 
-# Initialize languages
-LANGUAGE_MAP = {
-    ".py": tree_sitter_python,
-}
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
 
 
 @dataclass
 class MultiFileMap:
     file_dict: List[str]
     output_path: Path
+    # Number of worker processes; 1 parses serially, None uses os.cpu_count().
+    workers: Optional[int] = 1
+    # Files per work unit sent to a worker process.
+    chunk_size: int = 64
+    # Content-hash keyed cache, unchanged files are loaded from it instead of parsed.
+    cache: Optional[StructureCache] = None
+    # Indentation of the JSON output, None writes compact JSON.
+    indent: Optional[int] = 2
+    # "json", or "binary" for the memory-mappable layout of agent/structure_binary.py.
+    output_format: Literal["json", "binary"] = "json"
+    # Where to save the call graph built from the same parse, None skips it.
+    call_graph_path: Optional[Path] = None
+    # Commit the files are checked out at, recorded with the structure if given.
+    commit: Optional[str] = None
+    worker_stats: Dict[int, WorkerStats] = field(default_factory=dict, init=False)
+
+    def iter_file_data(self) -> Iterator[tuple[str, FileData]]:
+        """
+        Parse all files in the file list, yielding results in file list order.
+
+        Yields:
+            tuple[str, FileData]: File path and its structure.
+        """
+        self.worker_stats = {}
+        workers = self.workers or os.cpu_count() or 1
+
+        if workers <= 1 or len(self.file_dict) <= self.chunk_size:
+            stats = self.worker_stats.setdefault(os.getpid(), WorkerStats())
+            for file_path in self.file_dict:
+                start_time = time.perf_counter()
+                file_data = parse_file_data(file_path, self.cache)
+                stats.seconds += time.perf_counter() - start_time
+                stats.files += 1
+                yield file_path, file_data
+            stats.chunks = 1
+            self.finish_run()
+            return
+
+        chunks = [
+            self.file_dict[i : i + self.chunk_size]
+            for i in range(0, len(self.file_dict), self.chunk_size)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # executor.map preserves submission order, so the merge is deterministic
+            # regardless of which worker finishes first.
+            for chunk, (pid, results, seconds, cache_stats) in zip(
+                chunks,
+                executor.map(_parse_chunk, chunks, [self.cache] * len(chunks)),
+                strict=True,
+            ):
+                stats = self.worker_stats.setdefault(pid, WorkerStats())
+                stats.files += len(results)
+                stats.chunks += 1
+                stats.seconds += seconds
+                if cache_stats is not None:
+                    self.cache.stats.merge(cache_stats)
+                yield from zip(chunk, results, strict=True)
+
+        self.finish_run()
+
+    def finish_run(self):
+        """
+        Trim the cache to its size bound and report the statistics of the last run.
+        """
+        self.report_worker_stats()
+        if self.cache is not None:
+            self.cache.evict()
+            logger.info(self.cache.stats.report())
+
+    def report_worker_stats(self):
+        """
+        Log the per-worker parsing throughput of the last run.
+        """
+        for pid, stats in sorted(self.worker_stats.items()):
+            logger.info(
+                f"worker {pid}: {stats.files} files in {stats.chunks} chunks, "
+                f"{stats.seconds:.2f}s ({stats.files_per_second:.1f} files/s)"
+            )
 
     def save(self):
         """
         Generate the repository map by parsing all files in the file list and save to JSON.
-        """
-        all_file_data: FileMapType = {}  # 用于存储所有文件的数据
 
-        for file_path in self.file_dict:
-            # 清空单个文件映射的状态
-            file_map = SingleFileMap(file_path)
-            tree, source_code = file_map.parse_file()
-            file_map.visit_node(tree.root_node, source_code)
-            all_file_data[file_path] = file_map.data
+        Each file's entry is written out as soon as it is parsed, the whole map is never
+        held in memory. With `call_graph_path` set, the call graph is built from the
+        calls of the same entries, without parsing the files again.
+        """
+        if self.output_format == "binary":
+            writer = BinaryStructureWriter(self.output_path, commit=self.commit)
+        else:
+            writer = JsonStructureWriter(
+                self.output_path, indent=self.indent, commit=self.commit
+            )
 
-        # 序列化所有数据并写入 JSON 文件
-        json_content = json.dumps(
-            {k: v.model_dump() for k, v in all_file_data.items()},
-            ensure_ascii=False,
-            indent=2,
-        )
+        call_graph = CallGraph() if self.call_graph_path is not None else None
+        module_index = ModuleIndex(self.file_dict) if call_graph is not None else None
+        with writer:
+            for file_path, file_data in self.iter_file_data():
+                writer.write(file_path, file_data)
+                if call_graph is not None:
+                    call_graph.add_file_calls(file_path, file_data.calls, module_index)
 
-        with open(self.output_path, "w", encoding="utf-8") as f:
-            f.write(json_content)
+        if call_graph is not None:
+            call_graph.save(self.call_graph_path)
 
 
 class SingleFileMap:
@@ -62,10 +221,54 @@ class SingleFileMap:
             file_path (str): Path to the file to be processed.
         """
         self.file_path = file_path
-        self.parsers = {
-            ext: Parser(Language(lang.language())) for ext, lang in LANGUAGE_MAP.items()
-        }
+        self.ext = os.path.splitext(self.file_path)[1]
+        self.language = language_for_extension(self.ext)
         self.data = FileData()
+        self.root_node = None
+        self.comment_lines = None
+        self.scopes = ScopeStack()
+        self.import_table = ImportTable()
+        self.local_definitions: set[str] = set()
+
+    @property
+    def language_module(self) -> str:
+        """
+        Module name of the tree-sitter grammar used for this file.
+        """
+        if self.language is None:
+            raise ValueError(f"Unsupported file extension: {self.ext}")
+        return language_module(self.language)
+
+    @staticmethod
+    def decode_source(raw_source: bytes) -> bytes:
+        """
+        Validate raw file content as UTF-8 and normalize its line endings to LF,
+        the same way reading the file in text mode does.
+        """
+        return (
+            raw_source.decode("utf-8")
+            .replace("\r\n", "\n")
+            .replace("\r", "\n")
+            .encode("utf-8")
+        )
+
+    def read_source(self) -> bytes:
+        """
+        Read the file and return its source code as UTF-8 bytes.
+        """
+        with open(self.file_path, "rb") as file:
+            return self.decode_source(file.read())
+
+    def parse_source(self, source_code: bytes):
+        """
+        Parse the given source code with the parser matching the file extension.
+
+        Returns:
+            Tree: Syntax tree of the source code.
+        """
+        if self.language is None:
+            raise ValueError(f"Unsupported file extension: {self.ext}")
+        return get_parser(self.language).parse(source_code)
 
     def parse_file(self) -> tuple[Node, bytes]:
         """
@@ -74,79 +277,147 @@ class SingleFileMap:
         Returns:
             tuple[Node, bytes]: Syntax tree, source code.
         """
-        ext = os.path.splitext(self.file_path)[1]
-        if ext not in self.parsers:
-            raise ValueError(f"Unsupported file extension: {ext}")
+        source_code = self.read_source()
+        tree = self.parse_source(source_code)
+        return tree, source_code
 
-        with open(self.file_path, "r", encoding="utf-8") as file:
-            source_code = file.read().encode("utf-8")
+    def extract(self, root_node: Node, source_code: bytes) -> FileData:
+        """
+        Extract the structure of the file with the extractor of its language.
 
-        parser = self.parsers[ext]
-        tree = parser.parse(source_code)
-        return tree, source_code
+        Args:
+            root_node (Node): Root of the syntax tree.
+            source_code (bytes): The source code of the file.
+
+        Returns:
+            FileData: The structure of the file.
+        """
+        extractor = get_extractor(self.language)
+        if extractor is None:
+            # Python is extracted by this class itself.
+            self.visit_node(root_node, source_code)
+        else:
+            self.root_node = root_node
+            self.data = extractor.extract(root_node, source_code)
+        return self.data
+
+    def visit_node(self, node: Node, source_code: bytes):
+        """
+        Extract the structure and the calls of a Python file in a single walk over its tree.
 
-    def visit_node(self, node: Node, source_code: str):
+        Sections (imports, classes, functions, top-level statements) are recorded where
+        the walk first reaches them. The walk still descends into them, collecting
+        comments, class members and calls on the way, so no node is visited twice.
+        Every node is reached, including the sections after a nested block that
+        ends its parent, e.g. the definitions following a `try` statement.
+
+        Args:
+            node (Node): Root of the syntax tree.
+            source_code (bytes): The source code of the file.
+        """
+        self.root_node = node
+        self.comment_lines = {}
+        self.scopes = ScopeStack()
+        # Relative imports keep their leading dots, the file's package is resolved
+        # when the call graph is built, so the extracted data only depends on the source.
+        self.import_table = ImportTable()
+        self.local_definitions = top_level_definitions(node, source_code)
+        # Nodes starting before this byte are part of an already recorded section.
+        section_end = 0
+        # The class being recorded: its info, end byte and the depth of its members.
+        open_class = None
         cursor = node.walk()
 
         while True:
-            node_type = cursor.node.type
-
-            if node_type in [
-                "import_statement",
-                "import_from_statement",
-                "class_definition",
-                "function_definition",
-                "expression_statement",
-                "if_statement",
-            ]:
-                if node_type in ["import_statement", "import_from_statement"]:
-                    self.data.imports.append(
-                        ImportInfo(
-                            start_line=cursor.node.start_point[0] + 1,
-                            end_line=cursor.node.end_point[0] + 1,
-                            text=self.get_node_text(cursor.node, source_code),
+            current = cursor.node
+            node_type = current.type
+            self.scopes.leave_before(current.start_byte)
+
+            if node_type == "comment":
+                self.add_comment_line(current, source_code)
+            elif node_type in ["import_statement", "import_from_statement"]:
+                self.import_table.add_import_node(current, source_code)
+            elif node_type in ["class_definition", "function_definition"]:
+                self.scopes.enter(
+                    current.end_byte,
+                    self.get_node_text(
+                        current.child_by_field_name("name"), source_code
+                    ),
+                    "class" if node_type == "class_definition" else "function",
+                )
+            elif node_type == "call":
+                self.process_call(current, source_code)
+
+            if current.start_byte >= section_end:
+                if node_type in [
+                    "import_statement",
+                    "import_from_statement",
+                    "class_definition",
+                    "function_definition",
+                    "expression_statement",
+                    "if_statement",
+                ]:
+                    if node_type in ["import_statement", "import_from_statement"]:
+                        self.data.imports.append(
+                            ImportInfo(
+                                start_line=current.start_point[0] + 1,
+                                end_line=current.end_point[0] + 1,
+                                text=self.get_node_text(current, source_code),
+                            )
                         )
-                    )
-                elif node_type in ["expression_statement", "if_statement"]:
-                    self.data.top_level.append(
-                        TopLevelInfo(
-                            start_line=cursor.node.start_point[0] + 1,
-                            end_line=cursor.node.end_point[0] + 1,
-                            text=self.get_node_text(cursor.node, source_code),
+                    elif node_type in ["expression_statement", "if_statement"]:
+                        self.data.top_level.append(
+                            TopLevelInfo(
+                                start_line=current.start_point[0] + 1,
+                                end_line=current.end_point[0] + 1,
+                                text=self.get_node_text(current, source_code),
+                            )
                         )
+                    elif node_type == "class_definition":
+                        class_info = self.process_class_definition(current, source_code)
+                        # 类体 block 的直接子节点即为类成员
+                        open_class = (class_info, current.end_byte, cursor.depth + 2)
+                    elif node_type == "function_definition":
+                        self.data.functions.append(
+                            self.process_function_definition(current, source_code)
+                        )
+                    section_end = current.end_byte
+
+                elif node_type not in [
+                    "module",
+                    "decorator",
+                    "decorated_definition",
+                    "comment",
+                ]:
+                    logger.debug(
+                        f"{node_type} not supported yet, node_text:{self.get_node_text(current, source_code)}"
                     )
-                elif node_type == "class_definition":
-                    self.process_class_definition(cursor.node, source_code)
-
-                elif node_type == "function_definition":
-                    self.process_function_definition(
-                        cursor.node, source_code, top_level_or_not=True
-                    )
-
-                # 跳过子节点，直接处理兄弟节点
-                if not cursor.goto_next_sibling():
-                    # 如果没有更多兄弟节点，返回到父节点并继续
-                    while not cursor.goto_parent():
-                        return  # 无法返回父节点，结束遍历
+            elif (
+                open_class is not None
+                and cursor.depth == open_class[2]
+                and current.start_byte < open_class[1]
+            ):
+                self.process_class_member(current, source_code, open_class[0])
+
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return
+
+    def process_class_definition(
+        self, class_node: Node, source_code: bytes
+    ) -> ClassInfo:
+        """
+        Record a class, its members are added by `process_class_member` as the walk reaches them.
 
-                    # 继续到下一个兄弟节点
-                    if not cursor.goto_next_sibling():
-                        return  # 无法返回到兄弟节点且无法返回父节点，结束遍历
+        Args:
+            class_node (Node): The class definition node.
+            source_code (bytes): The source code of the file.
 
-            else:
-                if node_type not in ["module", "decorator", "decorated_definition"]:
-                    pprint.pp(
-                        f"{node_type} not supported yet, node_text:{self.get_node_text(cursor.node, source_code)}"
-                    )
-                # 处理非指定类型的节点，遍历子节点
-                if cursor.goto_first_child():
-                    continue  # 处理子节点
-                while not cursor.goto_next_sibling():
-                    # 如果没有更多兄弟节点，返回到父节点并继续
-                    if not cursor.goto_parent():
-                        return  # 无法返回到父节点，结束遍历
-
-    def process_class_definition(self, class_node: Node, source_code: str):
+        Returns:
+            ClassInfo: The recorded class.
+        """
         # 获取类名节点
         class_name_node = class_node.child_by_field_name("name")
 
@@ -184,48 +455,104 @@ class SingleFileMap:
             else class_name_node.start_point[0] + 1,
             end_line=class_node.end_point[0] + 1,
         )
+        self.data.classes.append(class_info)
+        return class_info
 
-        body_node = class_node.child_by_field_name("body")
-        if body_node:
-            for child in body_node.children:
-                node_type = child.type
-                if node_type == "expression_statement":
-                    class_info.expressions.append(
-                        ExpressionInfo(
-                            start_line=child.start_point[0] + 1,
-                            end_line=child.end_point[0] + 1,
-                            text=self.get_node_text(child, source_code),
+    def process_class_member(
+        self, node: Node, source_code: bytes, class_info: ClassInfo
+    ):
+        """
+        Add a statement of a class body to the class: expressions, attributes and methods.
+
+        Args:
+            node (Node): A direct child of the class body.
+            source_code (bytes): The source code of the file.
+            class_info (ClassInfo): The class being recorded.
+        """
+        node_type = node.type
+        if node_type == "expression_statement":
+            class_info.expressions.append(
+                ExpressionInfo(
+                    start_line=node.start_point[0] + 1,
+                    end_line=node.end_point[0] + 1,
+                    text=self.get_node_text(node, source_code),
+                )
+            )
+            assignment = node.named_children[0] if node.named_children else None
+            if assignment is not None and assignment.type == "assignment":
+                left = assignment.child_by_field_name("left")
+                right = assignment.child_by_field_name("right")
+                if left and right and left.type == "identifier":
+                    class_info.attributes.append(
+                        AttributeInfo(
+                            name=self.get_node_text(left, source_code),
+                            value=self.get_node_text(right, source_code),
+                            start_line=node.start_point[0] + 1,
+                            end_line=node.end_point[0] + 1,
                         )
                     )
-                elif node_type in ["function_definition", "decorated_definition"]:
-                    if node_type == "function_definition":
-                        sketch, function_name = self.process_function_definition(
-                            child, source_code
-                        )
+        elif node_type == "function_definition":
+            class_info.functions.append(
+                self.process_function_definition(node, source_code)
+            )
+        elif node_type == "decorated_definition":
+            definition = node.child_by_field_name("definition")
+            if definition is not None and definition.type == "function_definition":
+                class_info.functions.append(
+                    self.process_function_definition(definition, source_code, node)
+                )
 
-                    elif node_type == "decorated_definition":
-                        for sub_child in child.children:
-                            if sub_child.type == "function_definition":
-                                sketch, function_name = (
-                                    self.process_function_definition(
-                                        sub_child, source_code
-                                    )
-                                )
-
-                    function_info = FunctionInfo(
-                        function_name=function_name,
-                        sketch=sketch,
-                        start_line=child.start_point[0] + 1,
-                        end_line=child.end_point[0] + 1,
-                        text=self.get_node_text(child, source_code),
-                    )
-                    class_info.functions.append(function_info)
+    def process_call(self, call_node: Node, source_code: bytes):
+        """
+        Record a call made by a name of the file or an imported one, attributed to
+        the innermost definition enclosing it.
 
-        self.data.classes.append(class_info)
+        Args:
+            call_node (Node): The call node.
+            source_code (bytes): The source code of the file.
+        """
+        function_node = call_node.child_by_field_name("function")
+        if function_node is None or function_node.type not in [
+            "identifier",
+            "attribute",
+        ]:
+            return
+
+        resolved = resolve_call_name(
+            self.get_node_text(function_node, source_code),
+            self.scopes,
+            self.local_definitions,
+            self.import_table,
+        )
+        if resolved is None:
+            return
+        callee, imported = resolved
+        self.data.calls.append(
+            CallInfo(
+                caller=self.scopes.caller(),
+                callee=callee,
+                imported=imported,
+                start_line=call_node.start_point[0] + 1,
+                end_line=call_node.end_point[0] + 1,
+            )
+        )
 
     def process_function_definition(
-        self, function_node: Node, source_code: str, top_level_or_not: bool = False
-    ):
+        self, function_node: Node, source_code: bytes, span_node: Optional[Node] = None
+    ) -> FunctionInfo:
+        """
+        Build the information of a function: its sketch and signature.
+
+        Args:
+            function_node (Node): The function definition node.
+            source_code (bytes): The source code of the file.
+            span_node (Optional[Node]): Node whose lines and text are recorded, the
+                function itself by default.
+
+        Returns:
+            FunctionInfo: The function information.
+        """
+
         # Helper function to get docstring and comments
         def get_docstring_and_comments():
             # Extract the docstring from the function body
@@ -241,14 +568,20 @@ class SingleFileMap:
                         first_statement.child(0), source_code
                     )
 
-            # Extract comments before the function definition
+            # Extract the run of comment lines right above the definition (or its decorators)
+            definition_node = function_node
+            if (
+                function_node.parent
+                and function_node.parent.type == "decorated_definition"
+            ):
+                definition_node = function_node.parent
+            comment_lines = self.get_comment_lines(source_code)
             comments = []
-            for i in range(function_node.start_byte - 1, 0, -1):
-                node = function_node.descendant_for_byte_range(i, i + 1)
-                if node and node.type == "comment":
-                    comments.insert(0, self.get_node_text(node, source_code))
-                elif node and node.type != "comment":
-                    break
+            line = definition_node.start_point[0] - 1
+            while line in comment_lines:
+                comments.append(comment_lines[line])
+                line -= 1
+            comments.reverse()
             return docstring, comments
 
         # Helper function to process function parameters
@@ -319,18 +652,59 @@ class SingleFileMap:
         # Combine everything into the final sketch
         sketch = f"{comments_str}{decorators_str}{async_str}def {function_name}({params_str}){return_str}{docstring_str}"
 
-        if top_level_or_not:
-            self.data.functions.append(
-                FunctionInfo(
-                    function_name=function_name,
-                    sketch=sketch,
-                    start_line=function_node.start_point[0] + 1,
-                    end_line=function_node.end_point[0] + 1,
-                    text=self.get_node_text(function_node, source_code),
-                )
-            )
-        else:
-            return sketch, function_name
+        span_node = span_node or function_node
+        return FunctionInfo(
+            function_name=function_name,
+            sketch=sketch,
+            start_line=span_node.start_point[0] + 1,
+            end_line=span_node.end_point[0] + 1,
+            text=self.get_node_text(span_node, source_code),
+            parameters=[
+                ParameterInfo(name=name, type=ptype) for name, ptype in parameters
+            ],
+            return_type=return_type,
+            is_async=is_async,
+            decorators=decorators_info,
+        )
+
+    def add_comment_line(self, comment_node: Node, source_code: bytes):
+        """
+        Record a comment if it sits on its own line.
+        """
+        line, column = comment_node.start_point
+        line_prefix = source_code[
+            comment_node.start_byte - column : comment_node.start_byte
+        ]
+        if not line_prefix.strip():
+            self.comment_lines[line] = self.get_node_text(comment_node, source_code)
+
+    def get_comment_lines(self, source_code: bytes) -> dict[int, str]:
+        """
+        Get the comments that sit on their own line.
+
+        During `visit_node` these are the comments the walk has passed so far, which
+        include every comment above the definition being processed. Otherwise they
+        are collected in a single walk over the tree.
+
+        Args:
+            source_code (bytes): The source code of the file.
+
+        Returns:
+            dict[int, str]: Comment text keyed by its (0-based) line number.
+        """
+        if self.comment_lines is not None:
+            return self.comment_lines
+
+        self.comment_lines = {}
+        cursor = self.root_node.walk()
+        while True:
+            if cursor.node.type == "comment":
+                self.add_comment_line(cursor.node, source_code)
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return self.comment_lines
 
     def get_decorators(self, node: Node, source_code: str) -> list[DecoratorInfo]:
         """
@@ -356,21 +730,11 @@ class SingleFileMap:
                             end_line=child.end_point[0] + 1,
                         )
                     )
-        else:
-            # Traverse previous siblings to find decorators for class
-            current_node = node.prev_named_sibling
-            while current_node:
-                if current_node.type == "decorator":
-                    decorator_text = self.get_node_text(current_node, source_code)
-                    decorators.append(
-                        DecoratorInfo(
-                            decorator_name=decorator_text,
-                            start_line=current_node.start_point[0] + 1,
-                            end_line=current_node.end_point[0] + 1,
-                        )
-                    )
-                current_node = current_node.prev_named_sibling
-            decorators.reverse()  # Reverse to maintain the correct order
+        elif node.parent and node.parent.type == "decorated_definition":
+            # Decorators of a class or function are its siblings in the enclosing
+            # decorated_definition, any other node has none. Looking only there keeps
+            # this constant time instead of walking every previous sibling in the file.
+            return self.get_decorators(node.parent, source_code)
 
         return decorators
 
@@ -1,15 +1,17 @@
 import os
 import json
-import tree_sitter_python
-from tree_sitter import Language, Parser, Node
+from tree_sitter import Node
 from collections import defaultdict
 from typing import List
-
-
-# Initialize languages
-LANGUAGE_MAP = {
-    ".py": tree_sitter_python,
-}
+from agent.call_graph import (
+    CallGraph,
+    ScopeStack,
+    resolve_call_name,
+    top_level_definitions,
+)
+from agent.import_table import ImportTable, ModuleIndex
+from agent.parser_registry import get_parser, language_for_extension
+from agent.symbol_index import qualified_name
 
 
 class FileMap:
@@ -30,16 +32,20 @@ class FileMap:
             )
         )
         self.imports = defaultdict(lambda: {})
-        self.parsers = {
-            ext: Parser(Language(lang.language())) for ext, lang in LANGUAGE_MAP.items()
-        }
+        # Local name -> fully qualified name bound by the imports of each file.
+        self.import_tables: dict[str, ImportTable] = {}
+        # Dotted module names of the mapped files, to resolve imports into the repository.
+        self.module_index = ModuleIndex(file_dict or [])
         self.file_data = defaultdict(
             lambda: {"Imports": [], "Classes": [], "Top level": []}
         )
         self.current_class = None
         self.function_name = None
-        self.function_ranges = {}
-        self.function_calls = {}
+        self.call_graph = CallGraph()
+        # Enclosing definitions of the node being visited.
+        self.scopes = ScopeStack()
+        # Names of the top-level classes and functions of each file.
+        self.local_definitions = defaultdict(set)
         self.class_name = None
 
     def parse_file(self, file_path: str) -> tuple[Node, bytes]:
@@ -51,14 +57,21 @@ class FileMap:
 
         Returns:
             tuple[Node, bytes]: Syntax tree, source code.
+
+        Raises:
+            ValueError: If the file is not a Python file, the only language the
+                visitor knows the node types of.
         """
         ext = os.path.splitext(file_path)[1]
-        if ext not in self.parsers:
+        language = language_for_extension(ext)
+        if language is None:
             raise ValueError(f"Unsupported file extension: {ext}")
+        if language != "python":
+            raise ValueError(f"FileMap only maps Python files, not {language}: {ext}")
 
         with open(file_path, "r", encoding="utf-8") as file:
             source_code = file.read().encode("utf-8")
-        parser = self.parsers[ext]
+        parser = get_parser(language)
         tree = parser.parse(source_code)
         return tree, source_code
 
@@ -73,6 +86,11 @@ class FileMap:
         """
         cursor = node.walk()
         current_end_line = 0
+        self.scopes = ScopeStack()
+        self.import_tables[file_path] = ImportTable.for_file(
+            file_path, self.module_index
+        )
+        self.collect_local_definitions(node, source_code, file_path)
 
         while True:
             node_type = cursor.node.type
@@ -80,6 +98,10 @@ class FileMap:
             start_line, _ = cursor.node.start_point
             current_end_line, _ = cursor.node.end_point
 
+            self.scopes.leave_before(cursor.node.start_byte)
+            if node_type in ["class_definition", "function_definition"]:
+                self.enter_scope(cursor.node, source_code)
+
             if node_type in [
                 "import_statement",
                 "import_from_statement",
@@ -118,63 +140,104 @@ class FileMap:
                 if not cursor.goto_parent():
                     return
 
-    def is_imported(self, call_name, import_statements):
+    def is_imported(self, call_name, import_table: ImportTable):
         """
-        Check if a call name is part of the imported statements and return the corresponding import statement.
+        Check if a call name refers to an imported name and resolve it.
 
         Args:
             call_name (str): The name of the function being called.
-            import_statements (dict): Dictionary of import statements.
+            import_table (ImportTable): Import table of the file.
 
         Returns:
-            tuple: (bool, str) - A tuple where the first element is True if the call name is part of the imported statements, False otherwise, and the second element is the corresponding import statement if found, otherwise an empty string.
-        """
-        for module, entities in import_statements.items():
-            if entities is None:
-                # Handle imports like "import asyncio"
-                if call_name == module or call_name.startswith(f"{module}."):
-                    return True, f"{module}"
-            else:
-                # Handle imports like "from module import entity"
-                for entity in entities:
-                    if call_name == entity:
-                        return True, f"{module}"
-        return False, ""
+            tuple: (bool, str) - True and the fully qualified name the call refers to
+                (e.g. "numpy.array" for "np.array") if it is imported, otherwise False and
+                an empty string.
+        """
+        target = import_table.resolve(call_name)
+        if target is None:
+            return False, ""
+        return True, target
 
-    def process_call_node(self, call_node: Node, source_code: str, file_path):
+    def collect_local_definitions(self, root_node: Node, source_code: str, file_path):
         """
-        Process a call node and print its details.
+        Record the top-level classes and functions of a file, so calls made before
+        the definition in the file resolve as well.
 
         Args:
-            call_node (Node): The call node to process.
+            root_node (Node): Root of the syntax tree.
             source_code (str): The source code of the file.
+            file_path (str): Path of the file.
         """
-        call_text = self.get_node_text(call_node, source_code)
-        call_line, _ = call_node.start_point
+        self.local_definitions[file_path].update(
+            top_level_definitions(root_node, source_code)
+        )
 
-        import_statements = self.imports[file_path]
+    def enter_scope(self, definition_node: Node, source_code: str):
+        """
+        Push a class or function definition on the stack of enclosing definitions.
 
-        # TODO: Right now we use import statements to determine the source of call names but we have not add this statement to file_map.
-        for function_name, (start_line, end_line) in self.function_ranges.items():
-            if start_line <= call_line <= end_line:
-                for child in call_node.children:
-                    if child.type in ["identifier", "attribute"]:
-                        call_name = self.get_node_text(child, source_code)
+        Args:
+            definition_node (Node): The class or function definition.
+            source_code (str): The source code of the file.
+        """
+        name = self.get_node_text(
+            definition_node.child_by_field_name("name"), source_code
+        )
+        kind = "class" if definition_node.type == "class_definition" else "function"
+        self.scopes.enter(definition_node.end_byte, name, kind)
 
-                        imported_or_not, import_statement = self.is_imported(
-                            call_name, import_statements
-                        )
-                        if imported_or_not:
-                            if function_name not in self.function_calls:
-                                self.function_calls[function_name] = []
-                            self.function_calls[function_name].append(
-                                (call_name, import_statement)
-                            )
-                            # print(f"Call Node: {call_text}")
-                            # print(f"  Belongs to function: {function_name}")
-                            # print(f"  References: {call_name}")
-                            # print(f"Current function calls: {self.function_calls}")
-                break
+    def current_caller(self, file_path: str) -> str:
+        """
+        Qualified name of the innermost definition enclosing the node being visited.
+        """
+        return qualified_name(file_path, self.scopes.caller())
+
+    def resolve_call(self, call_name: str, file_path: str) -> str | None:
+        """
+        Resolve the name called by a call node to a qualified name.
+
+        Args:
+            call_name (str): Text of the called expression, e.g. "self.run" or "os.path.join".
+            file_path (str): Path of the file.
+
+        Returns:
+            str | None: "file::Class.method" for definitions of the same file or of an
+                imported repository module, the dotted name for other imported ones,
+                None for anything else (builtins, locals).
+        """
+        resolved = resolve_call_name(
+            call_name,
+            self.scopes,
+            self.local_definitions[file_path],
+            self.import_tables[file_path],
+        )
+        if resolved is None:
+            return None
+        name, imported = resolved
+        if not imported:
+            return qualified_name(file_path, name)
+        return self.module_index.locate_import(file_path, name)
+
+    def process_call_node(self, call_node: Node, source_code: str, file_path):
+        """
+        Record the call in the call graph, attributed to the innermost enclosing definition.
+
+        Args:
+            call_node (Node): The call node to process.
+            source_code (str): The source code of the file.
+            file_path (str): Path of the file.
+        """
+        function_node = call_node.child_by_field_name("function")
+        if function_node is None or function_node.type not in [
+            "identifier",
+            "attribute",
+        ]:
+            return
+
+        call_name = self.get_node_text(function_node, source_code)
+        callee = self.resolve_call(call_name, file_path)
+        if callee is not None:
+            self.call_graph.add_call(self.current_caller(file_path), callee)
 
     def process_class_definition(
         self, class_node: Node, source_code: str, file_path: str
@@ -239,10 +302,6 @@ class FileMap:
         start_line, _ = function_node.start_point
         end_line, _ = function_node.end_point
 
-        # Record the starting and ending lines of the function
-        # FIXME: What if there are no function name?
-        self.function_ranges[function_name] = (start_line, end_line)
-
         # NOTE: Add self.function_name to check if the function is already processed to avoid when the content of function is "pass", then endline is equal to class endline, which will be processed again.
         if function_name == self.function_name:
             return
@@ -324,6 +383,7 @@ class FileMap:
             source_code (str): The source code of the file.
             file_path (str): Path of the file.
         """
+        self.import_tables[file_path].add_import_node(node, source_code)
         import_statements = self.imports[file_path]
 
         if node.type == "import_statement":
@@ -531,6 +591,15 @@ class FileMap:
         with open(output_path, "w", encoding="utf-8") as json_file:
             json.dump(self.file_data, json_file, ensure_ascii=False, indent=4)
 
+    def save_call_graph(self, output_path: str):
+        """
+        Save the call graph adjacency index, see `CallGraph.load`.
+
+        Args:
+            output_path (str): Path to save the JSON file.
+        """
+        self.call_graph.save(output_path)
+
     def get_text_by_relative_line(
         self, file_path: str, section: str, relative_line: int
     ) -> str:
@@ -1,6 +1,5 @@
 # agent/file_restorer.py
 
-import json
 from typing import List, Optional
 from agent.schemas import (
     FileMapType,
@@ -12,21 +11,31 @@ from agent.schemas import (
 )
 from pydantic import FilePath
 from agent.structure_filter import StructureFilter
+from agent.structure_binary import BinaryStructureStore
+from agent.structure_store import LazyStructureStore, open_structure
 from loguru import logger
 
 
 class FileRestorer:
     def __init__(self, repo_structure_path: FilePath, indent: int = 2):
-        with open(repo_structure_path, "r") as f:
-            repo_structure_dict = json.load(f)
-
-        self.repo_structure: FileMapType = {
-            file_path: FileData.model_validate(file_data)
-            for file_path, file_data in repo_structure_dict.items()
-        }
+        self.repo_structure: LazyStructureStore | BinaryStructureStore = open_structure(
+            repo_structure_path
+        )
         self.indent = " " * indent
         self.filter = StructureFilter(self.repo_structure)
 
+    def close(self):
+        """
+        关闭仓库结构文件。
+        """
+        self.repo_structure.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def restore_all_files(self, process_first_only: bool = False) -> str:
         """还原所有文件内容。如果 process_first_only 为 True，则只处理第一个文件。"""
         all_file_contents = []
@@ -149,6 +158,6 @@ class FileRestorer:
 
 
 if __name__ == "__main__":
-    restorer = FileRestorer("filtered_repo_structure.json")
-    restored_content = restorer.restore_all_files()
+    with FileRestorer("filtered_repo_structure.json") as restorer:
+        restored_content = restorer.restore_all_files()
     print(restored_content)
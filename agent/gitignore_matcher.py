@@ -1,11 +1,236 @@
 import os
-import fnmatch
-import requests
-from collections import defaultdict
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from git import GitCommandError, InvalidGitRepositoryError, NoSuchPathError, Repo
+
+
+def translate_pattern(pattern: str) -> str:
+    """
+    Translate the glob part of a gitignore pattern into a regular expression.
+
+    Follows gitignore(5): `*` and `?` never match "/", a leading "**/" matches in
+    all directories, a trailing "/**" matches everything inside, "/**/" matches
+    zero or more directories, and backslash escapes the next character.
+
+    Args:
+        pattern (str): Pattern without the negation prefix, leading or trailing "/".
+
+    Returns:
+        str: Regular expression source matching the pattern.
+    """
+    regex = []
+    i = 0
+    length = len(pattern)
+    while i < length:
+        char = pattern[i]
+        if char == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                at_end = i + 2 == length or pattern[i + 2] == "/"
+                if at_start and at_end:
+                    if i + 2 == length:
+                        # "foo/**": everything inside foo
+                        regex.append(".*")
+                    else:
+                        # "**/foo" or "foo/**/bar": zero or more directories
+                        regex.append("(?:.*/)?")
+                        i += 1
+                    i += 2
+                    continue
+                # Other consecutive asterisks are regular asterisks.
+                while i + 1 < length and pattern[i + 1] == "*":
+                    i += 1
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = i + 1
+            if end < length and pattern[end] in "!^":
+                end += 1
+            if end < length and pattern[end] == "]":
+                end += 1
+            while end < length and pattern[end] != "]":
+                end += 1
+            if end >= length:
+                regex.append(re.escape(char))
+            else:
+                content = pattern[i + 1 : end]
+                negate = content[0] in "!^"
+                if negate:
+                    content = content[1:]
+                escaped = "".join(c if c == "-" else re.escape(c) for c in content)
+                regex.append(("[^" if negate else "[") + escaped + "]")
+                i = end
+        elif char == "\\" and i + 1 < length:
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return "".join(regex)
+
+
+class IgnoreRules:
+    """
+    The patterns of one ignore file, compiled into a few combined regexes.
+
+    Consecutive patterns with the same sign are joined into one alternation, and
+    the groups are evaluated from the last one to the first, which implements
+    git's "the last matching pattern decides" rule with one regex call per group
+    instead of one `fnmatch` call per pattern.
+    """
+
+    def __init__(self, lines: List[str]):
+        """
+        Args:
+            lines (List[str]): Lines of the ignore file, paths are matched relative to its directory.
+        """
+        groups: List[tuple[bool, List[str], List[str]]] = []
+        for line in lines:
+            parsed = self.parse_line(line)
+            if parsed is None:
+                continue
+            negated, file_regex, dir_regex = parsed
+            if not groups or groups[-1][0] != negated:
+                groups.append((negated, [], []))
+            groups[-1][1].append(file_regex)
+            groups[-1][2].append(dir_regex)
+
+        self.groups = [
+            (
+                negated,
+                re.compile("|".join(file_regexes)),
+                re.compile("|".join(dir_regexes)),
+            )
+            for negated, file_regexes, dir_regexes in reversed(groups)
+        ]
+
+    @staticmethod
+    def parse_line(line: str) -> Optional[tuple[bool, str, str]]:
+        """
+        Parse one line of an ignore file.
+
+        Returns:
+            Optional[tuple[bool, str, str]]: Whether the pattern is negated, and the regexes
+                matching a file and a directory path, or None for blank lines and comments.
+        """
+        line = line.rstrip("\n").rstrip("\r")
+        # Trailing spaces are ignored unless escaped.
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+        if not line or line.startswith("#"):
+            return None
+
+        negated = line.startswith("!")
+        if negated or line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+
+        # A separator at the beginning or in the middle anchors the pattern to
+        # the directory of the ignore file, otherwise it matches at any level.
+        anchored = "/" in line
+        body = translate_pattern(line.lstrip("/"))
+        if not anchored:
+            body = "(?:.*/)?" + body
+
+        # Patterns only match the path itself. What is under an ignored directory
+        # is ignored by the parent checks of GitIgnoreMatcher, and what is under
+        # a re-included one is matched against the patterns again.
+        file_regex = "(?!)" if dir_only else f"(?:{body})"
+        dir_regex = f"(?:{body})"
+        return negated, file_regex, dir_regex
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Match a path relative to the ignore file's directory.
+
+        Only the patterns matching the path itself are considered, not those
+        matching one of its parent directories.
+
+        Args:
+            path (str): "/"-separated relative path.
+            is_dir (bool): Whether the path is a directory.
+
+        Returns:
+            Optional[bool]: True if ignored, False if re-included by a negated pattern,
+                None if no pattern matches.
+        """
+        for negated, file_regex, dir_regex in self.groups:
+            regex = dir_regex if is_dir else file_regex
+            if regex.fullmatch(path):
+                return not negated
+        return None
+
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "gitignore_templates")
+
+# Other names of the bundled templates, the tree-sitter module names included.
+TEMPLATE_ALIASES = {
+    "py": "python",
+    "tree_sitter_python": "python",
+    "js": "javascript",
+    "node": "javascript",
+    "typescript": "javascript",
+    "ts": "javascript",
+    "tree_sitter_javascript": "javascript",
+    "tree_sitter_java": "java",
+    "c": "cpp",
+    "c++": "cpp",
+    "tree_sitter_cpp": "cpp",
+    "golang": "go",
+}
+
+
+@lru_cache(maxsize=64)
+def compile_rules(patterns: Tuple[str, ...]) -> IgnoreRules:
+    """
+    Compile a pattern list once per process, `IgnoreRules` is immutable and shared.
+    """
+    return IgnoreRules(list(patterns))
+
+
+def find_template(language: str, templates_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Find the .gitignore template of a language.
+
+    Args:
+        language (str): Language name, case insensitive.
+        templates_dir (Optional[str]): Directory with custom `<language>.gitignore` files,
+            searched before the bundled templates.
+
+    Returns:
+        Optional[str]: Path of the template, or None if there is none for the language.
+    """
+    name = language.strip().lower()
+    name = TEMPLATE_ALIASES.get(name, name)
+    for directory in (templates_dir, TEMPLATES_DIR):
+        if directory:
+            path = os.path.join(directory, f"{name}.gitignore")
+            if os.path.isfile(path):
+                return path
+    return None
 
 
 class GitIgnoreMatcher:
-    def __init__(self, gitignore_path=None, default_language="python"):
+    def __init__(
+        self,
+        gitignore_path=None,
+        default_language="python",
+        use_git_index=True,
+        include_untracked=False,
+        max_workers=None,
+        verbose=False,
+        templates_dir=None,
+    ):
         """
         Initialize the GitIgnoreMatcher with optional path to the .gitignore file.
         Load and compile patterns from the .gitignore file.
@@ -13,15 +238,30 @@ class GitIgnoreMatcher:
         Args:
         gitignore_path (str): Path to the .gitignore file.
         default_language (str): Default language for the .gitignore file if not provided.
+        use_git_index (bool): List files from the git index when the checked directory is a git work tree.
+        include_untracked (bool): Also list untracked files that git does not ignore, in git index mode.
+        max_workers (int): Number of threads scanning directories, defaults to the ThreadPoolExecutor default.
+        verbose (bool): Print progress and every ignored path.
+        templates_dir (str): Directory with custom `<language>.gitignore` templates, searched before the bundled ones.
         """
         self.gitignore_path = gitignore_path
         self.default_language = default_language
+        self.use_git_index = use_git_index
+        self.include_untracked = include_untracked
+        self.max_workers = max_workers
+        self.verbose = verbose
+        self.templates_dir = templates_dir
         self.patterns = []
-        self.neg_patterns = []
-        self.pos_patterns = []
-        self.pattern_cache = {}  # Cache for pattern matching results
-        self.result_cache = {}  # Cache for is_ignored results
-        self.dir_cache = set()  # Cache for directories to skip
+        self.rules = IgnoreRules([])
+        self.base_directory = None
+        self.rules_chains = {}
+
+    def log(self, message):
+        """
+        Print a message when the matcher is verbose.
+        """
+        if self.verbose:
+            print(message)
 
     def load_gitignore_patterns(self, gitignore_path):
         """
@@ -33,200 +273,329 @@ class GitIgnoreMatcher:
         Returns:
         list: List of patterns from the .gitignore file.
         """
-        print(f"Loading .gitignore patterns from file: {gitignore_path}")
+        self.log(f"Loading .gitignore patterns from file: {gitignore_path}")
         with open(gitignore_path, "r") as f:
             return [
-                line.rstrip() for line in f if line.strip() and not line.startswith("#")
+                line.rstrip("\n")
+                for line in f
+                if line.strip() and not line.startswith("#")
             ]
 
     def compile_patterns(self):
         """
-        Compile patterns into categorized lists for efficient matching.
+        Compile the loaded patterns into combined regexes.
         """
-        self.root_patterns = defaultdict(list)
-        self.dir_patterns = []
-        self.file_patterns = []
+        self.rules = compile_rules(tuple(self.patterns))
+        self.rules_chains = {}
 
-        for pattern in self.pos_patterns:
-            if "/" in pattern:
-                if pattern.startswith("/"):
-                    root = pattern.split("/")[1]
-                    self.root_patterns[root].append(pattern[1:])
-                else:
-                    self.dir_patterns.append(pattern)
-            else:
-                self.file_patterns.append(pattern)
+    def set_base_directory(self, directory):
+        """
+        Set the directory that paths are relative to, and drop the ignore files loaded for another one.
+
+        Args:
+        directory (str): The checked directory.
+        """
+        if directory != self.base_directory:
+            self.base_directory = directory
+            self.rules_chains = {}
+
+    @staticmethod
+    def load_ignore_file(path):
+        """
+        Load and compile one ignore file.
+
+        Args:
+        path (str): Path to a .gitignore or exclude file.
+
+        Returns:
+        IgnoreRules: The compiled rules, or None if the file is missing or has no patterns.
+        """
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                rules = IgnoreRules(f.read().splitlines())
+        except OSError:
+            return None
+        return rules if rules.groups else None
 
-    def match_pattern(self, path, pattern):
+    def get_rules_chain(self, rel_dir):
         """
-        Match a path against a pattern, considering various special cases.
+        Get the stack of ignore rules that applies to the entries of a directory.
+
+        The stack of a directory is its parent's stack with the directory's own
+        .gitignore pushed on top, so the walk pushes a matcher when it enters a
+        directory and siblings never see it. The root stack holds, from the
+        lowest priority, the loaded patterns, .git/info/exclude and the root
+        .gitignore, which is the precedence git uses.
 
         Args:
-        path (str): The path to match.
-        pattern (str): The pattern to match against.
+        rel_dir (str): "/"-separated directory relative to the checked directory, "" for the root.
 
         Returns:
-        bool: True if the path matches the pattern, False otherwise.
-        """
-        cache_key = (path, pattern)
-        if cache_key in self.pattern_cache:
-            return self.pattern_cache[cache_key]
-
-        result = False
-        if pattern.startswith("/"):
-            # Match patterns relative to the root directory
-            result = fnmatch.fnmatch(path, pattern[1:])
-        elif pattern.endswith("/"):
-            # Match directories
-            result = os.path.isdir(path) and fnmatch.fnmatch(path + "/", pattern)
-        elif "**" in pattern:
-            # Handle double asterisk patterns
-            parts = pattern.split("**")
-            result = path.startswith(parts[0]) and path.endswith(parts[-1])
+        tuple: (prefix, IgnoreRules) pairs from the lowest to the highest priority, where
+            prefix is the directory of the ignore file with a trailing "/".
+        """
+        chain = self.rules_chains.get(rel_dir)
+        if chain is not None:
+            return chain
+
+        base_directory = self.base_directory or ""
+        if rel_dir:
+            chain = self.get_rules_chain(rel_dir.rpartition("/")[0])
+            prefix = rel_dir + "/"
         else:
-            # Match regular patterns
-            result = fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(
-                os.path.basename(path), pattern
+            chain = ()
+            if self.rules.groups:
+                chain += (("", self.rules),)
+            exclude_rules = self.load_ignore_file(
+                os.path.join(base_directory, ".git", "info", "exclude")
             )
+            if exclude_rules is not None:
+                chain += (("", exclude_rules),)
+            prefix = ""
+
+        rules = self.load_ignore_file(
+            os.path.join(base_directory, rel_dir, ".gitignore")
+        )
+        if rules is not None:
+            chain += ((prefix, rules),)
+        self.rules_chains[rel_dir] = chain
+        return chain
+
+    @staticmethod
+    def match_chain(chain, rel_path, is_dir):
+        """
+        Match a path against a stack of ignore rules, the deepest ignore file first.
 
-        self.pattern_cache[cache_key] = result
-        return result
+        Args:
+        chain (tuple): The stack returned by `get_rules_chain` for the path's directory.
+        rel_path (str): "/"-separated path relative to the checked directory.
+        is_dir (bool): Whether the path is a directory.
 
-    def is_ignored(self, path):
+        Returns:
+        bool: True if the path is ignored, False otherwise.
+        """
+        for prefix, rules in reversed(chain):
+            result = rules.match(rel_path[len(prefix) :], is_dir)
+            if result is not None:
+                return result
+        return False
+
+    def is_ignored(self, path, is_dir=None):
         """
         Check if a given path matches any ignore pattern.
 
+        The .gitignore files of every directory above the path are taken into
+        account, and a path inside an ignored directory is always ignored.
+
         Args:
-        path (str): The path to check.
+        path (str): The path to check, relative to the checked directory.
+        is_dir (bool): Whether the path is a directory, looked up on disk if not given.
 
         Returns:
         bool: True if the path is ignored, False otherwise.
         """
-        if path in self.result_cache:
-            return self.result_cache[path]
+        rel_path = os.path.normpath(path).replace(os.sep, "/")
+        if is_dir is None:
+            is_dir = os.path.isdir(os.path.join(self.base_directory or "", path))
+
+        parent = ""
+        for name in rel_path.split("/")[:-1]:
+            directory = f"{parent}/{name}" if parent else name
+            if self.match_chain(self.get_rules_chain(parent), directory, True):
+                return True
+            parent = directory
+        return self.match_chain(self.get_rules_chain(parent), rel_path, is_dir)
 
-        rel_path = os.path.normpath(path)
+    def load_template(self, language):
+        """
+        Load the .gitignore template patterns for one or more languages.
 
-        # Check negative patterns first
-        for pattern in self.neg_patterns:
-            if self.match_pattern(rel_path, pattern):
-                self.result_cache[path] = False
-                return False
+        Templates come from `templates_dir` or the templates bundled with the
+        package, the network is never used.
 
-        # Check root patterns
-        root = rel_path.split(os.sep)[0]
-        for pattern in self.root_patterns.get(root, []):
-            if self.match_pattern(rel_path, pattern):
-                self.result_cache[path] = True
-                return True
+        Args:
+        language (str): The language for the .gitignore file, several can be separated by commas.
 
-        # Check directory patterns
-        for pattern in self.dir_patterns:
-            if self.match_pattern(rel_path, pattern):
-                self.result_cache[path] = True
-                return True
+        Returns:
+        list: List of patterns from the templates.
+        """
+        patterns = []
+        for name in language.split(","):
+            template_path = find_template(name, self.templates_dir)
+            if template_path:
+                patterns.extend(self.load_gitignore_patterns(template_path))
+            else:
+                self.log(f"No .gitignore template for {name}")
+        return patterns
 
-        # Check file patterns
-        for pattern in self.file_patterns:
-            if self.match_pattern(rel_path, pattern):
-                self.result_cache[path] = True
-                return True
+    @property
+    def lists_git_index(self):
+        """
+        Whether git work trees are listed from the git index rather than scanned.
 
-        self.result_cache[path] = False
-        return False
+        git ls-files knows nothing of an explicitly supplied .gitignore file, only
+        the scanner applies it.
+        """
+        return self.use_git_index and not self.gitignore_path
 
-    def fetch_gitignore(self, language):
+    def list_git_files(self, directory):
         """
-        Fetch a .gitignore file for a specific language from the Toptal API.
+        List the files of a git work tree with `git ls-files`.
+
+        Git applies every .gitignore, .git/info/exclude and the global excludes
+        file itself, so the result has exact git semantics.
 
         Args:
-        language (str): The language for the .gitignore file.
+        directory (str): The root of the git work tree.
 
         Returns:
-        str: The path to the downloaded .gitignore file.
+        list: Paths relative to the directory, or None if it is not a git work tree.
         """
-        url = f"https://www.toptal.com/developers/gitignore/api/{language}"
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            gitignore_path = os.path.join(os.getcwd(), f"{language}.gitignore")
-            with open(gitignore_path, "w") as f:
-                f.write(response.text)
-            print(f"Downloaded .gitignore file for {language} at {gitignore_path}")
-            return gitignore_path
-        except requests.RequestException as e:
-            print(f"Failed to fetch .gitignore file for {language}: {e}")
+            repo = Repo(directory)
+            if repo.bare:
+                return None
+            args = ["-z", "--cached"]
+            if self.include_untracked:
+                args += ["--others", "--exclude-standard"]
+            output = repo.git.ls_files(*args)
+        except (InvalidGitRepositoryError, NoSuchPathError, GitCommandError):
             return None
 
+        files = []
+        seen = set()
+        for path in output.split("\0"):
+            # Skip unmerged duplicates, and entries that are not regular files on
+            # disk: deleted files and submodules.
+            if not path or path in seen:
+                continue
+            seen.add(path)
+            rel_path = os.path.normpath(path)
+            full_path = os.path.join(directory, rel_path)
+            if os.path.isfile(full_path) and not os.path.islink(full_path):
+                files.append(rel_path)
+        return files
+
+    def load_patterns(self, directory, language=None):
+        """
+        Load and compile the patterns applied on top of the ignore files of a directory.
+
+        The .gitignore files inside the directory are read during the walk, a
+        template only stands in for a missing root .gitignore.
+
+        Args:
+        directory (str): The directory to check.
+        language (str): The language for the .gitignore template (optional).
+        """
+        if self.patterns:
+            return
+        if self.gitignore_path:
+            self.patterns = self.load_gitignore_patterns(self.gitignore_path)
+        elif not os.path.exists(os.path.join(directory, ".gitignore")):
+            self.patterns = self.load_template(language or self.default_language)
+        self.compile_patterns()
+
     def check_directory(self, directory, language=None):
         """
         Check a directory and its contents against the ignore patterns.
 
+        Git work trees are listed from the git index when `use_git_index` is set
+        and no `gitignore_path` was supplied, other directories are scanned and
+        matched against the loaded patterns.
+
         Args:
         directory (str): The directory to check.
         language (str): The language for the .gitignore file (optional).
 
         Returns:
-        list: A list of paths that are not ignored.
+        list: A sorted list of paths that are not ignored.
         """
-        if not self.patterns:
-            if self.gitignore_path:
-                self.patterns = self.load_gitignore_patterns(self.gitignore_path)
-            else:
-                gitignore_path = os.path.join(directory, ".gitignore")
-                if not os.path.exists(gitignore_path):
-                    gitignore_path = self.fetch_gitignore(
-                        language or self.default_language
-                    )
-                if gitignore_path:
-                    self.patterns = self.load_gitignore_patterns(gitignore_path)
-
-            self.neg_patterns = [p[1:] for p in self.patterns if p.startswith("!")]
-            self.pos_patterns = [p for p in self.patterns if not p.startswith("!")]
-            self.compile_patterns()
-
-        not_ignored = []
-        print(f"Checking directory: {directory}")
-
-        for entry in os.scandir(directory):
-            if entry.is_dir(follow_symlinks=False):
-                self.scan_directory(entry.path, not_ignored, directory)
-            elif entry.is_file(follow_symlinks=False):
-                rel_path = os.path.relpath(entry.path, directory)
-                if not self.is_ignored(rel_path):
-                    not_ignored.append(rel_path)
-                else:
-                    print(f"Path ignored: {rel_path}")
+        self.set_base_directory(directory)
+        if self.lists_git_index:
+            files = self.list_git_files(directory)
+            if files is not None:
+                self.log(f"Listed {len(files)} files from the git index: {directory}")
+                return sorted(files)
+
+        self.load_patterns(directory, language)
+        self.log(f"Checking directory: {directory}")
+        # The walk yields in completion order, sorting keeps the result stable.
+        return sorted(self.walk_directory(directory))
+
+    def walk_directory(self, directory):
+        """
+        Walk a directory concurrently and yield the paths that are not ignored.
+
+        Every directory is scanned by a task on a thread pool, so the `scandir`
+        calls of sibling directories overlap. Ignored directories are pruned
+        before they are scheduled. Paths are yielded as soon as their directory
+        has been scanned, in no particular order.
 
-        return not_ignored
+        Args:
+        directory (str): The directory to walk.
 
-    def scan_directory(self, dir_path, not_ignored, base_directory):
+        Yields:
+        str: Paths relative to the directory that are not ignored.
         """
-        Recursively scan a directory and its contents against the ignore patterns.
+        self.set_base_directory(directory)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            pending = {executor.submit(self.scan_directory, directory, "")}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirectories = future.result()
+                    for dir_path, rel_dir in subdirectories:
+                        pending.add(
+                            executor.submit(self.scan_directory, dir_path, rel_dir)
+                        )
+                    yield from files
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def scan_directory(self, dir_path, rel_dir):
+        """
+        Scan the entries of one directory against the ignore patterns.
 
         Args:
         dir_path (str): The path of the directory to scan.
-        not_ignored (list): The list to store paths that are not ignored.
-        base_directory (str): The base directory to calculate relative paths.
+        rel_dir (str): The path of the directory relative to the walked directory, "" for the root.
+
+        Returns:
+        tuple: The files that are not ignored, and (path, relative path) pairs of
+            the subdirectories to descend into.
         """
-        for entry in os.scandir(dir_path):
-            rel_path = os.path.relpath(entry.path, base_directory)
+        files = []
+        subdirectories = []
+        chain = self.get_rules_chain(rel_dir.replace(os.sep, "/"))
+        try:
+            entries = list(os.scandir(dir_path))
+        except OSError as e:
+            self.log(f"Failed to scan directory {dir_path}: {e}")
+            return files, subdirectories
+
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            match_path = rel_path.replace(os.sep, "/")
             if entry.is_dir(follow_symlinks=False):
-                if not self.is_ignored(rel_path):
-                    self.scan_directory(entry.path, not_ignored, base_directory)
+                if entry.name == ".git":
+                    continue
+                if not self.match_chain(chain, match_path, True):
+                    subdirectories.append((entry.path, rel_path))
                 else:
-                    print(f"Directory ignored: {rel_path}")
+                    self.log(f"Directory ignored: {rel_path}")
             elif entry.is_file(follow_symlinks=False):
-                if not self.is_ignored(rel_path):
-                    not_ignored.append(rel_path)
+                if not self.match_chain(chain, match_path, False):
+                    files.append(rel_path)
                 else:
-                    print(f"Path ignored: {rel_path}")
+                    self.log(f"Path ignored: {rel_path}")
+        return files, subdirectories
 
 
 # Example usage
 if __name__ == "__main__":
     gitignore_path = ".gitignore"  # or provide a specific path
-    matcher = GitIgnoreMatcher(gitignore_path)
+    matcher = GitIgnoreMatcher(gitignore_path, verbose=True)
     directory_to_check = (
         "./directory_to_check"  # replace with the actual directory path
     )
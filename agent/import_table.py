@@ -0,0 +1,207 @@
+# agent/import_table.py
+import os
+from typing import Dict, Iterable, Optional
+from tree_sitter import Node
+from agent.symbol_index import qualified_name
+
+
+class ModuleIndex:
+    """
+    Map dotted module names to the repository files defining them.
+
+    A file is registered under its dotted path from the repository root, and
+    also without its leading directories that are not packages (no
+    `__init__.py`), so "src/pkg/mod.py" and "RepoAgent/repo_agent/runner.py"
+    are found as "pkg.mod" and "repo_agent.runner".
+    """
+
+    def __init__(self, file_paths: Iterable[str]):
+        file_paths = [os.path.normpath(path) for path in file_paths]
+        packages = {
+            os.path.dirname(path)
+            for path in file_paths
+            if os.path.basename(path) == "__init__.py"
+        }
+        self.modules: Dict[str, str] = {}
+        self.module_names: Dict[str, str] = {}
+        for path in file_paths:
+            if not path.endswith(".py"):
+                continue
+            parts = path[: -len(".py")].split(os.sep)
+            if parts[-1] == "__init__":
+                parts.pop()
+            # Strip leading directories until the rest is a package chain.
+            start = 0
+            names = []
+            while start < len(parts):
+                names.append(".".join(parts[start:]))
+                directory = os.sep.join(parts[: start + 1])
+                if directory in packages:
+                    break
+                start += 1
+            for name in names:
+                if name:
+                    self.modules.setdefault(name, path)
+            # The shortest name is the one the file is imported by.
+            if names and names[-1]:
+                self.module_names[path] = names[-1]
+
+    def module_name(self, file_path: str) -> Optional[str]:
+        """
+        Get the dotted module name of a repository file.
+        """
+        return self.module_names.get(os.path.normpath(file_path))
+
+    def locate(self, dotted_name: str) -> Optional[str]:
+        """
+        Turn a dotted name into a qualified name of a repository definition.
+
+        Args:
+            dotted_name (str): e.g. "pkg.mod.Class.method".
+
+        Returns:
+            Optional[str]: e.g. "pkg/mod.py::Class.method", "pkg/mod.py::" for a module
+                itself, or None if no repository module matches.
+        """
+        parts = dotted_name.split(".")
+        for end in range(len(parts), 0, -1):
+            path = self.modules.get(".".join(parts[:end]))
+            if path is not None:
+                return qualified_name(path, *parts[end:])
+        return None
+
+    def locate_import(self, file_path: str, target: str) -> Optional[str]:
+        """
+        Like `locate`, for an import target of a file that may still be relative.
+
+        Args:
+            file_path (str): Path of the importing file.
+            target (str): e.g. "pkg.util.helper" or "..util.helper".
+
+        Returns:
+            Optional[str]: The qualified name of the repository definition, the absolute
+                dotted name outside the repository, or None if a relative target
+                cannot be resolved.
+        """
+        if target.startswith("."):
+            module = target.lstrip(".")
+            table = ImportTable.for_file(file_path, self)
+            target = table.resolve_relative(len(target) - len(module), module)
+            if target is None or target.startswith("."):
+                return None
+        return self.locate(target) or target
+
+
+class ImportTable:
+    """
+    The names bound by the import statements of one Python file.
+
+    Every local name, `as` aliases and the dotted prefixes of `import a.b.c`
+    included, maps to a fully qualified dotted name, so a call name resolves
+    with one dictionary lookup per dotted component instead of a scan over
+    all imports.
+    """
+
+    def __init__(self, package: Optional[str] = None):
+        """
+        Args:
+            package (Optional[str]): Dotted name of the package containing the file,
+                "" for a top-level module, None if unknown (relative imports then keep their
+                leading dots, to be resolved with `ModuleIndex.locate_import`).
+        """
+        self.package = package
+        self.bindings: Dict[str, str] = {}
+
+    @classmethod
+    def for_file(cls, file_path: str, module_index: Optional[ModuleIndex] = None):
+        """
+        Create the table of a file, locating its package in the repository layout.
+        """
+        package = None
+        module_name = module_index.module_name(file_path) if module_index else None
+        if module_name is not None:
+            is_package = os.path.basename(file_path) == "__init__.py"
+            package = module_name if is_package else module_name.rpartition(".")[0]
+        return cls(package)
+
+    def resolve_relative(self, level: int, module: str) -> Optional[str]:
+        """
+        Resolve the module of `from ..module import name` against the file's package.
+        """
+        if self.package is None:
+            return "." * level + module
+        parts = self.package.split(".") if self.package else []
+        # Each dot past the first climbs one package; none may leave the top level.
+        if level - 1 >= len(parts):
+            return None
+        base = parts[: len(parts) - (level - 1)]
+        if module:
+            base.append(module)
+        return ".".join(base)
+
+    def add_import_node(self, node: Node, source_code: bytes):
+        """
+        Record the names bound by an `import_statement` or `import_from_statement` node.
+        """
+
+        def text(n: Node) -> str:
+            return source_code[n.start_byte : n.end_byte].decode("utf-8")
+
+        if node.type == "import_statement":
+            for name_node in node.children_by_field_name("name"):
+                if name_node.type == "aliased_import":
+                    target = text(name_node.child_by_field_name("name"))
+                    self.bindings[text(name_node.child_by_field_name("alias"))] = target
+                else:
+                    # "import a.b.c" binds "a", through which "a.b" and "a.b.c" are reached.
+                    parts = text(name_node).split(".")
+                    for end in range(1, len(parts) + 1):
+                        prefix = ".".join(parts[:end])
+                        self.bindings[prefix] = prefix
+            return
+
+        if node.type != "import_from_statement":
+            return
+        module_node = node.child_by_field_name("module_name")
+        if module_node is None:
+            return
+        if module_node.type == "relative_import":
+            level = 0
+            module = ""
+            for child in module_node.children:
+                if child.type == "import_prefix":
+                    level = child.end_byte - child.start_byte
+                elif child.type == "dotted_name":
+                    module = text(child)
+            module = self.resolve_relative(level, module)
+            if module is None:
+                return
+        else:
+            module = text(module_node)
+
+        for name_node in node.children_by_field_name("name"):
+            if name_node.type == "aliased_import":
+                name = text(name_node.child_by_field_name("name"))
+                local = text(name_node.child_by_field_name("alias"))
+            else:
+                name = local = text(name_node)
+            separator = "" if module.endswith(".") else "."
+            self.bindings[local] = f"{module}{separator}{name}"
+
+    def resolve(self, name: str) -> Optional[str]:
+        """
+        Resolve a dotted name used in the file to the fully qualified name it refers to.
+
+        Args:
+            name (str): e.g. "np.array", "helper" or "os.path.join".
+
+        Returns:
+            Optional[str]: e.g. "numpy.array", "pkg.util.helper", "os.path.join", or None
+                if the name is not bound by an import.
+        """
+        parts = name.split(".")
+        for end in range(len(parts), 0, -1):
+            target = self.bindings.get(".".join(parts[:end]))
+            if target is not None:
+                return ".".join([target, *parts[end:]])
+        return None
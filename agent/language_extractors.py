@@ -0,0 +1,415 @@
+# agent/language_extractors.py
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
+from tree_sitter import Node
+from agent.schemas import (
+    ClassInfo,
+    DecoratorInfo,
+    ExpressionInfo,
+    FileData,
+    FunctionInfo,
+    ImportInfo,
+    TopLevelInfo,
+)
+
+# Node types holding the name of a declaration, where the "declarator" chain of C/C++ ends.
+NAME_TYPES = frozenset(
+    [
+        "identifier",
+        "field_identifier",
+        "property_identifier",
+        "private_property_identifier",
+        "type_identifier",
+        "qualified_identifier",
+        "scoped_identifier",
+        "scoped_type_identifier",
+        "destructor_name",
+        "operator_name",
+        "member_expression",
+    ]
+)
+
+
+@dataclass(frozen=True)
+class LanguageSpec:
+    """
+    Node types of a tree-sitter grammar, mapped onto the sections of `FileData`.
+    """
+
+    import_types: FrozenSet[str]
+    class_types: FrozenSet[str]
+    function_types: FrozenSet[str]
+    # Top-level statements kept as they are.
+    top_level_types: FrozenSet[str]
+    # Class members other than methods, e.g. field declarations.
+    member_types: FrozenSet[str]
+    # Nodes whose children are visited as if they were at the same level:
+    # namespaces, export statements, templates, preprocessor conditionals...
+    transparent_types: FrozenSet[str] = frozenset()
+    comment_types: FrozenSet[str] = frozenset(["comment"])
+    decorator_types: FrozenSet[str] = frozenset()
+    # Children of a class declaration naming its base classes.
+    heritage_types: FrozenSet[str] = frozenset()
+    # Variable declarations that define a function when their value is one of
+    # `function_value_types`, e.g. `const f = () => {}` in JavaScript.
+    variable_types: FrozenSet[str] = frozenset()
+    function_value_types: FrozenSet[str] = frozenset()
+
+
+class LanguageExtractor:
+    """
+    Extract the `FileData` of a syntax tree, in a grammar-independent way driven by a `LanguageSpec`.
+
+    A function sketch is its signature, the source from the start of the
+    definition up to its body, preceded by the comments right above it, which
+    is where these languages put their documentation.
+    """
+
+    def __init__(self, spec: LanguageSpec):
+        self.spec = spec
+
+    def extract(self, root_node: Node, source_code: bytes) -> FileData:
+        """
+        Args:
+            root_node (Node): Root of the syntax tree.
+            source_code (bytes): The source code of the file.
+
+        Returns:
+            FileData: The structure of the file.
+        """
+        data = FileData()
+        spec = self.spec
+        # Each frame iterates the children of a node visited at the top level.
+        stack = [iter(root_node.children)]
+        comments: List[Node] = []
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                continue
+
+            node_type = node.type
+            if node_type in spec.comment_types:
+                comments = self.extend_comments(comments, node)
+                continue
+            leading_comments = self.leading_comments(comments, node)
+            comments = []
+
+            if node_type in spec.import_types:
+                data.imports.append(
+                    ImportInfo(
+                        **self.lines(node), text=self.text(node, source_code).rstrip()
+                    )
+                )
+            elif node_type in spec.class_types:
+                if node.child_by_field_name("body") is not None:
+                    self.process_class(node, source_code, data, "")
+            elif node_type in spec.function_types:
+                data.functions.append(
+                    self.function_info(node, source_code, leading_comments)
+                )
+            elif node_type in spec.variable_types and self.function_declarators(node):
+                for name, value in self.function_declarators(node):
+                    data.functions.append(
+                        self.function_info(
+                            node, source_code, leading_comments, name, value
+                        )
+                    )
+            elif node_type in spec.transparent_types:
+                stack.append(iter(node.children))
+            elif node_type in spec.top_level_types:
+                data.top_level.append(
+                    TopLevelInfo(**self.lines(node), text=self.text(node, source_code))
+                )
+        return data
+
+    def process_class(
+        self, class_node: Node, source_code: bytes, data: FileData, prefix: str
+    ):
+        """
+        Add a class and, after it, the classes nested in its body.
+
+        Args:
+            class_node (Node): The class declaration.
+            source_code (bytes): The source code of the file.
+            data (FileData): The structure the classes are added to.
+            prefix (str): Qualified name of the enclosing class followed by ".", "" at the top level.
+        """
+        spec = self.spec
+        name = prefix + self.name(class_node, source_code)
+        bases = []
+        for child in class_node.children:
+            if child.type in spec.heritage_types:
+                bases.extend(self.type_names(child, source_code))
+        class_info = ClassInfo(
+            class_name=f"{name}({', '.join(bases)})" if bases else name,
+            class_decorators=self.decorators(class_node, source_code),
+            **self.lines(class_node),
+        )
+        data.classes.append(class_info)
+
+        nested = []
+        stack = [iter(class_node.child_by_field_name("body").children)]
+        comments: List[Node] = []
+        while stack:
+            member = next(stack[-1], None)
+            if member is None:
+                stack.pop()
+                continue
+
+            member_type = member.type
+            if member_type in spec.comment_types:
+                comments = self.extend_comments(comments, member)
+                continue
+            leading_comments = self.leading_comments(comments, member)
+            comments = []
+
+            if member_type in spec.function_types:
+                class_info.functions.append(
+                    self.function_info(member, source_code, leading_comments)
+                )
+            elif member_type in spec.class_types:
+                if member.child_by_field_name("body") is not None:
+                    nested.append(member)
+            elif member_type in spec.transparent_types:
+                stack.append(iter(member.children))
+            elif member_type in spec.member_types:
+                class_info.expressions.append(
+                    ExpressionInfo(
+                        **self.lines(member), text=self.text(member, source_code)
+                    )
+                )
+
+        for member in nested:
+            self.process_class(member, source_code, data, f"{name}.")
+
+    def function_info(
+        self,
+        node: Node,
+        source_code: bytes,
+        comments: List[Node],
+        name: Optional[str] = None,
+        function_node: Optional[Node] = None,
+    ) -> FunctionInfo:
+        """
+        Build the `FunctionInfo` of a function definition.
+
+        Args:
+            node (Node): The definition, or the variable declaration holding the function.
+            source_code (bytes): The source code of the file.
+            comments (List[Node]): The comments right above the definition.
+            name (Optional[str]): The function name when it is not a field of `node`.
+            function_node (Optional[Node]): The function itself when `node` is a declaration.
+        """
+        body = (function_node or node).child_by_field_name("body")
+        signature_end = body.start_byte if body is not None else node.end_byte
+        signature = source_code[node.start_byte : signature_end].decode("utf-8")
+        signature = " ".join(signature.split()).rstrip(";").rstrip()
+        comments_str = "".join(f"{self.text(c, source_code)}\n" for c in comments)
+        return FunctionInfo(
+            function_name=name or self.name(node, source_code),
+            sketch=f"{comments_str}{signature}",
+            **self.lines(node),
+            text=self.text(node, source_code),
+        )
+
+    def function_declarators(self, node: Node) -> List[tuple[str, Node]]:
+        """
+        Find the declarators of a variable declaration whose value is a function.
+
+        Returns:
+            List[tuple[str, Node]]: Variable name and function node pairs.
+        """
+        functions = []
+        for child in node.named_children:
+            value = child.child_by_field_name("value")
+            name = child.child_by_field_name("name")
+            if (
+                value is not None
+                and name is not None
+                and value.type in self.spec.function_value_types
+            ):
+                functions.append((name.text.decode("utf-8"), value))
+        return functions
+
+    def decorators(self, node: Node, source_code: bytes) -> List[DecoratorInfo]:
+        """
+        Get the decorators or annotations of a declaration, including those in its modifiers.
+        """
+        decorators = []
+        candidates = list(node.children)
+        for child in node.children:
+            if child.type == "modifiers":
+                candidates.extend(child.children)
+        for child in candidates:
+            if child.type in self.spec.decorator_types:
+                decorators.append(
+                    DecoratorInfo(
+                        decorator_name=self.text(child, source_code),
+                        **self.lines(child),
+                    )
+                )
+        return decorators
+
+    def name(self, node: Node, source_code: bytes) -> str:
+        """
+        Get the name of a declaration, following the declarator chain of C/C++ definitions.
+        """
+        current = node
+        while current is not None:
+            if current is not node and current.type in NAME_TYPES:
+                return self.text(current, source_code)
+            name_node = current.child_by_field_name("name")
+            if name_node is not None:
+                return self.text(name_node, source_code)
+            current = current.child_by_field_name("declarator")
+        return ""
+
+    def type_names(self, node: Node, source_code: bytes) -> List[str]:
+        """
+        Collect the outermost type names below a node, e.g. the bases of a class.
+        """
+        names = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current is not node and current.type in NAME_TYPES:
+                names.append(self.text(current, source_code))
+            elif current.type not in ("type_arguments", "template_argument_list"):
+                stack.extend(reversed(current.named_children))
+        return names
+
+    @staticmethod
+    def extend_comments(comments: List[Node], comment: Node) -> List[Node]:
+        """
+        Add a comment to the run of comments on consecutive lines, or start a new run.
+        """
+        if comments and comments[-1].end_point[0] + 1 < comment.start_point[0]:
+            return [comment]
+        return comments + [comment]
+
+    @staticmethod
+    def leading_comments(comments: List[Node], node: Node) -> List[Node]:
+        """
+        Keep a run of comments only if it ends on the line right above the node.
+        """
+        if comments and comments[-1].end_point[0] + 1 == node.start_point[0]:
+            return comments
+        return []
+
+    @staticmethod
+    def lines(node: Node) -> dict:
+        end_line, end_column = node.end_point
+        # Nodes such as preprocessor directives end after their newline.
+        if end_column == 0 and end_line > node.start_point[0]:
+            end_line -= 1
+        return {"start_line": node.start_point[0] + 1, "end_line": end_line + 1}
+
+    @staticmethod
+    def text(node: Node, source_code: bytes) -> str:
+        return source_code[node.start_byte : node.end_byte].decode("utf-8")
+
+
+JAVA_SPEC = LanguageSpec(
+    import_types=frozenset(["import_declaration"]),
+    class_types=frozenset(
+        [
+            "class_declaration",
+            "interface_declaration",
+            "enum_declaration",
+            "record_declaration",
+            "annotation_type_declaration",
+        ]
+    ),
+    function_types=frozenset(
+        [
+            "method_declaration",
+            "constructor_declaration",
+            "compact_constructor_declaration",
+        ]
+    ),
+    top_level_types=frozenset(["package_declaration"]),
+    member_types=frozenset(
+        [
+            "field_declaration",
+            "constant_declaration",
+            "enum_constant",
+            "static_initializer",
+        ]
+    ),
+    transparent_types=frozenset(["enum_body_declarations"]),
+    comment_types=frozenset(["line_comment", "block_comment"]),
+    decorator_types=frozenset(["annotation", "marker_annotation"]),
+    heritage_types=frozenset(["superclass", "super_interfaces", "extends_interfaces"]),
+)
+
+JAVASCRIPT_SPEC = LanguageSpec(
+    import_types=frozenset(["import_statement"]),
+    class_types=frozenset(["class_declaration"]),
+    function_types=frozenset(
+        ["function_declaration", "generator_function_declaration", "method_definition"]
+    ),
+    top_level_types=frozenset(
+        [
+            "expression_statement",
+            "lexical_declaration",
+            "variable_declaration",
+            "export_statement",
+        ]
+    ),
+    member_types=frozenset(["field_definition", "class_static_block"]),
+    transparent_types=frozenset(["export_statement"]),
+    decorator_types=frozenset(["decorator"]),
+    heritage_types=frozenset(["class_heritage"]),
+    variable_types=frozenset(["lexical_declaration", "variable_declaration"]),
+    function_value_types=frozenset(
+        ["arrow_function", "function_expression", "function", "generator_function"]
+    ),
+)
+
+CPP_SPEC = LanguageSpec(
+    import_types=frozenset(
+        ["preproc_include", "using_declaration", "alias_declaration"]
+    ),
+    class_types=frozenset(["class_specifier", "struct_specifier", "union_specifier"]),
+    function_types=frozenset(["function_definition"]),
+    top_level_types=frozenset(
+        ["declaration", "expression_statement", "type_definition"]
+    ),
+    member_types=frozenset(["field_declaration", "declaration"]),
+    transparent_types=frozenset(
+        [
+            "namespace_definition",
+            "declaration_list",
+            "template_declaration",
+            "linkage_specification",
+            "preproc_ifdef",
+            "preproc_if",
+            "preproc_else",
+            "preproc_elif",
+        ]
+    ),
+    heritage_types=frozenset(["base_class_clause"]),
+)
+
+# Languages without an entry here are handled by `SingleFileMap` itself (Python).
+_EXTRACTORS: Dict[str, LanguageExtractor] = {}
+
+
+def register_extractor(language: str, extractor: LanguageExtractor):
+    """
+    Register the extractor of a language registered in `agent.parser_registry`.
+    """
+    _EXTRACTORS[language] = extractor
+
+
+def get_extractor(language: str) -> Optional[LanguageExtractor]:
+    """
+    Get the extractor registered for a language, if any.
+    """
+    return _EXTRACTORS.get(language)
+
+
+register_extractor("java", LanguageExtractor(JAVA_SPEC))
+register_extractor("javascript", LanguageExtractor(JAVASCRIPT_SPEC))
+register_extractor("cpp", LanguageExtractor(CPP_SPEC))
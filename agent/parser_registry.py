@@ -0,0 +1,120 @@
+# agent/parser_registry.py
+import importlib
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+from tree_sitter import Language, Parser
+
+# Grammars are registered by name and only imported the first time they are used.
+_LOADERS: Dict[str, Callable[[], object]] = {}
+_MODULES: Dict[str, str] = {}
+_EXTENSIONS: Dict[str, str] = {}
+
+_languages: Dict[str, Language] = {}
+_languages_lock = threading.Lock()
+_thread_local = threading.local()
+
+
+def register_language(
+    name: str,
+    module_name: str,
+    extensions: List[str],
+    loader: Optional[Callable[[], object]] = None,
+):
+    """
+    Register a tree-sitter grammar without loading it.
+
+    Args:
+        name (str): Language name, e.g. "python".
+        module_name (str): Module providing the grammar, e.g. "tree_sitter_python".
+        extensions (List[str]): File extensions handled by the grammar.
+        loader (Optional[Callable[[], object]]): Hook returning the language pointer,
+            defaults to importing `module_name` and calling its `language()`.
+    """
+    if loader is None:
+
+        def loader():
+            return importlib.import_module(module_name).language()
+
+    _LOADERS[name] = loader
+    _MODULES[name] = module_name
+    for ext in extensions:
+        _EXTENSIONS[ext] = name
+
+
+def resolve_language_name(name: str) -> str:
+    """
+    Accept either a registered language name or its grammar module name.
+    """
+    if name in _LOADERS:
+        return name
+    for language_name, module_name in _MODULES.items():
+        if module_name == name:
+            return language_name
+    raise ValueError(f"Unsupported language: {name}")
+
+
+def language_for_extension(ext: str) -> Optional[str]:
+    """
+    Get the name of the language registered for a file extension, if any.
+    """
+    return _EXTENSIONS.get(ext)
+
+
+def language_module(name: str) -> str:
+    """
+    Get the grammar module name of a registered language.
+    """
+    return _MODULES[resolve_language_name(name)]
+
+
+def get_language(name: str) -> Language:
+    """
+    Get the `Language` of a registered grammar, loading it once per process.
+    """
+    name = resolve_language_name(name)
+    language = _languages.get(name)
+    if language is None:
+        with _languages_lock:
+            language = _languages.get(name)
+            if language is None:
+                language = Language(_LOADERS[name]())
+                _languages[name] = language
+    return language
+
+
+def get_parser(name: str) -> Parser:
+    """
+    Get a parser for a registered language.
+
+    Parsers are not thread safe, so each thread gets its own parser per language,
+    which is then reused for every file that thread parses.
+    """
+    name = resolve_language_name(name)
+    parsers = getattr(_thread_local, "parsers", None)
+    if parsers is None:
+        parsers = _thread_local.parsers = {}
+    parser = parsers.get(name)
+    if parser is None:
+        parser = parsers[name] = Parser(get_language(name))
+    return parser
+
+
+def _reset_after_fork():
+    global _languages_lock
+    # The lock may have been held by another thread at fork time.
+    _languages_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+register_language("python", "tree_sitter_python", [".py"])
+register_language("java", "tree_sitter_java", [".java"])
+register_language(
+    "javascript", "tree_sitter_javascript", [".js", ".jsx", ".mjs", ".cjs"]
+)
+register_language(
+    "cpp",
+    "tree_sitter_cpp",
+    [".cpp", ".cc", ".cxx", ".c++", ".hpp", ".hh", ".hxx", ".h"],
+)
@@ -3,6 +3,7 @@ from git import Repo
 from agent.console import console
 from pydantic import ValidationError
 from agent.schemas import GitUrl, RepoName, DirectoryPath, RepoCloneConfig
+from agent.structure_updater import sync_repo_structure
 from pathlib import Path
 from typing import Optional
 
@@ -13,7 +14,15 @@ def clone_repo(
     target_repo_name: Optional[RepoName] = None,
     target_repo_path: Optional[DirectoryPath] = None,
     target_repo_commit_hash: Optional[str] = None,
+    repo_structure_path: Optional[Path] = None,
 ):
+    """
+    Clone or open the target repository and optionally check out a commit.
+
+    If `repo_structure_path` points to an existing structure, it is brought to
+    `target_repo_commit_hash`: updated incrementally when it records that it was
+    generated at the previously checked out commit, rebuilt otherwise.
+    """
     try:
         config = RepoCloneConfig(
             target_repo_name=target_repo_name,
@@ -48,7 +57,15 @@ def clone_repo(
             console.print(
                 f"Checking out commit hash '{target_repo_commit_hash}'...", style="info"
             )
+            base_commit_hash = target_repo.head.commit.hexsha
             target_repo.git.checkout(target_repo_commit_hash)
+            if repo_structure_path and Path(repo_structure_path).exists():
+                sync_repo_structure(
+                    repo_structure_path,
+                    str(repo_info.get("path", repo_info["workspace_path"])),
+                    base_commit_hash,
+                    target_repo_commit_hash,
+                )
             return target_repo
 
     except Exception as e:
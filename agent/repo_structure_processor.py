@@ -1,29 +1,40 @@
 # agent/repo_structure_processor.py
-import json
 from agent.schemas import (
     FileMapType,
-    FileData,
     SimpleFileData,
     SimpleFileMapType,
 )
 from pydantic import FilePath
 from agent.structure_filter import StructureFilter
+from agent.structure_binary import BinaryStructureStore
+from agent.structure_store import LazyStructureStore, open_structure
+from agent.structure_writer import JsonStructureWriter
+from agent.symbol_index import SymbolIndex, bare_class_name
 
 
 class RepoStructureProcessor:
     def __init__(self, repo_structure_path: FilePath):
         """
-        初始化时，加载并解析 repo_structure.json 文件，生成 Pydantic 模型。
+        初始化时只读取仓库结构文件（JSON 或二进制格式）的索引，文件的 Pydantic 模型在首次访问时才解析并缓存。
         """
-        with open(repo_structure_path, "r") as f:
-            repo_structure_dict = json.load(f)
-
-        self.repo_structure: FileMapType = {
-            file_path: FileData.model_validate(file_data)
-            for file_path, file_data in repo_structure_dict.items()
-        }
+        self.repo_structure: LazyStructureStore | BinaryStructureStore = open_structure(
+            repo_structure_path
+        )
 
         self.filter = StructureFilter(self.repo_structure)
+        self.symbols = SymbolIndex(self.repo_structure)
+
+    def close(self):
+        """
+        关闭仓库结构文件。
+        """
+        self.repo_structure.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def extract_class_methods(self, input_json_data: SimpleFileMapType):
         """
@@ -37,34 +48,36 @@ class RepoStructureProcessor:
         }
 
         for input_file_path, input_class_item in input_json_data.items():
-            repo_file_data = self.repo_structure.get(input_file_path)
+            class_names = [cls.class_name for cls in input_class_item.classes]
+            # LLM 给出的路径不一定正确，借助符号索引定位真正定义这些类的文件
+            file_path = self.symbols.resolve_file(input_file_path, class_names)
+            if file_path is None:
+                continue
+            repo_file_data = self.repo_structure[file_path]
+
+            # 筛选类
+            filtered_file_data = self.filter.filter_classes(repo_file_data, class_names)
 
-            if repo_file_data:
-                # 筛选类
-                class_names = [cls.class_name for cls in input_class_item.classes]
-                filtered_file_data = self.filter.filter_classes(
-                    repo_file_data, class_names
+            input_classes = {}
+            for input_class in input_class_item.classes:
+                input_classes[input_class.class_name] = input_class
+                input_classes.setdefault(
+                    bare_class_name(input_class.class_name), input_class
                 )
 
-                # 对每个类进行函数筛选
-                for cls in filtered_file_data.classes:
-                    input_class = next(
-                        (
-                            c
-                            for c in input_class_item.classes
-                            if c.class_name == cls.class_name
-                        ),
-                        None,
+            # 对每个类进行函数筛选（替换为筛选后的副本，不修改仓库结构中缓存的模型）
+            for i, cls in enumerate(filtered_file_data.classes):
+                input_class = input_classes.get(cls.class_name) or input_classes.get(
+                    bare_class_name(cls.class_name)
+                )
+                if input_class:
+                    function_names = [
+                        func.function_name for func in input_class.functions
+                    ]
+                    filtered_file_data.classes[i] = self.filter.filter_functions(
+                        cls, function_names
                     )
-                    if input_class:
-                        function_names = [
-                            func.function_name for func in input_class.functions
-                        ]
-                        filtered_class = self.filter.filter_functions(
-                            cls, function_names
-                        )
-                        cls.functions = filtered_class.functions
-                results[input_file_path] = filtered_file_data
+            results[file_path] = filtered_file_data
 
         return results
 
@@ -74,18 +87,12 @@ class RepoStructureProcessor:
         """
         将过滤后的结构保存为 JSON 文件。
         """
-        json_content = json.dumps(
-            {k: v.model_dump() for k, v in filtered_structure.items()},
-            ensure_ascii=False,
-            indent=2,
-        )
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(json_content)
+        with JsonStructureWriter(output_path) as writer:
+            for file_path, file_data in filtered_structure.items():
+                writer.write(file_path, file_data)
 
 
 if __name__ == "__main__":
-    processor = RepoStructureProcessor(repo_structure_path="./repo_structure.json")
-
     input_json_data = {
         "./RepoAgent/repo_agent/doc_meta_info.py": {
             "classes": [
@@ -119,7 +126,10 @@ if __name__ == "__main__":
         },
     }
 
-    filtered_structure = processor.extract_class_methods(input_json_data)
-    processor.save_filtered_structure(
-        filtered_structure, "filtered_repo_structure.json"
-    )
+    with RepoStructureProcessor(
+        repo_structure_path="./repo_structure.json"
+    ) as processor:
+        filtered_structure = processor.extract_class_methods(input_json_data)
+        processor.save_filtered_structure(
+            filtered_structure, "filtered_repo_structure.json"
+        )
@@ -81,16 +81,32 @@ class TopLevelInfo(BasicInfo):
     pass
 
 
+class DecoratorInfo(LineInfo):
+    decorator_name: str
+
+
+class ParameterInfo(BaseModel):
+    name: str
+    type: Optional[str] = None
+
+
 class FunctionInfo(BasicInfo):
     """Model to represent function information."""
 
     function_name: str
     sketch: str
     trimmed_code_start_line: Optional[int] = None  # 新增字段
+    parameters: List[ParameterInfo] = Field(default_factory=list)
+    return_type: Optional[str] = None
+    is_async: bool = False
+    decorators: List[DecoratorInfo] = Field(default_factory=list)
 
 
-class DecoratorInfo(LineInfo):
-    decorator_name: str
+class AttributeInfo(LineInfo):
+    """Model to represent a class attribute assigned in the class body."""
+
+    name: str
+    value: str
 
 
 class ClassInfo(LineInfo):
@@ -100,12 +116,24 @@ class ClassInfo(LineInfo):
     class_decorators: List[DecoratorInfo] = Field(default_factory=list)
     expressions: List[ExpressionInfo] = Field(default_factory=list)
     functions: List[FunctionInfo] = Field(default_factory=list)
+    attributes: List[AttributeInfo] = Field(default_factory=list)
 
 
 class ImportInfo(BasicInfo):
     pass
 
 
+class CallInfo(LineInfo):
+    """Model to represent a call made in a file."""
+
+    # Dotted definition path within the file, "<top-level>" for module-level code.
+    caller: str
+    # Dotted definition path within the file, or the dotted import target if
+    # `imported`; relative imports keep their leading dots, e.g. "..util.helper".
+    callee: str
+    imported: bool = False
+
+
 class FileData(BaseModel):
     """Model to represent file data."""
 
@@ -113,10 +141,14 @@ class FileData(BaseModel):
     classes: List[ClassInfo] = Field(default_factory=list)
     top_level: List[TopLevelInfo] = Field(default_factory=list)
     functions: List[FunctionInfo] = Field(default_factory=list)
+    calls: List[CallInfo] = Field(default_factory=list)
 
 
 FileMapType = Dict[str, FileData]
 
+FILE_DATA_SCHEMA_VERSION = 3
+"""Version of the `FileData` layout, bump it whenever the models above or the extraction output change."""
+
 
 class SimpleFunctionInfo(BaseModel):
     function_name: str
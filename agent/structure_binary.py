@@ -0,0 +1,424 @@
+# agent/structure_binary.py
+"""
+Binary, memory-mappable layout of a repository structure (`FileMapType`).
+
+All strings (paths, names, sketches, source text) live in one contiguous UTF-8
+blob at the end of the file and are referenced by (offset, length). Everything
+else lives in fixed-width little-endian tables:
+
+    header       magic, version, row counts and section offsets
+    files        path, first item, item count, extra fields
+    items        one row per import / top-level block / class / method /
+                 class expression / function, with kind, parent class row,
+                 line range, name, text, sketch and decorator rows
+    decorators   line range and name
+    blob         string data
+
+Fields of the models that the tables do not cover are kept per row as a small
+JSON object, so extending the schema never requires a new layout version.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Optional
+from agent.schemas import FileData
+from agent.structure_writer import JsonStructureWriter, write_index
+
+MAGIC = b"CSTRUCT\0"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<8sIIIIQQQQ")
+FILE_ROW = struct.Struct("<QIIIQI")
+ITEM_ROW = struct.Struct("<BiIIQIQIQIiIIQI")
+DECORATOR_ROW = struct.Struct("<IIQI")
+
+KIND_IMPORT = 0
+KIND_TOP_LEVEL = 1
+KIND_CLASS = 2
+KIND_METHOD = 3
+KIND_EXPRESSION = 4
+KIND_FUNCTION = 5
+
+_SECTION_KINDS = {
+    "imports": KIND_IMPORT,
+    "top_level": KIND_TOP_LEVEL,
+    "functions": KIND_FUNCTION,
+}
+_FILE_FIELDS = {"imports", "classes", "top_level", "functions"}
+_ITEM_FIELDS = {
+    "start_line",
+    "end_line",
+    "text",
+    "function_name",
+    "sketch",
+    "trimmed_code_start_line",
+    "class_name",
+    "class_decorators",
+    "expressions",
+    "functions",
+}
+_EMPTY_REF = (0, 0)
+
+
+def is_binary_structure(path: str | Path) -> bool:
+    """
+    Check whether a structure file uses the binary layout.
+    """
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class BinaryStructureWriter:
+    """
+    Write a binary structure file one file entry at a time.
+
+    Same interface as `JsonStructureWriter`. Strings are streamed to a temporary
+    blob file while the (small) tables are kept in memory until `close`.
+    """
+
+    def __init__(self, output_path: str | Path, commit: Optional[str] = None):
+        self.output_path = Path(output_path)
+        # Commit the structure describes, recorded in a sidecar index as for JSON.
+        self.commit = commit
+        self.files = bytearray()
+        self.items = bytearray()
+        self.decorators = bytearray()
+        self.file_count = 0
+        self.item_count = 0
+        self.decorator_count = 0
+        self.blob_size = 0
+        # Closed by close or abort, the writer is used as a context manager.
+        self.blob = tempfile.TemporaryFile(dir=self.output_path.parent)  # noqa: SIM115
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add_string(self, value: Optional[str]) -> tuple[int, int]:
+        if not value:
+            return _EMPTY_REF
+        data = value.encode("utf-8")
+        offset = self.blob_size
+        self.blob.write(data)
+        self.blob_size += len(data)
+        return offset, len(data)
+
+    def add_extra(self, data: dict, known_fields: set[str]) -> tuple[int, int]:
+        extra = {k: v for k, v in data.items() if k not in known_fields}
+        return self.add_string(json.dumps(extra, ensure_ascii=False) if extra else "")
+
+    def add_item(self, kind: int, data: dict, parent: int = -1) -> int:
+        decorator_start = self.decorator_count
+        for decorator in data.get("class_decorators", []):
+            self.decorators += DECORATOR_ROW.pack(
+                decorator["start_line"],
+                decorator["end_line"],
+                *self.add_string(decorator["decorator_name"]),
+            )
+            self.decorator_count += 1
+
+        name = data.get("class_name") or data.get("function_name")
+        trimmed = data.get("trimmed_code_start_line")
+        self.items += ITEM_ROW.pack(
+            kind,
+            parent,
+            data["start_line"],
+            data["end_line"],
+            *self.add_string(name),
+            *self.add_string(data.get("text")),
+            *self.add_string(data.get("sketch")),
+            -1 if trimmed is None else trimmed,
+            decorator_start,
+            self.decorator_count - decorator_start,
+            *self.add_extra(data, _ITEM_FIELDS),
+        )
+        self.item_count += 1
+        return self.item_count - 1
+
+    def write(self, file_path: str, file_data: FileData | dict):
+        """
+        Append the entry of one file.
+
+        Args:
+            file_path (str): Key of the entry.
+            file_data (FileData | dict): Structure of the file, or its already dumped dict.
+        """
+        if isinstance(file_data, FileData):
+            file_data = file_data.model_dump()
+
+        first_item = self.item_count
+        for section in ("imports", "top_level"):
+            for data in file_data[section]:
+                self.add_item(_SECTION_KINDS[section], data)
+        for class_data in file_data["classes"]:
+            class_row = self.add_item(KIND_CLASS, class_data)
+            for data in class_data["expressions"]:
+                self.add_item(KIND_EXPRESSION, data, class_row)
+            for data in class_data["functions"]:
+                self.add_item(KIND_METHOD, data, class_row)
+        for data in file_data["functions"]:
+            self.add_item(KIND_FUNCTION, data)
+
+        self.files += FILE_ROW.pack(
+            *self.add_string(file_path),
+            first_item,
+            self.item_count - first_item,
+            *self.add_extra(file_data, _FILE_FIELDS),
+        )
+        self.file_count += 1
+
+    def close(self):
+        """
+        Assemble header, tables and blob, then move the file into place.
+        """
+        files_offset = HEADER.size
+        items_offset = files_offset + len(self.files)
+        decorators_offset = items_offset + len(self.items)
+        blob_offset = decorators_offset + len(self.decorators)
+        header = HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            self.file_count,
+            self.item_count,
+            self.decorator_count,
+            files_offset,
+            items_offset,
+            decorators_offset,
+            blob_offset,
+        )
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.output_path.parent, prefix=f".{self.output_path.name}."
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(self.files)
+                f.write(self.items)
+                f.write(self.decorators)
+                self.blob.seek(0)
+                shutil.copyfileobj(self.blob, f)
+            os.replace(tmp_path, self.output_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        finally:
+            self.blob.close()
+        if self.commit is not None:
+            write_index(self.output_path, {}, self.commit)
+
+    def abort(self):
+        self.blob.close()
+
+
+class BinaryStructureStore(Mapping[str, FileData]):
+    """
+    Read-only view of a binary structure file, backed by mmap.
+
+    Only the path of each file is decoded when the store is opened. Entries are
+    turned into `FileData` on first access and memoized, and the query methods
+    (`class_names`, `function_names`, `method_names`, `definitions`) read the
+    tables directly without building any model. The file stays mapped until
+    `close`, the store is a context manager doing so on exit.
+    """
+
+    def __init__(self, repo_structure_path: str | Path):
+        self.repo_structure_path = Path(repo_structure_path)
+        # Held until close, the store is used as a context manager.
+        self.file = open(self.repo_structure_path, "rb")  # noqa: SIM115
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            self.file_count,
+            self.item_count,
+            self.decorator_count,
+            self.files_offset,
+            self.items_offset,
+            self.decorators_offset,
+            self.blob_offset,
+        ) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(
+                f"{repo_structure_path} is not a version {FORMAT_VERSION} binary structure"
+            )
+
+        self.rows: dict[str, int] = {}
+        for row in range(self.file_count):
+            path_offset, path_length, *_ = self.file_row(row)
+            self.rows[self.string(path_offset, path_length)] = row
+        self.cache: dict[str, FileData] = {}
+
+    def string(self, offset: int, length: int) -> str:
+        start = self.blob_offset + offset
+        return self.data[start : start + length].decode("utf-8")
+
+    def file_row(self, row: int) -> tuple:
+        return FILE_ROW.unpack_from(self.data, self.files_offset + row * FILE_ROW.size)
+
+    def item_row(self, row: int) -> tuple:
+        return ITEM_ROW.unpack_from(self.data, self.items_offset + row * ITEM_ROW.size)
+
+    def iter_item_rows(self, file_path: str) -> Iterator[tuple]:
+        _, _, first_item, item_count, _, _ = self.file_row(self.rows[file_path])
+        for row in range(first_item, first_item + item_count):
+            yield row, self.item_row(row)
+
+    def definitions(self, file_path: str) -> Iterator[tuple[int, str, int, int]]:
+        """
+        Iterate over the classes, methods and functions of a file without decoding text.
+
+        Yields:
+            tuple[int, str, int, int]: Kind, name, start line and end line.
+        """
+        for _, item in self.iter_item_rows(file_path):
+            kind, _, start_line, end_line, name_offset, name_length = item[:6]
+            if kind in (KIND_CLASS, KIND_METHOD, KIND_FUNCTION):
+                yield kind, self.string(name_offset, name_length), start_line, end_line
+
+    def class_names(self, file_path: str) -> list[str]:
+        return [
+            name
+            for kind, name, _, _ in self.definitions(file_path)
+            if kind == KIND_CLASS
+        ]
+
+    def function_names(self, file_path: str) -> list[str]:
+        return [
+            name
+            for kind, name, _, _ in self.definitions(file_path)
+            if kind == KIND_FUNCTION
+        ]
+
+    def method_names(self, file_path: str, class_name: str) -> list[str]:
+        class_row = None
+        names = []
+        for row, item in self.iter_item_rows(file_path):
+            kind, parent = item[0], item[1]
+            if kind == KIND_CLASS:
+                class_row = row if self.string(*item[4:6]) == class_name else None
+            elif kind == KIND_METHOD and class_row is not None and parent == class_row:
+                names.append(self.string(*item[4:6]))
+        return names
+
+    def load_item(self, item: tuple) -> dict:
+        (
+            kind,
+            _,
+            start_line,
+            end_line,
+            name_offset,
+            name_length,
+            text_offset,
+            text_length,
+            sketch_offset,
+            sketch_length,
+            trimmed,
+            decorator_start,
+            decorator_count,
+            extra_offset,
+            extra_length,
+        ) = item
+        data = {"start_line": start_line, "end_line": end_line}
+        name = self.string(name_offset, name_length)
+        if kind == KIND_CLASS:
+            data["class_name"] = name
+            data["class_decorators"] = []
+            for row in range(decorator_start, decorator_start + decorator_count):
+                start, end, offset, length = DECORATOR_ROW.unpack_from(
+                    self.data, self.decorators_offset + row * DECORATOR_ROW.size
+                )
+                data["class_decorators"].append(
+                    {
+                        "start_line": start,
+                        "end_line": end,
+                        "decorator_name": self.string(offset, length),
+                    }
+                )
+            data["expressions"] = []
+            data["functions"] = []
+        else:
+            data["text"] = self.string(text_offset, text_length)
+            if kind in (KIND_METHOD, KIND_FUNCTION):
+                data["function_name"] = name
+                data["sketch"] = self.string(sketch_offset, sketch_length)
+                data["trimmed_code_start_line"] = None if trimmed < 0 else trimmed
+        if extra_length:
+            data.update(json.loads(self.string(extra_offset, extra_length)))
+        return data
+
+    def __getitem__(self, file_path: str) -> FileData:
+        file_data = self.cache.get(file_path)
+        if file_data is not None:
+            return file_data
+
+        _, _, _, _, extra_offset, extra_length = self.file_row(self.rows[file_path])
+        data = {"imports": [], "classes": [], "top_level": [], "functions": []}
+        classes = {}
+        for row, item in self.iter_item_rows(file_path):
+            kind, parent = item[0], item[1]
+            item_data = self.load_item(item)
+            if kind == KIND_IMPORT:
+                data["imports"].append(item_data)
+            elif kind == KIND_TOP_LEVEL:
+                data["top_level"].append(item_data)
+            elif kind == KIND_FUNCTION:
+                data["functions"].append(item_data)
+            elif kind == KIND_CLASS:
+                classes[row] = item_data
+                data["classes"].append(item_data)
+            elif kind == KIND_EXPRESSION:
+                classes[parent]["expressions"].append(item_data)
+            elif kind == KIND_METHOD:
+                classes[parent]["functions"].append(item_data)
+        if extra_length:
+            data.update(json.loads(self.string(extra_offset, extra_length)))
+
+        file_data = FileData.model_validate(data)
+        self.cache[file_path] = file_data
+        return file_data
+
+    def __contains__(self, file_path: object) -> bool:
+        return file_path in self.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return self.file_count
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def export_json(
+    binary_path: str | Path, json_path: str | Path, indent: Optional[int] = 2
+):
+    """
+    Convert a binary structure file to the JSON layout, e.g. for debugging.
+    """
+    with (
+        BinaryStructureStore(binary_path) as store,
+        JsonStructureWriter(json_path, indent=indent) as writer,
+    ):
+        for file_path in store:
+            writer.write(file_path, store[file_path])
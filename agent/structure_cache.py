@@ -0,0 +1,72 @@
+# agent/structure_cache.py
+import hashlib
+from functools import lru_cache
+from importlib import metadata
+from typing import Optional
+from pydantic import ValidationError
+from agent.disk_cache import DiskCache
+from agent.schemas import FILE_DATA_SCHEMA_VERSION, FileData
+
+
+@lru_cache(maxsize=None)
+def grammar_version(language_module: str) -> str:
+    """
+    Get the version of a tree-sitter grammar package and of the tree-sitter runtime.
+
+    Args:
+        language_module (str): Module name of the grammar, e.g. "tree_sitter_python".
+
+    Returns:
+        str: A version string that changes whenever either package is upgraded.
+    """
+    versions = []
+    for distribution in (language_module.replace("_", "-"), "tree-sitter"):
+        try:
+            versions.append(metadata.version(distribution))
+        except metadata.PackageNotFoundError:
+            versions.append("unknown")
+    return "/".join(versions)
+
+
+class StructureCache(DiskCache):
+    """
+    Persistent cache of per-file `FileData`, keyed by file content.
+
+    The key also covers the grammar version and `FILE_DATA_SCHEMA_VERSION`, so
+    upgrading tree-sitter or changing the models never returns stale entries.
+    """
+
+    def make_key(self, source_code: bytes, language_module: str) -> str:
+        """
+        Build the cache key of a file.
+
+        Args:
+            source_code (bytes): Content of the file.
+            language_module (str): Module name of the grammar used to parse the file.
+
+        Returns:
+            str: Hex digest identifying the parsed structure.
+        """
+        digest = hashlib.sha256()
+        digest.update(
+            f"{FILE_DATA_SCHEMA_VERSION}\0{language_module}\0"
+            f"{grammar_version(language_module)}\0".encode("utf-8")
+        )
+        digest.update(source_code)
+        return digest.hexdigest()
+
+    def get_file_data(self, key: str) -> Optional[FileData]:
+        value = self.get(key)
+        if value is None:
+            return None
+        try:
+            return FileData.model_validate_json(value)
+        except ValidationError:
+            # Corrupted entry, count it as a miss and drop it.
+            self.stats.hits -= 1
+            self.stats.misses += 1
+            self.discard(key)
+            return None
+
+    def put_file_data(self, key: str, file_data: FileData):
+        self.put(key, file_data.model_dump_json().encode("utf-8"))
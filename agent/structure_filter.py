@@ -1,19 +1,81 @@
 # agent/structure_filter.py
 
-from typing import List
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence
 from agent.schemas import (
     FileMapType,
     FileData,
     ClassInfo,
     FunctionInfo,
     FilesEdit,
+    LineInfo,
 )
+from agent.symbol_index import bare_class_name
 from loguru import logger
 
 
+class IntervalIndex:
+    """
+    Line ranges sorted by start line, queried with bisect.
+    """
+
+    def __init__(self, items: Sequence[LineInfo]):
+        """
+        Args:
+            items (Sequence[LineInfo]): Items with start_line/end_line, looked up by position.
+        """
+        order = sorted(range(len(items)), key=lambda i: (items[i].start_line, i))
+        self.starts = [items[i].start_line for i in order]
+        self.ends = [items[i].end_line for i in order]
+        self.positions = order
+        # max_ends[i] is the largest end line among the first i + 1 intervals, which
+        # bounds how far left a containing interval can be.
+        self.max_ends = list(accumulate(self.ends, max))
+
+    def find(self, line: int) -> Optional[int]:
+        """
+        Find the interval containing `line`, preferring the one that starts first.
+
+        Returns:
+            Optional[int]: Position of the item in the original sequence, or None.
+        """
+        result = None
+        i = bisect_right(self.starts, line) - 1
+        while i >= 0 and self.max_ends[i] >= line:
+            if self.ends[i] >= line:
+                result = self.positions[i]
+            i -= 1
+        return result
+
+
+class FileIntervalIndex:
+    """
+    Interval indexes over the classes, methods, functions and top-level blocks of a file.
+    """
+
+    def __init__(self, file_data: FileData):
+        self.classes = IntervalIndex(file_data.classes)
+        self.methods = [IntervalIndex(cls.functions) for cls in file_data.classes]
+        self.functions = IntervalIndex(file_data.functions)
+        self.top_level = IntervalIndex(file_data.top_level)
+
+
 class StructureFilter:
     def __init__(self, repo_structure: FileMapType):
         self.repo_structure = repo_structure
+        self.interval_indexes: Dict[str, FileIntervalIndex] = {}
+
+    def get_interval_index(
+        self, file_name: str, file_data: FileData
+    ) -> FileIntervalIndex:
+        """
+        获取文件的行区间索引，每个文件只构建一次。
+        """
+        index = self.interval_indexes.get(file_name)
+        if index is None:
+            index = self.interval_indexes[file_name] = FileIntervalIndex(file_data)
+        return index
 
     def filter_files(self, file_names: List[str]) -> FileMapType:
         """
@@ -33,15 +95,14 @@ class StructureFilter:
         """
         根据类名列表筛选类。
         """
+        # 同时接受完整类名 "A(B)" 和去掉基类的类名 "A"
+        wanted = set(class_names)
         filtered_classes = [
-            cls for cls in file_data.classes if cls.class_name in class_names
+            cls
+            for cls in file_data.classes
+            if cls.class_name in wanted or bare_class_name(cls.class_name) in wanted
         ]
-        return FileData(
-            imports=file_data.imports,
-            top_level=file_data.top_level,
-            classes=filtered_classes,
-            functions=file_data.functions,
-        )
+        return file_data.model_copy(update={"classes": filtered_classes})
 
     def filter_functions(
         self, class_info: ClassInfo, function_names: List[str]
@@ -49,19 +110,11 @@ class StructureFilter:
         """
         根据函数名列表筛选类中的函数。
         """
+        wanted = set(function_names)
         filtered_functions = [
-            func
-            for func in class_info.functions
-            if func.function_name in function_names
+            func for func in class_info.functions if func.function_name in wanted
         ]
-        return ClassInfo(
-            class_name=class_info.class_name,
-            start_line=class_info.start_line,
-            end_line=class_info.end_line,
-            class_decorators=class_info.class_decorators,
-            expressions=class_info.expressions,
-            functions=filtered_functions,
-        )
+        return class_info.model_copy(update={"functions": filtered_functions})
 
     def filter_structure_from_issues(self, files_edit: FilesEdit) -> FileMapType:
         """
@@ -75,82 +128,66 @@ class StructureFilter:
                 logger.debug(f"文件 {file_edits.file_name} 未在仓库结构中找到。")
                 continue
 
-            # 创建新的 FileData 实例，复制导入和顶级代码
-            new_file_data = FileData(
-                imports=file_data.imports,
-                top_level=[],
-                classes=[],
-                functions=[],  # 顶级函数
+            # 复制 FileData 实例，保留导入等字段，清空顶级代码、类和函数
+            new_file_data = file_data.model_copy(
+                update={"top_level": [], "classes": [], "functions": []}
             )
 
+            index = self.get_interval_index(file_edits.file_name, file_data)
+            new_classes: Dict[str, ClassInfo] = {}
+
             for edit in file_edits.edits:
                 start_line = edit.line_numbers.start_line
                 end_line = edit.line_numbers.end_line
 
-                matched = False
-
-                # 检查类
-                for cls in file_data.classes:
-                    if cls.start_line <= start_line <= cls.end_line:
-                        # 检查是否已在 new_file_data.classes 中存在该类
-                        new_class = next(
-                            (
-                                c
-                                for c in new_file_data.classes
-                                if c.class_name == cls.class_name
-                            ),
-                            None,
-                        )
-                        if not new_class:
-                            # 创建新的 ClassInfo 实例并添加到 new_file_data.classes
-                            new_class = ClassInfo(
-                                class_name=cls.class_name,
-                                start_line=cls.start_line,
-                                end_line=cls.end_line,
-                                class_decorators=cls.class_decorators,
-                                expressions=cls.expressions,
-                                functions=[],
-                            )
-                            new_file_data.classes.append(new_class)
-
-                        # 检查类中的函数
-                        for func in cls.functions:
-                            if func.start_line <= start_line <= func.end_line:
-                                new_func_info = self._extract_text_in_range(
-                                    func, start_line, end_line
-                                )
-                                new_class.functions.append(new_func_info)
-                                matched = True
-                                break  # 假设每个编辑只匹配一个函数
-                        matched = True  # 已经匹配到了类，无论是否匹配到函数，都不需要继续检查其他类
-                        break  # 假设每个编辑只匹配一个类
-
-                if not matched:
-                    # 检查顶级函数
-                    for func in file_data.functions:
-                        if func.start_line <= start_line <= func.end_line:
-                            new_func_info = self._extract_text_in_range(
-                                func, start_line, end_line
-                            )
-                            new_file_data.functions.append(new_func_info)
-                            matched = True
-                            break
-
-                if not matched:
-                    # 检查顶级表达式
-                    for expr in file_data.top_level:
-                        if expr.start_line <= start_line <= expr.end_line:
-                            new_top_level = self._extract_text_in_range(
-                                expr, start_line, end_line
+                # 检查类，匹配到类后无论是否匹配到函数，都不需要继续检查其他部分
+                class_position = index.classes.find(start_line)
+                if class_position is not None:
+                    cls = file_data.classes[class_position]
+                    new_class = new_classes.get(cls.class_name)
+                    if not new_class:
+                        # 复制 ClassInfo 实例（不含函数）并添加到 new_file_data.classes
+                        new_class = cls.model_copy(update={"functions": []})
+                        new_file_data.classes.append(new_class)
+                        new_classes[cls.class_name] = new_class
+
+                    # 检查类中的函数
+                    function_position = index.methods[class_position].find(start_line)
+                    if function_position is not None:
+                        new_class.functions.append(
+                            self._extract_text_in_range(
+                                cls.functions[function_position], start_line, end_line
                             )
-                            new_file_data.top_level.append(new_top_level)
-                            matched = True
-                            break
-
-                if not matched:
-                    logger.debug(
-                        f"在文件 {file_edits.file_name} 的行 {start_line}-{end_line} 未找到匹配的类或函数。"
+                        )
+                    continue
+
+                # 检查顶级函数
+                function_position = index.functions.find(start_line)
+                if function_position is not None:
+                    new_file_data.functions.append(
+                        self._extract_text_in_range(
+                            file_data.functions[function_position],
+                            start_line,
+                            end_line,
+                        )
                     )
+                    continue
+
+                # 检查顶级表达式
+                top_level_position = index.top_level.find(start_line)
+                if top_level_position is not None:
+                    new_file_data.top_level.append(
+                        self._extract_text_in_range(
+                            file_data.top_level[top_level_position],
+                            start_line,
+                            end_line,
+                        )
+                    )
+                    continue
+
+                logger.debug(
+                    f"在文件 {file_edits.file_name} 的行 {start_line}-{end_line} 未找到匹配的类或函数。"
+                )
 
             filtered_structure[file_edits.file_name] = new_file_data
 
@@ -187,12 +224,10 @@ class StructureFilter:
         # 保存选定代码的原始起始行号
         trimmed_code_start_line = start_line
 
-        # 返回新的 FunctionInfo 对象
-        return FunctionInfo(
-            function_name=old_info.function_name,
-            start_line=old_info.start_line,
-            end_line=old_info.end_line,
-            text=new_text,
-            sketch=old_info.sketch,
-            trimmed_code_start_line=trimmed_code_start_line,
+        # 返回新的 FunctionInfo 对象，其余字段保持不变
+        return old_info.model_copy(
+            update={
+                "text": new_text,
+                "trimmed_code_start_line": trimmed_code_start_line,
+            }
         )
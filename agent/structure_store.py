@@ -0,0 +1,138 @@
+# agent/structure_store.py
+import json
+import mmap
+import os
+import re
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from loguru import logger
+from agent.schemas import FileData
+from agent.structure_binary import BinaryStructureStore, is_binary_structure
+from agent.structure_writer import INDEX_VERSION, index_path, write_index
+
+# Strings (with escapes) and brackets, everything the top-level scan needs to look at.
+_TOKEN_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]]', re.DOTALL)
+
+
+def scan_offsets(data: bytes | mmap.mmap) -> dict[str, list[int]]:
+    """
+    Find the byte range of every top-level value of a JSON object without parsing them.
+
+    Args:
+        data (bytes | mmap.mmap): Content of a structure file.
+
+    Returns:
+        dict[str, list[int]]: Byte range of each entry's value, in file order.
+    """
+    offsets = {}
+    depth = 0
+    key = None
+    value_start = 0
+    for match in _TOKEN_PATTERN.finditer(data):
+        token = match.group()
+        if token[:1] == b'"':
+            if depth == 1 and key is None:
+                key = json.loads(token)
+        elif token in (b"{", b"["):
+            depth += 1
+            if depth == 2:
+                value_start = match.start()
+        else:
+            if depth == 2:
+                offsets[key] = [value_start, match.end()]
+                key = None
+            depth -= 1
+    return offsets
+
+
+class LazyStructureStore(Mapping[str, FileData]):
+    """
+    Read-only view of a repo_structure.json that parses entries on first access.
+
+    Opening the store only reads the sidecar index written by `JsonStructureWriter`
+    (or, if it is missing or stale, scans the file once for entry boundaries and
+    rewrites it). A file's `FileData` is decoded and validated the first time it is
+    looked up and memoized afterwards. The file stays mapped until `close`, the
+    store is a context manager doing so on exit.
+    """
+
+    def __init__(self, repo_structure_path: str | Path):
+        """
+        Args:
+            repo_structure_path (str | Path): Path of the structure JSON file.
+        """
+        self.repo_structure_path = Path(repo_structure_path)
+        # Held until close, the store is used as a context manager.
+        self.file = open(self.repo_structure_path, "rb")  # noqa: SIM115
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = self.load_offsets()
+        self.cache: dict[str, FileData] = {}
+
+    def load_offsets(self) -> dict[str, list[int]]:
+        """
+        Load the entry offsets from the sidecar index, rebuilding it if it is stale.
+        """
+        stat = os.fstat(self.file.fileno())
+        try:
+            with open(index_path(self.repo_structure_path), "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if (
+                index.get("version") == INDEX_VERSION
+                and index.get("size") == stat.st_size
+                and index.get("mtime_ns") == stat.st_mtime_ns
+            ):
+                return index["offsets"]
+        except (OSError, ValueError):
+            pass
+
+        logger.debug(f"Building offset index of {self.repo_structure_path}")
+        offsets = scan_offsets(self.data)
+        try:
+            write_index(self.repo_structure_path, offsets)
+        except OSError as e:
+            logger.debug(f"Could not write index of {self.repo_structure_path}: {e}")
+        return offsets
+
+    def __getitem__(self, file_path: str) -> FileData:
+        file_data = self.cache.get(file_path)
+        if file_data is None:
+            start, end = self.offsets[file_path]
+            file_data = FileData.model_validate_json(self.data[start:end])
+            self.cache[file_path] = file_data
+        return file_data
+
+    def __contains__(self, file_path: object) -> bool:
+        return file_path in self.offsets
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_structure(
+    repo_structure_path: str | Path,
+) -> LazyStructureStore | BinaryStructureStore:
+    """
+    Open a structure file in either the JSON or the binary layout.
+
+    Args:
+        repo_structure_path (str | Path): Path of the structure file.
+
+    Returns:
+        LazyStructureStore | BinaryStructureStore: A lazy mapping of file path to `FileData`.
+    """
+    if is_binary_structure(repo_structure_path):
+        return BinaryStructureStore(repo_structure_path)
+    return LazyStructureStore(repo_structure_path)
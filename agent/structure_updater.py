@@ -0,0 +1,279 @@
+# agent/structure_updater.py
+import json
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+from git import Repo
+from loguru import logger
+from pydantic import FilePath
+from agent.directory_tree_printer import DirectoryTreePrinter
+from agent.file_map import MultiFileMap, SingleFileMap, parse_file_data
+from agent.gitignore_matcher import GitIgnoreMatcher
+from agent.structure_binary import (
+    BinaryStructureStore,
+    BinaryStructureWriter,
+    is_binary_structure,
+)
+from agent.structure_cache import StructureCache
+from agent.structure_writer import (
+    JsonStructureWriter,
+    read_indent,
+    read_structure_commit,
+)
+
+
+@dataclass
+class StructureDiff:
+    """Paths touched by an incremental structure update, as structure keys."""
+
+    updated: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+
+def get_changed_paths(
+    repo: Repo, base_commit: str, target_commit: str
+) -> tuple[List[str], List[str]]:
+    """
+    Ask git which paths changed between two commits.
+
+    Args:
+        repo (Repo): The repository.
+        base_commit (str): Commit the existing structure was generated from.
+        target_commit (str): Commit the structure should describe.
+
+    Returns:
+        tuple[List[str], List[str]]: Paths added or modified in `target_commit`, and
+            paths that no longer exist there. Renames contribute to both lists.
+    """
+    output = repo.git.diff("--name-status", "-z", "-M", base_commit, target_commit)
+    fields = output.split("\0")
+    updated, deleted = [], []
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i][0]
+        if status in ("R", "C"):
+            old_path, new_path = fields[i + 1], fields[i + 2]
+            if status == "R":
+                deleted.append(old_path)
+            updated.append(new_path)
+            i += 3
+        else:
+            path = fields[i + 1]
+            if status == "D":
+                deleted.append(path)
+            else:
+                updated.append(path)
+            i += 2
+    return updated, deleted
+
+
+def update_repo_structure(
+    repo_structure_path: FilePath,
+    repo_path: str,
+    base_commit: str,
+    target_commit: str,
+    key_prefix: Optional[str] = None,
+    cache: Optional[StructureCache] = None,
+    language: str = "python",
+    matcher: Optional[GitIgnoreMatcher] = None,
+) -> StructureDiff:
+    """
+    Patch an existing repo_structure.json from `base_commit` to `target_commit`.
+
+    Only the files git reports as changed are re-parsed, their content is read from
+    `target_commit` directly, so the working tree does not need to be checked out.
+    Files already in the structure are re-parsed, added files only when they pass
+    the filter the structure was built with: an extension of `language`, and
+    `matcher` unless it lists the git index, which holds every added file.
+    Scanning matchers read the ignore files of the working tree, which should
+    then be at `target_commit`. The structure is not checked to describe
+    `base_commit`, `sync_repo_structure` does so. `target_commit` is recorded
+    with the updated structure.
+
+    Args:
+        repo_structure_path (FilePath): Structure file generated at `base_commit`, updated in
+            place and kept in its layout (binary, or JSON with its indentation).
+        repo_path (str): Path of the git repository.
+        base_commit (str): Commit the existing structure was generated from.
+        target_commit (str): Commit the structure should describe.
+        key_prefix (Optional[str]): Prefix joined with repository relative paths to build the
+            structure keys, defaults to `repo_path` as `MultiFileMap` is fed with such paths.
+        cache (Optional[StructureCache]): Cache used for the re-parsed files.
+        language (str): Target language the structure was built for.
+        matcher (Optional[GitIgnoreMatcher]): Matcher the structure's files were listed
+            with, defaults to a `GitIgnoreMatcher` for `language`.
+
+    Returns:
+        StructureDiff: The structure keys that were updated or deleted.
+    """
+    repo = Repo(repo_path)
+    key_prefix = repo_path if key_prefix is None else key_prefix
+
+    binary = is_binary_structure(repo_structure_path)
+    if binary:
+        with BinaryStructureStore(repo_structure_path) as store:
+            repo_structure_dict = {key: store[key] for key in store}
+    else:
+        with open(repo_structure_path, "r", encoding="utf-8") as f:
+            repo_structure_dict = json.load(f)
+
+    updated, deleted = get_changed_paths(repo, base_commit, target_commit)
+    target = repo.commit(target_commit)
+    target_tree = target.tree
+    diff = StructureDiff()
+
+    for path in deleted:
+        key = os.path.join(key_prefix, path)
+        if repo_structure_dict.pop(key, None) is not None:
+            diff.deleted.append(key)
+
+    extensions = set(
+        DirectoryTreePrinter(repo_path, target_language=language).language_extensions
+    )
+    if matcher is None:
+        matcher = GitIgnoreMatcher(default_language=language)
+    if not matcher.lists_git_index:
+        matcher.set_base_directory(repo_path)
+        matcher.load_patterns(repo_path, language)
+
+    for path in updated:
+        key = os.path.join(key_prefix, path)
+        if key not in repo_structure_dict and (
+            os.path.splitext(path)[1] not in extensions
+            or (not matcher.lists_git_index and matcher.is_ignored(path, is_dir=False))
+        ):
+            continue
+        source_code = SingleFileMap.decode_source(target_tree[path].data_stream.read())
+        file_data = parse_file_data(key, cache, source_code=source_code)
+        repo_structure_dict[key] = file_data if binary else file_data.model_dump()
+        diff.updated.append(key)
+
+    if binary:
+        writer = BinaryStructureWriter(repo_structure_path, commit=target.hexsha)
+    else:
+        writer = JsonStructureWriter(
+            repo_structure_path,
+            indent=read_indent(repo_structure_path),
+            commit=target.hexsha,
+        )
+
+    with writer:
+        for key, file_data in repo_structure_dict.items():
+            writer.write(key, file_data)
+
+    logger.info(
+        f"Updated {repo_structure_path} from {base_commit} to {target_commit}: "
+        f"{len(diff.updated)} files re-parsed, {len(diff.deleted)} removed"
+    )
+    return diff
+
+
+def build_repo_structure(
+    repo_structure_path: FilePath,
+    repo_path: str,
+    key_prefix: Optional[str] = None,
+    cache: Optional[StructureCache] = None,
+    language: str = "python",
+    matcher: Optional[GitIgnoreMatcher] = None,
+):
+    """
+    Rebuild a structure file from the checked out working tree of a repository.
+
+    The files are listed and filtered as for `update_repo_structure`, and the
+    layout of an existing structure file is kept. The checked out commit is
+    recorded with the structure.
+
+    Args:
+        repo_structure_path (FilePath): Structure file to write.
+        repo_path (str): Path of the git repository.
+        key_prefix (Optional[str]): Prefix joined with repository relative paths to build the
+            structure keys, defaults to `repo_path`.
+        cache (Optional[StructureCache]): Cache used for the parsed files.
+        language (str): Target language of the structure.
+        matcher (Optional[GitIgnoreMatcher]): Matcher listing the files, defaults to a
+            `GitIgnoreMatcher` for `language`.
+    """
+    key_prefix = repo_path if key_prefix is None else key_prefix
+    if matcher is None:
+        matcher = GitIgnoreMatcher(default_language=language)
+    extensions = set(
+        DirectoryTreePrinter(repo_path, target_language=language).language_extensions
+    )
+    file_dict = [
+        os.path.join(key_prefix, path)
+        for path in matcher.check_directory(repo_path, language)
+        if os.path.splitext(path)[1] in extensions
+    ]
+
+    output_format, indent = "json", 2
+    if os.path.exists(repo_structure_path):
+        if is_binary_structure(repo_structure_path):
+            output_format = "binary"
+        else:
+            indent = read_indent(repo_structure_path)
+
+    MultiFileMap(
+        file_dict,
+        repo_structure_path,
+        cache=cache,
+        indent=indent,
+        output_format=output_format,
+        commit=Repo(repo_path).head.commit.hexsha,
+    ).save()
+    logger.info(f"Rebuilt {repo_structure_path} from {len(file_dict)} files")
+
+
+def sync_repo_structure(
+    repo_structure_path: FilePath,
+    repo_path: str,
+    base_commit: str,
+    target_commit: str,
+    key_prefix: Optional[str] = None,
+    cache: Optional[StructureCache] = None,
+    language: str = "python",
+    matcher: Optional[GitIgnoreMatcher] = None,
+) -> Optional[StructureDiff]:
+    """
+    Bring a structure file to `target_commit`, which must be checked out.
+
+    The structure is patched with `update_repo_structure` when it records that
+    it was generated at `base_commit`, and rebuilt with `build_repo_structure`
+    when it records another commit or none.
+
+    Args:
+        repo_structure_path (FilePath): Structure file to bring up to date.
+        repo_path (str): Path of the git repository.
+        base_commit (str): Commit checked out before `target_commit`.
+        target_commit (str): Commit the structure should describe.
+        key_prefix, cache, language, matcher: As for `update_repo_structure`.
+
+    Returns:
+        Optional[StructureDiff]: The keys touched by the update, None after a rebuild.
+    """
+    repo = Repo(repo_path)
+    structure_commit = read_structure_commit(repo_structure_path)
+    if structure_commit == repo.commit(base_commit).hexsha:
+        return update_repo_structure(
+            repo_structure_path,
+            repo_path,
+            base_commit,
+            target_commit,
+            key_prefix=key_prefix,
+            cache=cache,
+            language=language,
+            matcher=matcher,
+        )
+
+    logger.info(
+        f"{repo_structure_path} was generated at {structure_commit or 'an unknown commit'}, "
+        f"not {base_commit}, rebuilding it"
+    )
+    build_repo_structure(
+        repo_structure_path,
+        repo_path,
+        key_prefix=key_prefix,
+        cache=cache,
+        language=language,
+        matcher=matcher,
+    )
+    return None
@@ -0,0 +1,184 @@
+# agent/structure_writer.py
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+from agent.schemas import FileData
+
+
+INDEX_VERSION = 1
+
+
+def index_path(structure_path: str | Path) -> Path:
+    """
+    Path of the sidecar index of a structure file.
+    """
+    return Path(f"{structure_path}.idx")
+
+
+def write_index(
+    structure_path: str | Path,
+    offsets: dict[str, list[int]],
+    commit: Optional[str] = None,
+):
+    """
+    Write the sidecar index of a structure file.
+
+    The index records the size and modification time of the structure file, so
+    readers can detect that the file was rewritten by something else.
+
+    Args:
+        structure_path (str | Path): Path of the structure file, already in place.
+        offsets (dict[str, list[int]]): Byte range of each entry's value.
+        commit (Optional[str]): Commit the structure was generated at, if known.
+    """
+    stat = os.stat(structure_path)
+    index = {
+        "version": INDEX_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "offsets": offsets,
+    }
+    if commit is not None:
+        index["commit"] = commit
+    path = index_path(structure_path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_structure_commit(structure_path: str | Path) -> Optional[str]:
+    """
+    Get the commit a structure file was generated at, from its sidecar index.
+
+    Returns:
+        Optional[str]: The commit hash, None if it was not recorded or the index
+            does not describe the current file.
+    """
+    try:
+        stat = os.stat(structure_path)
+        with open(index_path(structure_path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        index.get("version") != INDEX_VERSION
+        or index.get("size") != stat.st_size
+        or index.get("mtime_ns") != stat.st_mtime_ns
+    ):
+        return None
+    return index.get("commit")
+
+
+def read_indent(structure_path: str | Path) -> Optional[int]:
+    """
+    Get the indentation a structure JSON file was written with.
+
+    Returns:
+        Optional[int]: Number of spaces before each key, None for compact output.
+    """
+    with open(structure_path, "r", encoding="utf-8") as f:
+        if f.read(2) != "{\n":
+            return None
+        line = f.readline()
+    return len(line) - len(line.lstrip(" "))
+
+
+class JsonStructureWriter:
+    """
+    Write a repository structure JSON file one file entry at a time.
+
+    Each entry is serialized and handed to the file as soon as it is written, so
+    memory use is bounded by the largest single file instead of the whole
+    repository. With `indent=2` the output is byte-identical to
+    `json.dumps(structure, ensure_ascii=False, indent=2)`, with `indent=None`
+    it is written without any whitespace.
+
+    The output is written to a temporary file and moved into place on `close`,
+    an interrupted run never leaves a truncated structure behind. A sidecar index
+    with the byte range of every entry is written next to it (see `index_path`),
+    letting readers load single entries without parsing the whole file.
+    """
+
+    def __init__(
+        self,
+        output_path: str | Path,
+        indent: Optional[int] = 2,
+        commit: Optional[str] = None,
+    ):
+        """
+        Args:
+            output_path (str | Path): Path of the JSON file to write.
+            indent (Optional[int]): Indentation of the output, None for compact output.
+            commit (Optional[str]): Commit the structure describes, recorded in the index.
+        """
+        self.output_path = Path(output_path)
+        self.indent = indent
+        self.commit = commit
+        self.entries = 0
+        self.offsets: dict[str, list[int]] = {}
+        self.position = 0
+        fd, self.tmp_path = tempfile.mkstemp(
+            dir=self.output_path.parent or ".", prefix=f".{self.output_path.name}."
+        )
+        self.file = os.fdopen(fd, "wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, file_path: str, file_data: FileData | dict):
+        """
+        Serialize the entry of one file and append it to the output.
+
+        Args:
+            file_path (str): Key of the entry.
+            file_data (FileData | dict): Structure of the file, or its already dumped dict.
+        """
+        if isinstance(file_data, FileData):
+            file_data = file_data.model_dump()
+
+        key = json.dumps(file_path, ensure_ascii=False)
+        if self.indent is None:
+            value = json.dumps(file_data, ensure_ascii=False, separators=(",", ":"))
+            prefix = ("{" if self.entries == 0 else ",") + f"{key}:"
+        else:
+            padding = " " * self.indent
+            value = json.dumps(file_data, ensure_ascii=False, indent=self.indent)
+            value = value.replace("\n", "\n" + padding)
+            prefix = ("{\n" if self.entries == 0 else ",\n") + f"{padding}{key}: "
+
+        prefix_bytes = prefix.encode("utf-8")
+        value_bytes = value.encode("utf-8")
+        start = self.position + len(prefix_bytes)
+        self.offsets[file_path] = [start, start + len(value_bytes)]
+        self.file.write(prefix_bytes)
+        self.file.write(value_bytes)
+        self.position = start + len(value_bytes)
+        self.entries += 1
+
+    def close(self):
+        """
+        Terminate the JSON object and move the file into place.
+        """
+        if self.entries == 0:
+            self.file.write(b"{}")
+        else:
+            self.file.write(b"}" if self.indent is None else b"\n}")
+        self.file.close()
+        os.replace(self.tmp_path, self.output_path)
+        write_index(self.output_path, self.offsets, self.commit)
+
+    def abort(self):
+        """
+        Discard everything written so far.
+        """
+        self.file.close()
+        os.unlink(self.tmp_path)
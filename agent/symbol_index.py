@@ -0,0 +1,210 @@
+# agent/symbol_index.py
+import os
+from collections import defaultdict
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from loguru import logger
+from agent.schemas import ClassInfo, FileData, FunctionInfo
+from agent.structure_binary import KIND_CLASS, KIND_METHOD
+
+
+def bare_class_name(class_name: str) -> str:
+    """
+    Strip the base classes from a class name as stored in the structure, "A(B, C)" -> "A".
+    """
+    return class_name.split("(", 1)[0].strip()
+
+
+def qualified_name(file_path: str, *names: str) -> str:
+    """
+    Build a repository-wide symbol name, e.g. "pkg/mod.py::Class.method".
+    """
+    return f"{file_path}::{'.'.join(names)}"
+
+
+@dataclass
+class FileSymbols:
+    """Name-keyed lookups over the definitions of one file."""
+
+    # Keyed by both the stored class name ("A(B)") and the bare name ("A").
+    classes: Dict[str, ClassInfo] = field(default_factory=dict)
+    # Bare class name -> method name -> method.
+    methods: Dict[str, Dict[str, FunctionInfo]] = field(default_factory=dict)
+    functions: Dict[str, FunctionInfo] = field(default_factory=dict)
+
+    @classmethod
+    def from_file_data(cls, file_data: FileData) -> "FileSymbols":
+        symbols = cls()
+        for class_info in file_data.classes:
+            name = bare_class_name(class_info.class_name)
+            symbols.classes.setdefault(class_info.class_name, class_info)
+            symbols.classes.setdefault(name, class_info)
+            methods = symbols.methods.setdefault(name, {})
+            for function in class_info.functions:
+                methods.setdefault(function.function_name, function)
+        for function in file_data.functions:
+            symbols.functions.setdefault(function.function_name, function)
+        return symbols
+
+
+class SymbolIndex:
+    """
+    Repository-wide symbol index over a structure mapping.
+
+    Per-file lookups (file -> class -> method) are built the first time a file is
+    queried. The global indexes (qualified names, short names and path suffixes)
+    are built on the first query that needs them, so a lazily loaded structure is
+    only read in full when a symbol has to be found without a correct file path.
+    """
+
+    def __init__(self, repo_structure: Mapping[str, FileData]):
+        self.repo_structure = repo_structure
+        self.file_symbols: Dict[str, FileSymbols] = {}
+        # Short name ("Class", "Class.method", "function") -> qualified names.
+        self.names: Optional[Dict[str, List[str]]] = None
+        # Path suffix ("mod.py", "pkg/mod.py", ...) -> structure keys.
+        self.path_suffixes: Optional[Dict[str, List[str]]] = None
+
+    def get_file_symbols(self, file_path: str) -> Optional[FileSymbols]:
+        symbols = self.file_symbols.get(file_path)
+        if symbols is None:
+            file_data = self.repo_structure.get(file_path)
+            if file_data is None:
+                return None
+            symbols = self.file_symbols[file_path] = FileSymbols.from_file_data(
+                file_data
+            )
+        return symbols
+
+    def get_class(self, file_path: str, class_name: str) -> Optional[ClassInfo]:
+        symbols = self.get_file_symbols(file_path)
+        return symbols.classes.get(class_name) if symbols else None
+
+    def get_method(
+        self, file_path: str, class_name: str, method_name: str
+    ) -> Optional[FunctionInfo]:
+        symbols = self.get_file_symbols(file_path)
+        if not symbols:
+            return None
+        return symbols.methods.get(bare_class_name(class_name), {}).get(method_name)
+
+    def get_function(
+        self, file_path: str, function_name: str
+    ) -> Optional[FunctionInfo]:
+        symbols = self.get_file_symbols(file_path)
+        return symbols.functions.get(function_name) if symbols else None
+
+    def lookup(self, name: str) -> Optional[ClassInfo | FunctionInfo]:
+        """
+        Look up a qualified name like "pkg/mod.py::Class.method" or "pkg/mod.py::function".
+        """
+        file_path, _, symbol = name.rpartition("::")
+        first, _, rest = symbol.partition(".")
+        if rest:
+            return self.get_method(file_path, first, rest)
+        return self.get_class(file_path, first) or self.get_function(file_path, first)
+
+    def build_global_index(self):
+        """
+        Index every definition of the repository by its short name.
+        """
+        self.names = defaultdict(list)
+        definitions = getattr(self.repo_structure, "definitions", None)
+        for file_path in self.repo_structure:
+            if definitions is not None:
+                # Binary stores can list definitions without building any model.
+                self.add_definitions(file_path, definitions(file_path))
+                continue
+            symbols = self.get_file_symbols(file_path)
+            for class_name, methods in symbols.methods.items():
+                self.names[class_name].append(qualified_name(file_path, class_name))
+                for method_name in methods:
+                    short_name = f"{class_name}.{method_name}"
+                    self.names[short_name].append(
+                        qualified_name(file_path, class_name, method_name)
+                    )
+            for function_name in symbols.functions:
+                self.names[function_name].append(
+                    qualified_name(file_path, function_name)
+                )
+
+    def add_definitions(self, file_path: str, definitions):
+        class_name = None
+        for kind, name, _, _ in definitions:
+            if kind == KIND_CLASS:
+                class_name = bare_class_name(name)
+                short_name = class_name
+                qualified = qualified_name(file_path, class_name)
+            elif kind == KIND_METHOD:
+                short_name = f"{class_name}.{name}"
+                qualified = qualified_name(file_path, class_name, name)
+            else:
+                short_name = name
+                qualified = qualified_name(file_path, name)
+            if qualified not in self.names[short_name]:
+                self.names[short_name].append(qualified)
+
+    def find(self, short_name: str) -> List[str]:
+        """
+        Find the qualified names of every definition called `short_name`,
+        e.g. "Class", "Class.method" or "function".
+        """
+        if self.names is None:
+            self.build_global_index()
+        class_name, dot, method_name = short_name.partition(".")
+        return list(self.names.get(bare_class_name(class_name) + dot + method_name, []))
+
+    def find_class_files(self, class_name: str) -> List[str]:
+        """
+        Find the files defining a class.
+        """
+        return [name.rpartition("::")[0] for name in self.find(class_name)]
+
+    def find_files_by_suffix(self, file_path: str) -> List[str]:
+        """
+        Find the structure keys ending with the given path, e.g. "pkg/mod.py"
+        matches "./repo/pkg/mod.py".
+        """
+        if self.path_suffixes is None:
+            self.path_suffixes = defaultdict(list)
+            for key in self.repo_structure:
+                parts = os.path.normpath(key).split(os.sep)
+                for i in range(len(parts)):
+                    self.path_suffixes["/".join(parts[i:])].append(key)
+        return list(
+            self.path_suffixes.get(os.path.normpath(file_path).replace(os.sep, "/"), [])
+        )
+
+    def resolve_file(
+        self, file_path: str, class_names: Optional[List[str]] = None
+    ) -> Optional[str]:
+        """
+        Map a file path named by the LLM to a structure key.
+
+        The path is used as is if it exists, otherwise it is matched as a path
+        suffix, and if that is ambiguous or fails, the file defining all the
+        given classes is used.
+
+        Returns:
+            Optional[str]: The structure key, or None if it cannot be resolved uniquely.
+        """
+        if file_path in self.repo_structure:
+            return file_path
+
+        candidates = self.find_files_by_suffix(file_path)
+        if len(candidates) != 1 and class_names:
+            defining_files = None
+            for class_name in class_names:
+                files = set(self.find_class_files(class_name))
+                defining_files = (
+                    files if defining_files is None else defining_files & files
+                )
+            if candidates:
+                defining_files &= set(candidates)
+            candidates = sorted(defining_files)
+
+        if len(candidates) == 1:
+            logger.debug(f"Resolved {file_path} to {candidates[0]}")
+            return candidates[0]
+        return None
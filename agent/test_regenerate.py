@@ -6,10 +6,10 @@ from agent.llm import LLM
 
 
 async def start():
-    restorer = FileRestorer("filtered_repo_structure.json")
-    restored_content = restorer.restore_files_from_issues(
-        test_review_issue_to_locate_edit_position_output
-    )
+    with FileRestorer("filtered_repo_structure.json") as restorer:
+        restored_content = restorer.restore_files_from_issues(
+            test_review_issue_to_locate_edit_position_output
+        )
 
     llm = LLM()
 
@@ -5,8 +5,8 @@ from agent.file_restorer import FileRestorer
 
 
 async def start():
-    restorer = FileRestorer("filtered_repo_structure.json")
-    restored_content = restorer.restore_all_files()
+    with FileRestorer("filtered_repo_structure.json") as restorer:
+        restored_content = restorer.restore_all_files()
 
     review_issue_to_locate_edit_position_message = (
         review_issue_to_locate_edit_position_template.format_messages(
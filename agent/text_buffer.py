@@ -0,0 +1,275 @@
+# agent/text_buffer.py
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+Point = Tuple[int, int]
+
+READ_CHUNK_SIZE = 64 * 1024
+"""Maximum number of bytes returned by one `PieceTable.read_chunk` call."""
+
+CHAR_MARK_STEP = 256
+"""Bytes between the character count checkpoints of a buffer."""
+
+# UTF-8 continuation bytes, every other byte starts a character.
+CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+
+class PieceTable:
+    """
+    Editable UTF-8 text stored as a piece table.
+
+    The text is a sequence of pieces, each a slice of either the original bytes
+    or an append-only buffer of inserted bytes, so an edit splices the piece
+    list instead of copying the text. Newline positions of both buffers are
+    kept sorted, which turns line and point addressing into bisections.
+
+    Offsets are in bytes and points are (row, byte column) pairs, as in
+    tree-sitter. Character offsets, for `str` based callers, go through
+    character counts checkpointed every `CHAR_MARK_STEP` bytes of each buffer.
+    """
+
+    def __init__(self, text: bytes = b""):
+        self.buffers: List[bytes | bytearray] = [bytes(text), bytearray()]
+        self.newlines: List[List[int]] = [self.find_newlines(text, 0), []]
+        # Characters starting before each multiple of CHAR_MARK_STEP, per buffer.
+        self.char_marks: List[List[int]] = [[0], [0]]
+        self.extend_char_marks(0)
+        # (buffer, start, length, characters)
+        self.pieces: List[Tuple[int, int, int, int]] = []
+        if text:
+            self.pieces.append(self.make_piece(0, 0, len(text)))
+        self.index: Optional[tuple[list[int], list[int], list[int]]] = None
+
+    @staticmethod
+    def find_newlines(data: bytes, offset: int) -> List[int]:
+        positions = []
+        position = data.find(b"\n")
+        while position != -1:
+            positions.append(offset + position)
+            position = data.find(b"\n", position + 1)
+        return positions
+
+    def extend_char_marks(self, buffer: int):
+        data = self.buffers[buffer]
+        marks = self.char_marks[buffer]
+        while len(marks) * CHAR_MARK_STEP <= len(data):
+            end = len(marks) * CHAR_MARK_STEP
+            window = data[end - CHAR_MARK_STEP : end]
+            marks.append(marks[-1] + len(window.translate(None, CONTINUATION_BYTES)))
+
+    def count_chars(self, buffer: int, end: int) -> int:
+        """
+        Number of characters starting before a byte offset of a buffer.
+        """
+        mark = end // CHAR_MARK_STEP
+        window = self.buffers[buffer][mark * CHAR_MARK_STEP : end]
+        return self.char_marks[buffer][mark] + len(
+            window.translate(None, CONTINUATION_BYTES)
+        )
+
+    def make_piece(
+        self, buffer: int, start: int, length: int
+    ) -> Tuple[int, int, int, int]:
+        characters = self.count_chars(buffer, start + length) - self.count_chars(
+            buffer, start
+        )
+        return buffer, start, length, characters
+
+    def piece_newlines(self, buffer: int, start: int, end: int) -> int:
+        """
+        Number of newlines in a slice of a buffer.
+        """
+        newlines = self.newlines[buffer]
+        return bisect_left(newlines, end) - bisect_left(newlines, start)
+
+    def get_index(self) -> tuple[list[int], list[int], list[int]]:
+        """
+        Cumulative bytes, newlines and characters before each piece, and in total.
+
+        Rebuilt after an edit in time proportional to the number of pieces.
+        """
+        if self.index is None:
+            lengths = [length for _, _, length, _ in self.pieces]
+            rows = [
+                self.piece_newlines(buffer, start, start + length)
+                for buffer, start, length, _ in self.pieces
+            ]
+            chars = [characters for _, _, _, characters in self.pieces]
+            self.index = (
+                list(accumulate(lengths, initial=0)),
+                list(accumulate(rows, initial=0)),
+                list(accumulate(chars, initial=0)),
+            )
+        return self.index
+
+    def __len__(self) -> int:
+        return self.get_index()[0][-1]
+
+    @property
+    def char_length(self) -> int:
+        return self.get_index()[2][-1]
+
+    @property
+    def line_count(self) -> int:
+        return self.get_index()[1][-1] + 1
+
+    def find_piece(self, byte: int) -> int:
+        """
+        Index of the piece containing a byte offset, the number of pieces at the end.
+        """
+        offsets = self.get_index()[0]
+        if not 0 <= byte <= offsets[-1]:
+            raise IndexError(f"Byte offset {byte} out of range")
+        return (
+            bisect_right(offsets, byte) - 1 if byte < offsets[-1] else len(self.pieces)
+        )
+
+    def split(self, byte: int) -> int:
+        """
+        Make a piece start at a byte offset.
+
+        Returns:
+            int: Index of the piece starting at the offset.
+        """
+        index = self.find_piece(byte)
+        if index == len(self.pieces):
+            return index
+        offset = self.get_index()[0][index]
+        if offset == byte:
+            return index
+        buffer, start, length, _ = self.pieces[index]
+        head = byte - offset
+        self.pieces[index : index + 1] = [
+            self.make_piece(buffer, start, head),
+            self.make_piece(buffer, start + head, length - head),
+        ]
+        self.index = None
+        return index + 1
+
+    def replace(self, start_byte: int, end_byte: int, data: bytes):
+        """
+        Replace the bytes between two offsets.
+
+        Args:
+            start_byte (int): Start of the replaced range.
+            end_byte (int): End of the replaced range, `start_byte` for an insertion.
+            data (bytes): UTF-8 bytes to put in place of the range, b"" for a deletion.
+        """
+        if end_byte < start_byte:
+            raise ValueError(f"Invalid byte range ({start_byte}, {end_byte})")
+        # Splitting at the end only changes pieces after the start.
+        start_index = self.split(start_byte)
+        end_index = self.split(end_byte)
+        pieces = []
+        if data:
+            add = self.buffers[1]
+            self.newlines[1].extend(self.find_newlines(data, len(add)))
+            pieces.append((1, len(add), len(data), len(data.decode("utf-8"))))
+            add.extend(data)
+            self.extend_char_marks(1)
+        self.pieces[start_index:end_index] = pieces
+        self.index = None
+
+    def insert(self, byte: int, data: bytes):
+        self.replace(byte, byte, data)
+
+    def delete(self, start_byte: int, end_byte: int):
+        self.replace(start_byte, end_byte, b"")
+
+    def read(self, start_byte: int = 0, end_byte: Optional[int] = None) -> bytes:
+        """
+        Get the bytes between two offsets, to the end of the text by default.
+        """
+        offsets = self.get_index()[0]
+        end_byte = offsets[-1] if end_byte is None else min(end_byte, offsets[-1])
+        chunks = []
+        index = (
+            self.find_piece(start_byte) if start_byte < end_byte else len(self.pieces)
+        )
+        while index < len(self.pieces) and offsets[index] < end_byte:
+            buffer, start, length, _ = self.pieces[index]
+            offset = offsets[index]
+            chunk_start = start + max(start_byte - offset, 0)
+            chunk_end = start + min(end_byte - offset, length)
+            chunks.append(bytes(self.buffers[buffer][chunk_start:chunk_end]))
+            index += 1
+        return b"".join(chunks)
+
+    def read_chunk(self, byte: int, point: Optional[Point] = None) -> bytes:
+        """
+        Get the bytes from an offset to the end of its piece, at most `READ_CHUNK_SIZE`.
+
+        This is the read callback of `tree_sitter.Parser.parse`, which feeds the
+        parser chunk by chunk instead of materializing the whole text.
+        """
+        offsets = self.get_index()[0]
+        if byte >= offsets[-1]:
+            return b""
+        index = self.find_piece(byte)
+        buffer, start, length, _ = self.pieces[index]
+        chunk_start = start + byte - offsets[index]
+        chunk_end = min(start + length, chunk_start + READ_CHUNK_SIZE)
+        return bytes(self.buffers[buffer][chunk_start:chunk_end])
+
+    def line_to_byte(self, row: int) -> int:
+        """
+        Byte offset of the start of a (0-based) line.
+        """
+        offsets, rows, _ = self.get_index()
+        if not 0 <= row <= rows[-1]:
+            raise IndexError(f"Line {row} out of range")
+        if row == 0:
+            return 0
+        # The piece holding the newline that ends the previous line.
+        index = bisect_left(rows, row) - 1
+        buffer, start, _, _ = self.pieces[index]
+        newlines = self.newlines[buffer]
+        newline = newlines[bisect_left(newlines, start) + row - rows[index] - 1]
+        return offsets[index] + newline - start + 1
+
+    def byte_to_point(self, byte: int) -> Point:
+        offsets, rows, _ = self.get_index()
+        index = self.find_piece(byte)
+        row = rows[index]
+        if index < len(self.pieces):
+            buffer, start, _, _ = self.pieces[index]
+            row += self.piece_newlines(buffer, start, start + byte - offsets[index])
+        return row, byte - self.line_to_byte(row)
+
+    def point_to_byte(self, point: Point) -> int:
+        row, column = point
+        return self.line_to_byte(row) + column
+
+    def char_to_byte(self, position: int) -> int:
+        """
+        Byte offset of a character offset.
+        """
+        offsets, _, chars = self.get_index()
+        if not 0 <= position <= chars[-1]:
+            raise IndexError(f"Character offset {position} out of range")
+        if position == chars[-1]:
+            return offsets[-1]
+        index = bisect_right(chars, position) - 1
+        buffer, start, length, characters = self.pieces[index]
+        head = position - chars[index]
+        if characters == length:
+            # ASCII only, every byte is a character.
+            return offsets[index] + head
+
+        # Scan from the last checkpoint before the character for its first byte.
+        target = self.count_chars(buffer, start) + head
+        marks = self.char_marks[buffer]
+        mark = bisect_right(marks, target) - 1
+        remaining = target - marks[mark]
+        data = self.buffers[buffer]
+        byte = mark * CHAR_MARK_STEP
+        while True:
+            if data[byte] & 0xC0 != 0x80:
+                if remaining == 0:
+                    return offsets[index] + byte - start
+                remaining -= 1
+            byte += 1
+
+    def __str__(self) -> str:
+        return self.read().decode("utf-8")
@@ -0,0 +1,75 @@
+# agent/tree_cache.py
+import hashlib
+import os
+from typing import Callable, Optional
+from agent.disk_cache import DiskCache
+
+# Bump whenever the rendered tree format changes.
+TREE_FORMAT_VERSION = 1
+
+
+def score_key(score: Optional[Callable]) -> Optional[str]:
+    """
+    Name a score function so it can be part of a cache key.
+
+    Returns:
+        Optional[str]: "module.qualname", "" for the default score, or None for
+            lambdas and local functions, whose name does not identify them.
+    """
+    if score is None:
+        return ""
+    qualname = getattr(score, "__qualname__", None)
+    if qualname is None or "<" in qualname:
+        return None
+    return f"{score.__module__}.{qualname}"
+
+
+class TreeStringCache(DiskCache):
+    """
+    Persistent cache of directory tree strings.
+
+    The tree only depends on the filtered file list and the rendering options,
+    so runs over many issues of the same repository render it once.
+    """
+
+    def make_key(
+        self,
+        directory: str,
+        language: str,
+        paths: list,
+        budget: Optional[int] = None,
+        score: Optional[Callable] = None,
+    ) -> Optional[str]:
+        """
+        Build the cache key of a tree.
+
+        Args:
+            directory (str): The checked directory.
+            language (str): The target language.
+            paths (list): Sorted path parts of the filtered files.
+            budget (Optional[int]): Character budget of the tree.
+            score (Optional[Callable]): Score function of the budgeted renderer.
+
+        Returns:
+            Optional[str]: Hex digest identifying the tree, or None if the score
+                function cannot be named and the tree must not be cached.
+        """
+        score_name = score_key(score)
+        if score_name is None:
+            return None
+        digest = hashlib.sha256()
+        digest.update(
+            f"{TREE_FORMAT_VERSION}\0{os.path.abspath(directory)}\0{language}\0"
+            f"{budget}\0{score_name}\0".encode("utf-8")
+        )
+        for parts in paths:
+            digest.update("/".join(parts).encode("utf-8", "surrogateescape"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get_tree_string(self, key: str) -> Optional[str]:
+        value = self.get(key)
+        return None if value is None else value.decode("utf-8", "surrogateescape")
+
+    def put_tree_string(self, key: str, tree_string: str):
+        self.put(key, tree_string.encode("utf-8", "surrogateescape"))
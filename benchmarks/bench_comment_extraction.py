@@ -0,0 +1,86 @@
+# benchmarks/bench_comment_extraction.py
+"""
+Compare per-byte backward comment lookup with the single-pass comment index used
+by `SingleFileMap` when building function sketches.
+
+Usage: python -m benchmarks.bench_comment_extraction [functions] [comment_lines]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from agent.file_map import SingleFileMap
+from agent.parser_registry import get_parser
+
+
+def generate_source(functions: int, comment_lines: int) -> str:
+    preamble = "".join(f"# license line {i}\n" for i in range(comment_lines * 20))
+    blocks = []
+    for i in range(functions):
+        comments = "".join(
+            f"# comment {j} for function {i}\n" for j in range(comment_lines)
+        )
+        blocks.append(f"{comments}def function_{i}(a, b: int) -> int:\n    return a\n")
+    return preamble + "\n\n".join(blocks)
+
+
+def per_byte_comments(root_node, function_node, source_code: bytes) -> list[str]:
+    """
+    Backward walk issuing one tree query per byte, as the sketch builder used to do.
+    """
+    comments = []
+    i = function_node.start_byte - 1
+    while i >= 0:
+        if source_code[i : i + 1].isspace():
+            i -= 1
+            continue
+        node = root_node.descendant_for_byte_range(i, i + 1)
+        if node is None or node.type != "comment":
+            break
+        comments.insert(0, source_code[node.start_byte : node.end_byte].decode())
+        i = node.start_byte - 1
+        while i >= 0 and source_code[i : i + 1].isspace():
+            i -= 1
+        # every byte of the comment is queried on the way back
+        for j in range(node.start_byte, node.end_byte):
+            root_node.descendant_for_byte_range(j, j + 1)
+    return comments
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    comment_lines = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    source = generate_source(functions, comment_lines)
+
+    source_code = source.encode("utf-8")
+    tree = get_parser("python").parse(source_code)
+    function_nodes = [
+        node for node in tree.root_node.children if node.type == "function_definition"
+    ]
+
+    start_time = time.perf_counter()
+    for node in function_nodes:
+        per_byte_comments(tree.root_node, node, source_code)
+    per_byte_seconds = time.perf_counter() - start_time
+
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(source)
+    try:
+        start_time = time.perf_counter()
+        file_map = SingleFileMap(f.name)
+        file_map.visit_node(tree.root_node, source_code)
+        single_pass_seconds = time.perf_counter() - start_time
+    finally:
+        os.unlink(f.name)
+
+    print(
+        f"{functions} functions, {comment_lines} comment lines each, "
+        f"{len(source_code)} bytes"
+    )
+    print(f"per-byte lookup (comments only): {per_byte_seconds:.3f}s")
+    print(f"single pass (full sketch build): {single_pass_seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
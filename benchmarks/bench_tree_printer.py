@@ -0,0 +1,45 @@
+# benchmarks/bench_tree_printer.py
+"""
+Time `DirectoryTreePrinter.generate_tree_string` on synthetic file lists, with and
+without a character budget.
+
+Usage: python -m benchmarks.bench_tree_printer [paths] [max_depth]
+"""
+
+import random
+import sys
+import time
+from agent.directory_tree_printer import DirectoryTreePrinter
+
+
+def generate_paths(count: int, max_depth: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        depth = rng.randint(0, max_depth)
+        directories = [f"dir_{rng.randint(0, 9)}_{level}" for level in range(depth)]
+        paths.append("/".join(directories + [f"module_{i}.py"]))
+    return paths
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    max_depth = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    paths = generate_paths(count, max_depth)
+    printer = DirectoryTreePrinter("/tmp/synthetic_repo")
+
+    start_time = time.perf_counter()
+    tree_string = printer.generate_tree_string(paths)
+    full_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    budgeted = printer.generate_tree_string(paths, max_chars=16_000)
+    budget_seconds = time.perf_counter() - start_time
+
+    print(f"{count} paths, depth up to {max_depth}")
+    print(f"full tree: {full_seconds:.3f}s, {len(tree_string)} characters")
+    print(f"16k character budget: {budget_seconds:.3f}s, {len(budgeted)} characters")
+
+
+if __name__ == "__main__":
+    main()
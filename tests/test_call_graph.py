@@ -0,0 +1,87 @@
+# test_call_graph.py
+import pytest
+from agent.call_graph import CallGraph
+from agent.file_map_with_call import FileMap
+
+SOURCE = """import os
+
+
+def top(a):
+    return helper(os.path.join(a, "x"))
+
+
+def helper(p):
+    return len(p)
+
+
+class Worker:
+    def run(self):
+        self.step()
+
+        def inner():
+            top(1)
+
+        return inner
+
+    def step(self):
+        pass
+
+
+top(2)
+"""
+
+
+def build_call_graph(tmp_path) -> CallGraph:
+    path = tmp_path / "mod.py"
+    path.write_text(SOURCE, encoding="utf-8")
+    file_map = FileMap([str(path)])
+    tree, source_code = file_map.parse_file(str(path))
+    file_map.visit_node(tree.root_node, source_code, "mod.py")
+    return file_map.call_graph
+
+
+def test_calls_attributed_to_enclosing_definition(tmp_path):
+    graph = build_call_graph(tmp_path)
+    assert graph.callees("mod.py::top") == {"mod.py::helper", "os.path.join"}
+    assert graph.callees("mod.py::Worker.run") == {"mod.py::Worker.step"}
+    assert graph.callees("mod.py::Worker.run.inner") == {"mod.py::top"}
+    assert graph.callees("mod.py::<top-level>") == {"mod.py::top"}
+    # Builtins are not recorded.
+    assert graph.callees("mod.py::helper") == set()
+    assert graph.callers("mod.py::top") == {
+        "mod.py::<top-level>",
+        "mod.py::Worker.run.inner",
+    }
+
+
+def test_save_load_and_queries(tmp_path):
+    graph = build_call_graph(tmp_path)
+    index_path = tmp_path / "call_graph.json"
+    graph.save(str(index_path))
+    loaded = CallGraph.load(str(index_path))
+    assert loaded.callees_of == graph.callees_of
+    assert loaded.callers_of == graph.callers_of
+
+    assert loaded.related(["mod.py::helper"]) == {"mod.py::top"}
+    assert loaded.related(["mod.py::helper"], depth=2) == {
+        "mod.py::top",
+        "os.path.join",
+        "mod.py::<top-level>",
+        "mod.py::Worker.run.inner",
+    }
+
+    loaded.remove_file("mod.py")
+    assert loaded.callees_of == {}
+    assert loaded.callers_of == {}
+
+
+def test_non_python_files_are_rejected(tmp_path):
+    path = tmp_path / "app.js"
+    path.write_text("function top() { helper(); }\n", encoding="utf-8")
+    file_map = FileMap([str(path)])
+    with pytest.raises(ValueError):
+        file_map.parse_file(str(path))
+
+    file_map.generate_file_map()
+    assert not file_map.file_map
+    assert not file_map.call_graph.callees(f"{path}::top")
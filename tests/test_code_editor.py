@@ -0,0 +1,108 @@
+# test_code_editor.py
+import pytest
+from agent.code_editor import CodeEditor
+from agent.parser_registry import get_parser
+
+SOURCE = '''class Example:
+    """Grüße 👋"""
+
+    def sync_function(self):
+        pass
+
+    async def async_function(self, a: int) -> str:
+        return "é"
+'''
+
+
+def assert_tree_matches_source(editor: CodeEditor):
+    fresh = get_parser("python").parse(editor.source_code.encode("utf-8"))
+    assert str(editor.tree.root_node) == str(fresh.root_node)
+    assert editor.tree.root_node.end_byte == len(editor.source_code.encode("utf-8"))
+    assert editor.get_node_text(editor.tree.root_node) == editor.source_code
+
+
+def function_names(editor: CodeEditor) -> list[str]:
+    return [
+        editor.get_node_text(node.child_by_field_name("name"))
+        for node in editor.find_node_by_type("function_definition")
+    ]
+
+
+def test_single_edits_reparse_incrementally():
+    editor = CodeEditor(SOURCE, "python")
+
+    editor.insert_code(0, "# 新的一行\n")
+    assert_tree_matches_source(editor)
+
+    position = editor.source_code.index("pass")
+    editor.replace_code(position, position + 4, "return 'ü'\n        pass")
+    assert_tree_matches_source(editor)
+
+    start = editor.source_code.index("    async def")
+    editor.delete_code(start, len(editor.source_code))
+    assert_tree_matches_source(editor)
+    assert function_names(editor) == ["sync_function"]
+
+
+def test_apply_edits_in_one_pass():
+    editor = CodeEditor(SOURCE, "python")
+    doc = SOURCE.index("Grüße")
+    name = SOURCE.index("async_function")
+    annotation = SOURCE.index("a: int") + len("a: ")
+
+    editor.apply_edits(
+        [
+            (annotation, annotation + 3, "float"),
+            (doc, doc + len("Grüße"), "Hello"),
+            (name, name + len("async_function"), "renamed"),
+            (len(SOURCE), len(SOURCE), "\n\ndef added():\n    pass\n"),
+        ]
+    )
+
+    assert editor.source_code == (
+        SOURCE.replace("Grüße", "Hello")
+        .replace("async_function", "renamed")
+        .replace("a: int", "a: float")
+        + "\n\ndef added():\n    pass\n"
+    )
+    assert_tree_matches_source(editor)
+    assert function_names(editor) == ["sync_function", "renamed", "added"]
+
+
+def test_apply_edits_rejects_overlaps():
+    editor = CodeEditor(SOURCE, "python")
+    with pytest.raises(ValueError):
+        editor.apply_edits([(0, 10, "a"), (5, 12, "b")])
+    with pytest.raises(ValueError):
+        editor.apply_edits([(0, len(SOURCE) + 1, "")])
+    assert editor.source_code == SOURCE
+
+
+def test_replace_lines():
+    editor = CodeEditor(SOURCE, "python")
+    lines = SOURCE.splitlines(True)
+
+    editor.replace_lines(4, 5, "    def sync_function(self, b):\n        return b\n")
+    editor.replace_lines(2, 1, "    name = 'ü'\n")
+    editor.replace_lines(9, 9, "")
+
+    lines[3:5] = ["    def sync_function(self, b):\n", "        return b\n"]
+    lines.insert(1, "    name = 'ü'\n")
+    del lines[8]
+    assert editor.source_code == "".join(lines)
+    assert_tree_matches_source(editor)
+    with pytest.raises(ValueError):
+        editor.replace_lines(3, 20, "")
+
+
+def test_replace_lines_appends_after_last_line():
+    editor = CodeEditor("a = 1\nb = 2", "python")
+    editor.replace_lines(3, 2, "c = 3\n")
+    assert editor.source_code == "a = 1\nb = 2\nc = 3\n"
+    assert_tree_matches_source(editor)
+
+    editor.replace_lines(5, 4, "d = 4\n")
+    assert editor.source_code == "a = 1\nb = 2\nc = 3\nd = 4\n"
+    assert_tree_matches_source(editor)
+    with pytest.raises(ValueError):
+        editor.replace_lines(7, 6, "")
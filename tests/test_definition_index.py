@@ -0,0 +1,76 @@
+# test_definition_index.py
+import random
+from agent.code_editor import CodeEditor
+from agent.parser_registry import get_parser
+
+SNIPPETS = [
+    "def alpha(x):\n    return x\n",
+    "class Beta:\n    def alpha(self):\n        pass\n",
+    "async def gamma():\n    pass\n",
+    "@decorator\nclass Gamma(Beta):\n    value = 'ü'\n",
+    "x = '''\n",
+    "    def beta(self):\n        return 1\n",
+    "",
+    "\n",
+]
+NAMES = ["alpha", "beta", "gamma", "Beta", "Gamma"]
+
+
+def expected_definitions(source_code: str, node_type: str, name: str):
+    tree = get_parser("python").parse(source_code.encode("utf-8"))
+    ranges = []
+    cursor = tree.walk()
+    while True:
+        node = cursor.node
+        if node.type == node_type:
+            name_node = node.child_by_field_name("name")
+            if name_node is not None and name_node.text.decode("utf-8") == name:
+                ranges.append((node.start_byte, node.end_byte))
+        if cursor.goto_first_child():
+            continue
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                return ranges
+
+
+def test_index_follows_random_edits():
+    rng = random.Random(0)
+    editor = CodeEditor("".join(SNIPPETS[:4]), "python")
+    assert editor.get_class_definition("Gamma") is not None
+
+    for _ in range(150):
+        line_count = editor.buffer.line_count
+        start_line = rng.randint(1, line_count)
+        end_line = rng.randint(start_line - 1, min(line_count, start_line + 3))
+        edits = rng.randint(1, 3)
+        if edits == 1:
+            editor.replace_lines(start_line, end_line, rng.choice(SNIPPETS))
+        else:
+            length = editor.buffer.char_length
+            positions = sorted(rng.sample(range(length + 1), 2 * edits))
+            editor.apply_edits(
+                [
+                    (positions[2 * i], positions[2 * i + 1], rng.choice(SNIPPETS))
+                    for i in range(edits)
+                ]
+            )
+
+        for node_type in ["function_definition", "class_definition"]:
+            for name in NAMES:
+                found = [
+                    (node.start_byte, node.end_byte)
+                    for node in editor.find_definitions(node_type, name)
+                ]
+                assert found == expected_definitions(
+                    editor.source_code, node_type, name
+                ), (node_type, name, editor.source_code)
+
+
+def test_lookups_without_definition_query():
+    editor = CodeEditor("class A {};\nclass B {};\n", "cpp")
+    assert editor.definitions is None
+    (node,) = editor.find_definitions("class_specifier", "B")
+    assert node.start_point == (1, 0)
+    editor.insert_code(0, "class B;\n")
+    (node,) = editor.find_definitions("class_specifier", "B")[1:]
+    assert node.start_point == (2, 0)
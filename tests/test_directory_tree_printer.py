@@ -0,0 +1,80 @@
+# test_directory_tree_printer.py
+from agent.directory_tree_printer import DirectoryTreePrinter
+
+FILES = [
+    "setup.py",
+    "README.md",
+    "pkg/__init__.py",
+    "pkg/core.py",
+    "pkg/sub/deep.py",
+    "tests/test_a.py",
+    "tests/test_b.py",
+    "tests/test_c.py",
+]
+
+
+def test_generate_tree_string():
+    printer = DirectoryTreePrinter("/tmp/repo")
+    assert printer.generate_tree_string(FILES) == "\n".join(
+        [
+            "repo",
+            "├── pkg",
+            "│   ├── __init__.py",
+            "│   ├── core.py",
+            "│   └── sub",
+            "│       └── deep.py",
+            "├── setup.py",
+            "└── tests",
+            "    ├── test_a.py",
+            "    ├── test_b.py",
+            "    └── test_c.py",
+        ]
+    )
+
+
+def test_budget_collapses_subtrees():
+    printer = DirectoryTreePrinter("/tmp/repo")
+    tree = printer.generate_tree_string(FILES, max_chars=120)
+    assert len(tree) <= 120
+    assert tree == "\n".join(
+        [
+            "repo",
+            "├── pkg",
+            "│   ├── __init__.py",
+            "│   ├── core.py",
+            "│   └── sub",
+            "│       └── deep.py",
+            "├── setup.py",
+            "└── tests/ (3 files)",
+        ]
+    )
+
+    assert printer.generate_tree_string(FILES, max_tokens=2) == "repo/ (7 files)\n"
+
+
+def test_budget_summarizes_wide_directories():
+    files = [f"pkg/module_{i}.py" for i in range(50)] + ["pkg/sub/a.py"]
+    tree = DirectoryTreePrinter("/tmp/repo").generate_tree_string(files, max_chars=80)
+    assert tree == "\n".join(
+        ["repo", "└── pkg", "    ├── sub", "    │   └── a.py", "    └── ... (50 files)"]
+    )
+
+
+def test_budget_score():
+    printer = DirectoryTreePrinter("/tmp/repo")
+
+    def prefer_tests(node):
+        return 1 if node.name == "tests" else -node.depth
+
+    lines = list(printer.iter_tree_lines(FILES, max_chars=120, score=prefer_tests))
+    assert "└── tests" in lines
+    assert "├── pkg/ (3 files)" in lines
+
+
+def test_deep_tree_and_duplicates():
+    deep = "/".join(f"d{i}" for i in range(3000)) + "/leaf.py"
+    printer = DirectoryTreePrinter("/tmp/repo")
+    lines = printer.generate_tree_string([deep, "./" + deep, "a.py"]).split("\n")
+    assert len(lines) == 3003
+    assert lines[1] == "├── a.py"
+    assert lines[-1] == " " * 4 * 3000 + "└── leaf.py"
@@ -0,0 +1,177 @@
+# test_file_map.py
+import json
+from agent.call_graph import CallGraph
+from agent.file_map import MultiFileMap, parse_file_data
+
+
+SOURCE = """import os
+
+
+class Example(Base):
+    value = 1
+
+    def method(self, a: int) -> int:
+        return a
+
+
+def helper(x):
+    return x
+"""
+
+
+def write_sources(tmp_path, count):
+    file_paths = []
+    for i in range(count):
+        file_path = tmp_path / f"module_{i}.py"
+        file_path.write_text(SOURCE.replace("helper", f"helper_{i}"), encoding="utf-8")
+        file_paths.append(str(file_path))
+    return file_paths
+
+
+def test_save_serial(tmp_path):
+    file_paths = write_sources(tmp_path, 2)
+    output_path = tmp_path / "repo_structure.json"
+
+    MultiFileMap(file_paths, output_path).save()
+
+    structure = json.loads(output_path.read_text(encoding="utf-8"))
+    assert list(structure) == file_paths
+    file_data = structure[file_paths[1]]
+    assert file_data["classes"][0]["class_name"] == "Example(Base)"
+    assert file_data["classes"][0]["functions"][0]["function_name"] == "method"
+    assert file_data["functions"][0]["function_name"] == "helper_1"
+
+
+def test_save_parallel_matches_serial(tmp_path):
+    file_paths = write_sources(tmp_path, 7)
+    serial_path = tmp_path / "serial.json"
+    parallel_path = tmp_path / "parallel.json"
+
+    MultiFileMap(file_paths, serial_path).save()
+    file_map = MultiFileMap(file_paths, parallel_path, workers=2, chunk_size=2)
+    file_map.save()
+
+    assert parallel_path.read_text(encoding="utf-8") == serial_path.read_text(
+        encoding="utf-8"
+    )
+    assert sum(stats.files for stats in file_map.worker_stats.values()) == 7
+    assert sum(stats.chunks for stats in file_map.worker_stats.values()) == 4
+
+
+def test_sketch_includes_leading_comments(tmp_path):
+    source_path = tmp_path / "commented.py"
+    source_path.write_text(
+        "x = 1  # trailing, not a leading comment\n"
+        "# first\n"
+        "# second\n"
+        "def foo(a: int) -> int:\n"
+        "    return a\n"
+        "\n"
+        "\n"
+        "class Example:\n"
+        "    # about bar\n"
+        "    @property\n"
+        "    def bar(self):\n"
+        "        pass\n",
+        encoding="utf-8",
+    )
+
+    file_data = parse_file_data(str(source_path))
+
+    assert file_data.functions[0].sketch == "# first\n# second\ndef foo(a: int) -> int"
+    method = file_data.classes[0].functions[0]
+    assert method.sketch == "# about bar\n@property\ndef bar(self)"
+
+
+def test_single_pass_signatures_attributes_and_calls(tmp_path):
+    source_path = tmp_path / "calls.py"
+    source_path.write_text(
+        "import os\n"
+        "from .util import helper as h\n\n\n"
+        "class Worker(Base):\n"
+        "    retries = 3\n\n"
+        "    @staticmethod\n"
+        "    async def run(path: str, n=1) -> str:\n"
+        "        h(path)\n"
+        "        return os.path.join(path, Worker.step())\n\n"
+        "    def step(self):\n"
+        "        self.run('x')\n\n\n"
+        "print(Worker())\n",
+        encoding="utf-8",
+    )
+
+    file_data = parse_file_data(str(source_path))
+
+    worker = file_data.classes[0]
+    assert [(a.name, a.value) for a in worker.attributes] == [("retries", "3")]
+    run = worker.functions[0]
+    assert [(p.name, p.type) for p in run.parameters] == [("path", "str")]
+    assert run.return_type == "str"
+    assert run.is_async
+    assert [d.decorator_name for d in run.decorators] == ["@staticmethod"]
+    assert [
+        (c.caller, c.callee, c.imported, c.start_line) for c in file_data.calls
+    ] == [
+        ("Worker.run", ".util.helper", True, 10),
+        ("Worker.run", "os.path.join", True, 11),
+        ("Worker.run", "Worker.step", False, 11),
+        ("Worker.step", "Worker.run", False, 14),
+        ("<top-level>", "Worker", False, 17),
+    ]
+
+
+def test_sections_after_nested_blocks_are_recorded(tmp_path):
+    source_path = tmp_path / "nested.py"
+    source_path.write_text(
+        "try:\n"
+        "    import json\n"
+        "except ImportError:\n"
+        "    json = None\n\n\n"
+        "def after():\n"
+        "    pass\n\n\n"
+        "class Later:\n"
+        "    pass\n",
+        encoding="utf-8",
+    )
+
+    file_data = parse_file_data(str(source_path))
+
+    # Sections nested in a block are recorded, and so is everything after the
+    # block; the walk used to stop at the end of the last nested block.
+    assert [i.text for i in file_data.imports] == ["import json"]
+    assert [t.text for t in file_data.top_level] == ["json = None"]
+    assert [f.function_name for f in file_data.functions] == ["after"]
+    assert [c.class_name for c in file_data.classes] == ["Later"]
+
+
+def test_unsupported_nodes_are_not_printed(tmp_path, capsys):
+    source_path = tmp_path / "loops.py"
+    source_path.write_text(
+        "# comment\nfor i in range(3):\n    pass\n\n\ndef f():\n    # note\n    pass\n",
+        encoding="utf-8",
+    )
+
+    file_data = parse_file_data(str(source_path))
+
+    assert [f.function_name for f in file_data.functions] == ["f"]
+    assert capsys.readouterr().out == ""
+
+
+def test_save_call_graph_from_same_parse(tmp_path):
+    package = tmp_path / "pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("", encoding="utf-8")
+    (package / "util.py").write_text("def helper(x):\n    return x\n", encoding="utf-8")
+    (package / "mod.py").write_text(
+        "from .util import helper\n\n\ndef run():\n    return helper(1)\n",
+        encoding="utf-8",
+    )
+    file_paths = [str(package / name) for name in ["__init__.py", "util.py", "mod.py"]]
+    call_graph_path = tmp_path / "call_graph.json"
+
+    MultiFileMap(
+        file_paths, tmp_path / "repo_structure.json", call_graph_path=call_graph_path
+    ).save()
+
+    graph = CallGraph.load(str(call_graph_path))
+    assert graph.callees(f"{file_paths[2]}::run") == {f"{file_paths[1]}::helper"}
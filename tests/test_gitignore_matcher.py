@@ -0,0 +1,261 @@
+# test_gitignore_matcher.py
+import pytest
+from git import Repo
+from agent.gitignore_matcher import (
+    GitIgnoreMatcher,
+    IgnoreRules,
+    compile_rules,
+    find_template,
+)
+
+
+RULES = IgnoreRules(
+    [
+        "# comment",
+        "*.pyc",
+        "/build",
+        "dist/",
+        "docs/*.md",
+        "**/generated",
+        "logs/**",
+        "a/**/z.txt",
+        "data?.csv",
+        "[abc]x.py",
+        "!keep.pyc",
+        "cache/",
+        "!cache/important/",
+        "trailing.txt   ",
+        "\\#literal",
+    ]
+)
+
+
+@pytest.mark.parametrize(
+    "path, is_dir, expected",
+    [
+        ("mod.pyc", False, True),
+        ("pkg/mod.pyc", False, True),
+        ("keep.pyc", False, False),
+        ("pkg/keep.pyc", False, False),
+        ("build", True, True),
+        ("build/lib/x.py", False, None),
+        ("src/build", True, None),
+        ("dist", True, True),
+        ("dist", False, None),
+        ("pkg/dist/x.py", False, None),
+        ("docs/readme.md", False, True),
+        ("docs/api/readme.md", False, None),
+        ("pkg/generated", True, True),
+        ("generated/x.py", False, None),
+        ("logs/app/x.log", False, True),
+        ("logs", True, None),
+        ("a/z.txt", False, True),
+        ("a/b/c/z.txt", False, True),
+        ("data1.csv", False, True),
+        ("data10.csv", False, None),
+        ("bx.py", False, True),
+        ("dx.py", False, None),
+        ("cache/tmp.py", False, None),
+        ("cache/important", True, False),
+        ("trailing.txt", False, True),
+        ("#literal", False, True),
+        ("src/main.py", False, None),
+    ],
+)
+def test_ignore_rules(path, is_dir, expected):
+    assert RULES.match(path, is_dir) is expected
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "build/lib/x.py",
+        "pkg/dist/x.py",
+        "generated/x.py",
+        "cache/tmp.py",
+        "cache/important/x.py",
+    ],
+)
+def test_ignored_parent_directory(tmp_path, path):
+    matcher = GitIgnoreMatcher(use_git_index=False)
+    matcher.set_base_directory(str(tmp_path))
+    matcher.rules = RULES
+    assert matcher.is_ignored(path, is_dir=False)
+
+
+def test_negated_directory_contents_are_matched_again(tmp_path):
+    (tmp_path / ".gitignore").write_text("foo/*\n!foo/sub\n", encoding="utf-8")
+    (tmp_path / "foo" / "sub").mkdir(parents=True)
+    (tmp_path / "foo" / "sub" / "x.txt").write_text("", encoding="utf-8")
+    (tmp_path / "foo" / "y.txt").write_text("", encoding="utf-8")
+
+    matcher = GitIgnoreMatcher(use_git_index=False)
+    assert matcher.check_directory(str(tmp_path)) == [".gitignore", "foo/sub/x.txt"]
+
+
+def test_check_directory(tmp_path):
+    (tmp_path / ".gitignore").write_text("*.log\nvendor/\n", encoding="utf-8")
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "vendor" / "lib.py").write_text("", encoding="utf-8")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("", encoding="utf-8")
+    (tmp_path / "pkg" / "debug.log").write_text("", encoding="utf-8")
+    (tmp_path / "main.py").write_text("", encoding="utf-8")
+
+    matcher = GitIgnoreMatcher()
+    not_ignored = matcher.check_directory(str(tmp_path))
+
+    assert sorted(not_ignored) == [".gitignore", "main.py", "pkg/mod.py"]
+    assert matcher.is_ignored("vendor")
+
+
+def test_check_directory_is_sorted(tmp_path):
+    for name in ["d", "c", "b", "a"]:
+        (tmp_path / name / "sub").mkdir(parents=True)
+        (tmp_path / name / "sub" / "f.py").write_text("", encoding="utf-8")
+        (tmp_path / name / "g.py").write_text("", encoding="utf-8")
+
+    matcher = GitIgnoreMatcher(use_git_index=False, max_workers=4)
+    not_ignored = matcher.check_directory(str(tmp_path))
+    assert not_ignored == sorted(not_ignored)
+    assert len(not_ignored) == 8
+
+
+def test_negated_directory_does_not_reinclude_its_contents(tmp_path):
+    (tmp_path / ".gitignore").write_text("*.txt\n!foo\n", encoding="utf-8")
+    (tmp_path / "foo").mkdir()
+    (tmp_path / "foo" / "bar.txt").write_text("", encoding="utf-8")
+    (tmp_path / "foo" / "bar.py").write_text("", encoding="utf-8")
+    (tmp_path / "foo.txt").write_text("", encoding="utf-8")
+
+    matcher = GitIgnoreMatcher(use_git_index=False)
+    not_ignored = matcher.check_directory(str(tmp_path))
+
+    assert sorted(not_ignored) == [".gitignore", "foo/bar.py"]
+    assert matcher.is_ignored("foo/bar.txt")
+    assert not matcher.is_ignored("foo")
+
+
+def test_check_directory_git_index(tmp_path):
+    repo = Repo.init(tmp_path)
+    (tmp_path / ".gitignore").write_text("*.log\n", encoding="utf-8")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / ".gitignore").write_text("local.py\n", encoding="utf-8")
+    (tmp_path / "pkg" / "mod.py").write_text("", encoding="utf-8")
+    (tmp_path / "pkg" / "local.py").write_text("", encoding="utf-8")
+    (tmp_path / "removed.py").write_text("", encoding="utf-8")
+    repo.index.add([".gitignore", "pkg/.gitignore", "pkg/mod.py", "removed.py"])
+    (tmp_path / "removed.py").unlink()
+    (tmp_path / "new.py").write_text("", encoding="utf-8")
+    (tmp_path / "debug.log").write_text("", encoding="utf-8")
+
+    tracked = GitIgnoreMatcher().check_directory(str(tmp_path))
+    assert sorted(tracked) == [".gitignore", "pkg/.gitignore", "pkg/mod.py"]
+
+    matcher = GitIgnoreMatcher(include_untracked=True)
+    listed = matcher.check_directory(str(tmp_path))
+    assert sorted(listed) == [".gitignore", "new.py", "pkg/.gitignore", "pkg/mod.py"]
+    # The patterns are only loaded when falling back to the scanner.
+    assert matcher.patterns == []
+
+
+def test_supplied_gitignore_in_git_work_tree(tmp_path):
+    repo = Repo.init(tmp_path / "repo")
+    work_tree = tmp_path / "repo"
+    (work_tree / "mod.py").write_text("", encoding="utf-8")
+    (work_tree / "generated.py").write_text("", encoding="utf-8")
+    repo.index.add(["mod.py", "generated.py"])
+    gitignore_path = tmp_path / "custom.gitignore"
+    gitignore_path.write_text("generated.py\n", encoding="utf-8")
+
+    matcher = GitIgnoreMatcher(str(gitignore_path))
+    assert matcher.check_directory(str(work_tree)) == ["mod.py"]
+
+
+def test_walk_directory_prunes_ignored_directories(tmp_path, capsys):
+    for name in ["a", "b", "node_modules"]:
+        for sub in ["x", "y"]:
+            (tmp_path / name / sub).mkdir(parents=True)
+            (tmp_path / name / sub / "f.py").write_text("", encoding="utf-8")
+
+    matcher = GitIgnoreMatcher(use_git_index=False, max_workers=4)
+    matcher.patterns = ["node_modules/"]
+    matcher.compile_patterns()
+
+    scanned = []
+    scan_directory = matcher.scan_directory
+
+    def record(dir_path, rel_dir):
+        scanned.append(rel_dir)
+        return scan_directory(dir_path, rel_dir)
+
+    matcher.scan_directory = record
+    walker = matcher.walk_directory(str(tmp_path))
+    assert not isinstance(walker, list)
+
+    assert sorted(walker) == ["a/x/f.py", "a/y/f.py", "b/x/f.py", "b/y/f.py"]
+    assert not any(rel_dir.startswith("node_modules") for rel_dir in scanned)
+    assert capsys.readouterr().out == ""
+
+
+def test_nested_gitignore_and_info_exclude(tmp_path):
+    (tmp_path / ".git" / "info").mkdir(parents=True)
+    (tmp_path / ".git" / "info" / "exclude").write_text("*.tmp\n", encoding="utf-8")
+    (tmp_path / ".gitignore").write_text("*.log\n", encoding="utf-8")
+    (tmp_path / "pkg" / "vendor").mkdir(parents=True)
+    (tmp_path / "pkg" / ".gitignore").write_text(
+        "vendor/\n!keep.log\n", encoding="utf-8"
+    )
+    (tmp_path / "pkg" / "vendor" / "lib.py").write_text("", encoding="utf-8")
+    (tmp_path / "pkg" / "keep.log").write_text("", encoding="utf-8")
+    (tmp_path / "pkg" / "mod.py").write_text("", encoding="utf-8")
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "vendor").mkdir()
+    (tmp_path / "other" / "vendor" / "lib.py").write_text("", encoding="utf-8")
+    (tmp_path / "other" / "keep.log").write_text("", encoding="utf-8")
+    (tmp_path / "scratch.tmp").write_text("", encoding="utf-8")
+
+    matcher = GitIgnoreMatcher(use_git_index=False)
+    not_ignored = matcher.check_directory(str(tmp_path))
+
+    assert sorted(not_ignored) == [
+        ".gitignore",
+        "other/vendor/lib.py",
+        "pkg/.gitignore",
+        "pkg/keep.log",
+        "pkg/mod.py",
+    ]
+    assert matcher.is_ignored("pkg/vendor/lib.py", is_dir=False)
+    assert matcher.is_ignored("other/keep.log", is_dir=False)
+    assert not matcher.is_ignored("pkg/keep.log", is_dir=False)
+    assert matcher.is_ignored("scratch.tmp", is_dir=False)
+
+
+def test_bundled_template_without_gitignore(tmp_path):
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "main.cpython-310.pyc").write_text("", encoding="utf-8")
+    (tmp_path / "main.py").write_text("", encoding="utf-8")
+
+    matcher = GitIgnoreMatcher(use_git_index=False)
+    assert matcher.check_directory(str(tmp_path), "python") == ["main.py"]
+    assert matcher.rules is compile_rules(tuple(matcher.patterns))
+
+
+def test_custom_templates_dir(tmp_path):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "python.gitignore").write_text("*.gen.py\n", encoding="utf-8")
+    (templates_dir / "proto.gitignore").write_text("*.pb\n", encoding="utf-8")
+    assert find_template("Python", str(templates_dir)) == str(
+        templates_dir / "python.gitignore"
+    )
+    assert find_template("tree_sitter_python").endswith("python.gitignore")
+    assert find_template("cobol") is None
+
+    project = tmp_path / "project"
+    project.mkdir()
+    for name in ["a.gen.py", "b.py", "c.pb", "d.txt"]:
+        (project / name).write_text("", encoding="utf-8")
+    matcher = GitIgnoreMatcher(use_git_index=False, templates_dir=str(templates_dir))
+    not_ignored = matcher.check_directory(str(project), "python,proto")
+    assert sorted(not_ignored) == ["b.py", "d.txt"]
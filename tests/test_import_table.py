@@ -0,0 +1,83 @@
+# test_import_table.py
+import os
+from agent.file_map_with_call import FileMap
+from agent.import_table import ImportTable, ModuleIndex
+from agent.parser_registry import get_parser
+
+
+def build_table(source: str, package: str = "pkg.sub") -> ImportTable:
+    source_code = source.encode("utf-8")
+    tree = get_parser("python").parse(source_code)
+    table = ImportTable(package)
+    for node in tree.root_node.children:
+        table.add_import_node(node, source_code)
+    return table
+
+
+def test_resolve_bindings():
+    table = build_table(
+        "import os.path\n"
+        "import numpy as np\n"
+        "from collections import OrderedDict as OD, deque\n"
+        "from . import sibling\n"
+        "from ..util import helper as h\n"
+        "from ...outside import x\n"
+    )
+    assert table.resolve("os.path.join") == "os.path.join"
+    assert table.resolve("os.getcwd") == "os.getcwd"
+    assert table.resolve("np.linalg.norm") == "numpy.linalg.norm"
+    assert table.resolve("OD") == "collections.OrderedDict"
+    assert table.resolve("deque.append") == "collections.deque.append"
+    assert table.resolve("sibling.run") == "pkg.sub.sibling.run"
+    assert table.resolve("h") == "pkg.util.helper"
+    # Beyond the top-level package.
+    assert table.resolve("x") is None
+    assert table.resolve("print") is None
+
+
+def test_module_index():
+    index = ModuleIndex(
+        [
+            "src/pkg/__init__.py",
+            "src/pkg/util.py",
+            "src/pkg/sub/__init__.py",
+            "src/pkg/sub/mod.py",
+            "setup.py",
+        ]
+    )
+    sep = os.sep
+    assert index.module_name("src/pkg/sub/mod.py") == "pkg.sub.mod"
+    assert index.module_name("src/pkg/sub/__init__.py") == "pkg.sub"
+    assert index.module_name("setup.py") == "setup"
+    assert index.locate("pkg.util.helper") == f"src{sep}pkg{sep}util.py::helper"
+    assert index.locate("pkg.sub.mod.A.run") == f"src{sep}pkg{sep}sub{sep}mod.py::A.run"
+    assert index.locate("numpy.array") is None
+
+
+def test_call_graph_resolves_across_modules(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    files = {
+        "pkg/__init__.py": "",
+        "pkg/util.py": "def helper(x):\n    return x\n",
+        "pkg/sub/__init__.py": "",
+        "pkg/sub/mod.py": (
+            "import numpy as np\n"
+            "from ..util import helper as h\n"
+            "from pkg import util\n\n\n"
+            "def run():\n"
+            "    h(1)\n"
+            "    util.helper(2)\n"
+            "    np.zeros(3)\n"
+        ),
+    }
+    for path, source in files.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(source, encoding="utf-8")
+
+    file_map = FileMap([os.path.normpath(path) for path in files])
+    mod_path = os.path.normpath("pkg/sub/mod.py")
+    tree, source_code = file_map.parse_file(mod_path)
+    file_map.visit_node(tree.root_node, source_code, mod_path)
+
+    helper = f"{os.path.normpath('pkg/util.py')}::helper"
+    assert file_map.call_graph.callees(f"{mod_path}::run") == {helper, "numpy.zeros"}
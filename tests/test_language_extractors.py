@@ -0,0 +1,99 @@
+# test_language_extractors.py
+import pytest
+from agent.file_map import parse_file_data
+from agent.parser_registry import language_for_extension
+
+
+def parse(tmp_path, name, source):
+    path = tmp_path / name
+    path.write_text(source, encoding="utf-8")
+    return parse_file_data(str(path))
+
+
+def test_extensions_registered():
+    assert language_for_extension(".java") == "java"
+    assert language_for_extension(".jsx") == "javascript"
+    assert language_for_extension(".hpp") == "cpp"
+
+
+def test_java(tmp_path):
+    pytest.importorskip("tree_sitter_java")
+    data = parse(
+        tmp_path,
+        "Foo.java",
+        "package a.b;\n"
+        "import java.util.List;\n"
+        "@Ann\n"
+        "public class Foo extends Bar implements Baz {\n"
+        "  private int x = 1;\n"
+        "  // Runs it.\n"
+        "  public int run(int a,\n"
+        "                 String b) throws E { return a; }\n"
+        "  interface I { void m(); }\n"
+        "}\n",
+    )
+    assert [i.text for i in data.imports] == ["import java.util.List;"]
+    assert [t.text for t in data.top_level] == ["package a.b;"]
+    foo, inner = data.classes
+    assert foo.class_name == "Foo(Bar, Baz)"
+    assert [d.decorator_name for d in foo.class_decorators] == ["@Ann"]
+    assert [e.text for e in foo.expressions] == ["private int x = 1;"]
+    (run,) = foo.functions
+    assert (run.function_name, run.start_line, run.end_line) == ("run", 7, 8)
+    assert run.sketch == "// Runs it.\npublic int run(int a, String b) throws E"
+    assert inner.class_name == "Foo.I"
+    assert [f.function_name for f in inner.functions] == ["m"]
+
+
+def test_javascript(tmp_path):
+    pytest.importorskip("tree_sitter_javascript")
+    data = parse(
+        tmp_path,
+        "mod.js",
+        'import x from "./x";\n'
+        "export default class A extends B {\n"
+        "  static s = 1;\n"
+        "  async m(y = 1) { return y; }\n"
+        "}\n"
+        "/** Adds. */\n"
+        "function add(a, b) { return a + b; }\n"
+        "export const twice = (a) => a * 2;\n"
+        "console.log(add(1, 2));\n",
+    )
+    assert len(data.imports) == 1
+    (a,) = data.classes
+    assert a.class_name == "A(B)"
+    assert [f.sketch for f in a.functions] == ["async m(y = 1)"]
+    assert [f.function_name for f in data.functions] == ["add", "twice"]
+    assert data.functions[0].sketch == "/** Adds. */\nfunction add(a, b)"
+    assert [t.text for t in data.top_level] == ["console.log(add(1, 2));"]
+
+
+def test_cpp(tmp_path):
+    pytest.importorskip("tree_sitter_cpp")
+    data = parse(
+        tmp_path,
+        "a.hpp",
+        "#ifndef A_HPP\n"
+        "#define A_HPP\n"
+        "#include <vector>\n"
+        "namespace ns {\n"
+        "class A : public B {\n"
+        " public:\n"
+        "  int x;\n"
+        "  virtual int f(int a) const { return a; }\n"
+        "};\n"
+        "}\n"
+        "int A::g(int a) { return a; }\n"
+        "#endif\n",
+    )
+    (include,) = data.imports
+    assert (include.text, include.start_line, include.end_line) == (
+        "#include <vector>",
+        3,
+        3,
+    )
+    (a,) = data.classes
+    assert a.class_name == "A(B)"
+    assert [f.sketch for f in a.functions] == ["virtual int f(int a) const"]
+    assert [f.function_name for f in data.functions] == ["A::g"]
@@ -0,0 +1,42 @@
+# test_parser_registry.py
+import threading
+import tree_sitter_python
+from agent import parser_registry
+from agent.parser_registry import (
+    get_language,
+    get_parser,
+    language_for_extension,
+    register_language,
+)
+
+
+def test_languages_are_loaded_lazily_and_once(monkeypatch):
+    monkeypatch.setattr(parser_registry, "_LOADERS", dict(parser_registry._LOADERS))
+    monkeypatch.setattr(parser_registry, "_MODULES", dict(parser_registry._MODULES))
+    monkeypatch.setattr(
+        parser_registry, "_EXTENSIONS", dict(parser_registry._EXTENSIONS)
+    )
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return tree_sitter_python.language()
+
+    register_language("python-lazy", "tree_sitter_python_lazy", [".pyl"], loader)
+    assert calls == []
+    assert language_for_extension(".pyl") == "python-lazy"
+
+    assert get_language("python-lazy") is get_language("tree_sitter_python_lazy")
+    assert calls == [1]
+
+
+def test_parsers_are_reused_per_thread():
+    parser = get_parser("python")
+    assert get_parser("tree_sitter_python") is parser
+
+    other_parsers = []
+    thread = threading.Thread(target=lambda: other_parsers.append(get_parser("python")))
+    thread.start()
+    thread.join()
+    assert other_parsers[0] is not parser
+    assert get_parser("python").parse(b"x = 1\n").root_node.type == "module"
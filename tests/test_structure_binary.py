@@ -0,0 +1,86 @@
+# test_structure_binary.py
+import json
+from agent.file_map import MultiFileMap
+from agent.structure_binary import (
+    BinaryStructureStore,
+    export_json,
+    is_binary_structure,
+)
+from agent.structure_store import LazyStructureStore, open_structure
+from agent.structure_writer import read_structure_commit
+
+
+SOURCE = '''import os
+from typing import List
+
+VALUE = 1
+
+
+@dataclass
+class Example(Base):
+    name: str = "é"
+
+    @property
+    def method(self, a: int) -> List[int]:
+        """Docstring."""
+        return [a]
+
+
+def helper(x):
+    return x
+'''
+
+
+def build_structures(tmp_path):
+    file_paths = []
+    for i in range(3):
+        file_path = tmp_path / f"module_{i}.py"
+        file_path.write_text(SOURCE, encoding="utf-8")
+        file_paths.append(str(file_path))
+    json_path = tmp_path / "repo_structure.json"
+    binary_path = tmp_path / "repo_structure.bin"
+    MultiFileMap(file_paths, json_path).save()
+    MultiFileMap(file_paths, binary_path, output_format="binary").save()
+    return file_paths, json_path, binary_path
+
+
+def test_binary_round_trip(tmp_path):
+    file_paths, json_path, binary_path = build_structures(tmp_path)
+
+    assert is_binary_structure(binary_path)
+    assert not is_binary_structure(json_path)
+    with open_structure(json_path) as json_store:
+        assert isinstance(json_store, LazyStructureStore)
+        with open_structure(binary_path) as binary_store:
+            assert isinstance(binary_store, BinaryStructureStore)
+            assert list(binary_store) == file_paths
+            assert dict(binary_store) == dict(json_store)
+    assert binary_store.file.closed
+
+
+def test_binary_queries_and_json_export(tmp_path):
+    file_paths, json_path, binary_path = build_structures(tmp_path)
+    with BinaryStructureStore(binary_path) as store:
+        assert store.class_names(file_paths[0]) == ["Example(Base)"]
+        assert store.function_names(file_paths[0]) == ["helper"]
+        assert store.method_names(file_paths[0], "Example(Base)") == ["method"]
+        assert store.cache == {}
+
+    exported_path = tmp_path / "exported.json"
+    export_json(binary_path, exported_path)
+    assert json.loads(exported_path.read_text(encoding="utf-8")) == json.loads(
+        json_path.read_text(encoding="utf-8")
+    )
+
+
+def test_generating_commit_is_recorded(tmp_path):
+    file_paths, json_path, binary_path = build_structures(tmp_path)
+    assert read_structure_commit(binary_path) is None
+
+    for path, output_format in [(json_path, "json"), (binary_path, "binary")]:
+        MultiFileMap(
+            file_paths, path, output_format=output_format, commit="abc123"
+        ).save()
+        assert read_structure_commit(path) == "abc123"
+        with open_structure(path) as store:
+            assert list(store) == file_paths
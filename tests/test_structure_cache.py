@@ -0,0 +1,62 @@
+# test_structure_cache.py
+import os
+from agent.file_map import MultiFileMap, parse_file_data
+from agent.disk_cache import DiskCache
+from agent.structure_cache import StructureCache
+
+
+def test_parse_file_data_uses_cache(tmp_path, monkeypatch):
+    source_path = tmp_path / "module.py"
+    source_path.write_text("def foo(a):\n    return a\n", encoding="utf-8")
+    cache = StructureCache(tmp_path / "cache")
+
+    first = parse_file_data(str(source_path), cache)
+    assert (cache.stats.hits, cache.stats.misses) == (0, 1)
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("cached files must not be parsed")
+
+    monkeypatch.setattr("agent.file_map.SingleFileMap.parse_source", fail_parse)
+    second = parse_file_data(str(source_path), cache)
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert second == first
+
+
+def test_cache_key_changes_with_content(tmp_path):
+    cache = StructureCache(tmp_path)
+    key = cache.make_key(b"x = 1\n", "tree_sitter_python")
+    assert key == cache.make_key(b"x = 1\n", "tree_sitter_python")
+    assert key != cache.make_key(b"x = 2\n", "tree_sitter_python")
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=20)
+    for key in ("aa1", "bb2", "cc3"):
+        cache.put(key, b"0123456789")
+    os.utime(cache.entry_path("aa1"), (1, 1))
+    os.utime(cache.entry_path("bb2"), (2, 2))
+    cache.get("aa1")
+
+    assert cache.evict() == 1
+    assert cache.get("bb2") is None
+    assert cache.get("aa1") == b"0123456789"
+    assert cache.stats.evictions == 1
+
+
+def test_multi_file_map_parallel_with_cache(tmp_path):
+    file_paths = []
+    for i in range(4):
+        file_path = tmp_path / f"module_{i}.py"
+        file_path.write_text(f"def f{i}():\n    pass\n", encoding="utf-8")
+        file_paths.append(str(file_path))
+    cache = StructureCache(tmp_path / "cache")
+
+    MultiFileMap(
+        file_paths, tmp_path / "a.json", workers=2, chunk_size=1, cache=cache
+    ).save()
+    assert (cache.stats.hits, cache.stats.misses) == (0, 4)
+    MultiFileMap(
+        file_paths, tmp_path / "b.json", workers=2, chunk_size=1, cache=cache
+    ).save()
+    assert (cache.stats.hits, cache.stats.misses) == (4, 4)
+    assert (tmp_path / "a.json").read_bytes() == (tmp_path / "b.json").read_bytes()
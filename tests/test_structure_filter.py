@@ -0,0 +1,118 @@
+# test_structure_filter.py
+from agent.schemas import (
+    AttributeInfo,
+    CallInfo,
+    ClassInfo,
+    DecoratorInfo,
+    FileData,
+    FilesEdit,
+    FunctionInfo,
+    ParameterInfo,
+    TopLevelInfo,
+)
+from agent.structure_filter import IntervalIndex, StructureFilter
+
+
+def function(name, start_line, end_line):
+    return FunctionInfo(
+        function_name=name,
+        sketch=f"def {name}()",
+        start_line=start_line,
+        end_line=end_line,
+        text="\n".join(f"line {i}" for i in range(start_line, end_line + 1)),
+    )
+
+
+FILE_DATA = FileData(
+    top_level=[TopLevelInfo(start_line=1, end_line=1, text="x = 1")],
+    classes=[
+        ClassInfo(
+            class_name="A",
+            start_line=3,
+            end_line=10,
+            functions=[function("a1", 4, 6), function("a2", 8, 10)],
+        ),
+        ClassInfo(class_name="B", start_line=12, end_line=14),
+    ],
+    functions=[function("f", 16, 20)],
+)
+
+
+def files_edit(*ranges):
+    return FilesEdit.model_validate(
+        {
+            "files": [
+                {
+                    "file_name": "m.py",
+                    "edits": [
+                        {"line_numbers": {"start_line": start, "end_line": end}}
+                        for start, end in ranges
+                    ],
+                }
+            ]
+        }
+    )
+
+
+def test_interval_index_find():
+    index = IntervalIndex(FILE_DATA.classes[0].functions)
+    assert index.find(3) is None
+    assert index.find(4) == 0
+    assert index.find(7) is None
+    assert index.find(10) == 1
+    assert IntervalIndex([]).find(1) is None
+
+
+def test_filter_structure_from_issues():
+    structure_filter = StructureFilter({"m.py": FILE_DATA})
+
+    result = structure_filter.filter_structure_from_issues(
+        files_edit((5, 6), (8, 10), (13, 13), (17, 18), (1, 1), (22, 22))
+    )["m.py"]
+
+    assert [cls.class_name for cls in result.classes] == ["A", "B"]
+    a1, a2 = result.classes[0].functions
+    assert (a1.trimmed_code_start_line, a1.text) == (5, "def a1()\nline 5\nline 6")
+    assert a2 is FILE_DATA.classes[0].functions[1]
+    assert result.classes[1].functions == []
+    assert result.functions[0].text == "def f()\nline 17\nline 18"
+    assert result.top_level == FILE_DATA.top_level
+    assert list(structure_filter.interval_indexes) == ["m.py"]
+
+
+def test_filters_keep_extracted_fields():
+    method = function("run", 4, 6).model_copy(
+        update={
+            "parameters": [ParameterInfo(name="self")],
+            "return_type": "int",
+            "is_async": True,
+            "decorators": [
+                DecoratorInfo(start_line=3, end_line=3, decorator_name="cached")
+            ],
+        }
+    )
+    cls = ClassInfo(
+        class_name="A",
+        start_line=2,
+        end_line=6,
+        functions=[method],
+        attributes=[AttributeInfo(start_line=3, end_line=3, name="x", value="1")],
+    )
+    calls = [CallInfo(start_line=5, end_line=5, caller="A.run", callee="helper")]
+    file_data = FileData(classes=[cls], calls=calls)
+    structure_filter = StructureFilter({"m.py": file_data})
+
+    assert structure_filter.filter_classes(file_data, ["A"]).calls == calls
+    assert structure_filter.filter_functions(cls, ["run"]).attributes == cls.attributes
+
+    result = structure_filter.filter_structure_from_issues(files_edit((5, 5)))["m.py"]
+    assert result.calls == calls
+    assert result.classes[0].attributes == cls.attributes
+    trimmed = result.classes[0].functions[0]
+    assert trimmed.text == "def run()\nline 5"
+    assert (trimmed.parameters, trimmed.return_type, trimmed.is_async) == (
+        method.parameters,
+        "int",
+        True,
+    )
+    assert trimmed.decorators == method.decorators
@@ -0,0 +1,59 @@
+# test_structure_store.py
+import json
+import os
+from agent.schemas import ClassInfo, FileData
+from agent.structure_store import LazyStructureStore, scan_offsets
+from agent.structure_writer import JsonStructureWriter, index_path
+
+
+STRUCTURE = {
+    f"pkg/module_{i}.py": FileData(
+        classes=[ClassInfo(class_name=f"C{i}", start_line=1, end_line=3)]
+    )
+    for i in range(3)
+}
+
+
+def write_structure(path, indent=2):
+    with JsonStructureWriter(path, indent=indent) as writer:
+        for file_path, file_data in STRUCTURE.items():
+            writer.write(file_path, file_data)
+
+
+def test_entries_are_parsed_on_first_access(tmp_path, monkeypatch):
+    path = tmp_path / "repo_structure.json"
+    write_structure(path)
+    with LazyStructureStore(path) as store:
+        assert list(store) == list(STRUCTURE)
+        assert "pkg/module_1.py" in store and "missing.py" not in store
+        assert store.cache == {}
+
+        assert store["pkg/module_1.py"] == STRUCTURE["pkg/module_1.py"]
+        assert store.get("missing.py") is None
+        assert list(store.cache) == ["pkg/module_1.py"]
+        assert store["pkg/module_1.py"] is store["pkg/module_1.py"]
+    assert store.file.closed
+
+
+def test_stale_index_is_rebuilt(tmp_path):
+    path = tmp_path / "repo_structure.json"
+    write_structure(path, indent=None)
+    # Rewritten by another tool, the sidecar index no longer matches.
+    path.write_text(
+        json.dumps({k: v.model_dump() for k, v in STRUCTURE.items()}, indent=4),
+        encoding="utf-8",
+    )
+    os.utime(path, ns=(1, 1))
+
+    with LazyStructureStore(path) as store:
+        assert dict(store) == STRUCTURE
+    index = json.loads(index_path(path).read_text(encoding="utf-8"))
+    assert index["mtime_ns"] == 1
+
+
+def test_scan_offsets_handles_escaped_strings():
+    data = json.dumps({'a"{': {"text": 'x\\"}]'}, "b": {"n": [1, {"m": 2}]}}).encode()
+    offsets = scan_offsets(data)
+    assert list(offsets) == ['a"{', "b"]
+    start, end = offsets["b"]
+    assert json.loads(data[start:end]) == {"n": [1, {"m": 2}]}
@@ -0,0 +1,162 @@
+# test_structure_updater.py
+import json
+from git import Repo
+from agent.file_map import MultiFileMap
+from agent.gitignore_matcher import GitIgnoreMatcher
+from agent.structure_updater import (
+    get_changed_paths,
+    sync_repo_structure,
+    update_repo_structure,
+)
+from agent.structure_writer import read_structure_commit
+
+
+def commit_files(repo, files, message):
+    for path, content in files.items():
+        file_path = repo.working_dir + "/" + path
+        if content is None:
+            repo.index.remove([path], working_tree=True)
+        else:
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            repo.index.add([path])
+    return repo.index.commit(message).hexsha
+
+
+def test_update_repo_structure_matches_full_rebuild(tmp_path):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    repo = Repo.init(repo_dir)
+    base = commit_files(
+        repo,
+        {
+            "keep.py": "def keep():\n    pass\n",
+            "change.py": "def old():\n    pass\n",
+            "remove.py": "class Gone:\n    pass\n",
+            "rename.py": "def moved():\n    return 1\n" * 5,
+        },
+        "base",
+    )
+    repo.git.mv("rename.py", "renamed.py")
+    target = commit_files(
+        repo,
+        {
+            "change.py": "def new():\n    pass\n",
+            "remove.py": None,
+            "added.py": "def added():\n    pass\n",
+            "notes.txt": "not parsed\n",
+            "app.js": "function app() {}\n",
+            "lib.h": "int lib(void);\n",
+        },
+        "target",
+    )
+
+    updated, deleted = get_changed_paths(repo, base, target)
+    assert sorted(updated) == [
+        "added.py",
+        "app.js",
+        "change.py",
+        "lib.h",
+        "notes.txt",
+        "renamed.py",
+    ]
+    assert sorted(deleted) == ["remove.py", "rename.py"]
+
+    prefix = str(repo_dir)
+    structure_path = tmp_path / "repo_structure.json"
+    repo.git.checkout(base)
+    base_files = ["keep.py", "change.py", "remove.py", "rename.py"]
+    MultiFileMap([f"{prefix}/{path}" for path in base_files], structure_path).save()
+
+    diff = update_repo_structure(structure_path, prefix, base, target)
+    assert sorted(diff.deleted) == [f"{prefix}/remove.py", f"{prefix}/rename.py"]
+    assert len(diff.updated) == 3
+
+    repo.git.checkout(target)
+    expected_path = tmp_path / "expected.json"
+    target_files = ["keep.py", "change.py", "renamed.py", "added.py"]
+    MultiFileMap([f"{prefix}/{path}" for path in target_files], expected_path).save()
+
+    assert json.loads(structure_path.read_text(encoding="utf-8")) == json.loads(
+        expected_path.read_text(encoding="utf-8")
+    )
+    assert structure_path.read_text(encoding="utf-8").startswith('{\n  "')
+    assert read_structure_commit(structure_path) == target
+
+
+def test_update_repo_structure_applies_build_filter(tmp_path):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    repo = Repo.init(repo_dir)
+    base = commit_files(
+        repo,
+        {".gitignore": "generated/\n", "keep.py": "def keep():\n    pass\n"},
+        "base",
+    )
+    (repo_dir / "generated").mkdir()
+    target = commit_files(
+        repo,
+        {
+            "generated/out.py": "def out():\n    pass\n",
+            "added.py": "def added():\n    pass\n",
+        },
+        "target",
+    )
+
+    prefix = str(repo_dir)
+    structure_path = tmp_path / "repo_structure.json"
+    MultiFileMap([f"{prefix}/keep.py"], structure_path, indent=None).save()
+
+    matcher = GitIgnoreMatcher(use_git_index=False)
+    diff = update_repo_structure(structure_path, prefix, base, target, matcher=matcher)
+    assert diff.updated == [f"{prefix}/added.py"]
+
+    # The full build lists the same files, and the compact layout is kept.
+    files = [
+        f"{prefix}/{path}"
+        for path in GitIgnoreMatcher(use_git_index=False).check_directory(prefix)
+        if path.endswith(".py")
+    ]
+    expected_path = tmp_path / "expected.json"
+    MultiFileMap(files, expected_path, indent=None).save()
+    assert json.loads(structure_path.read_text(encoding="utf-8")) == json.loads(
+        expected_path.read_text(encoding="utf-8")
+    )
+    assert structure_path.read_text(encoding="utf-8").startswith('{"')
+
+
+def test_sync_repo_structure_checks_generating_commit(tmp_path):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    repo = Repo.init(repo_dir)
+    first = commit_files(repo, {"a.py": "def a():\n    pass\n"}, "first")
+    base = commit_files(repo, {"b.py": "def b():\n    pass\n"}, "base")
+    target = commit_files(repo, {"c.py": "def c():\n    pass\n"}, "target")
+    prefix = str(repo_dir)
+
+    def build_at(commit, path, record):
+        repo.git.checkout(commit)
+        files = sorted(
+            f"{prefix}/{name}" for name in repo.git.ls_files().split() if name
+        )
+        MultiFileMap(files, path, commit=commit if record else None).save()
+        repo.git.checkout(target)
+
+    expected_path = tmp_path / "expected.json"
+    build_at(target, expected_path, True)
+    expected = json.loads(expected_path.read_text(encoding="utf-8"))
+
+    # Generated at base: patched incrementally.
+    structure_path = tmp_path / "at_base.json"
+    build_at(base, structure_path, True)
+    diff = sync_repo_structure(structure_path, prefix, base, target)
+    assert diff is not None and diff.updated == [f"{prefix}/c.py"]
+    assert json.loads(structure_path.read_text(encoding="utf-8")) == expected
+
+    # Generated at another commit, or at an unknown one: rebuilt.
+    for name, record in [("at_first.json", True), ("unknown.json", False)]:
+        structure_path = tmp_path / name
+        build_at(first, structure_path, record)
+        assert sync_repo_structure(structure_path, prefix, base, target) is None
+        assert json.loads(structure_path.read_text(encoding="utf-8")) == expected
+        assert read_structure_commit(structure_path) == target
@@ -0,0 +1,60 @@
+# test_structure_writer.py
+import json
+import pytest
+from agent.schemas import FileData, FunctionInfo
+from agent.structure_writer import JsonStructureWriter
+
+
+STRUCTURE = {
+    "a.py": FileData(
+        functions=[
+            FunctionInfo(
+                function_name="f",
+                sketch="def f()",
+                start_line=1,
+                end_line=2,
+                text='def f():\n    return "é"',
+            )
+        ]
+    ),
+    "b.py": FileData(),
+}
+
+
+def test_indented_output_matches_json_dumps(tmp_path):
+    output_path = tmp_path / "repo_structure.json"
+    with JsonStructureWriter(output_path) as writer:
+        for file_path, file_data in STRUCTURE.items():
+            writer.write(file_path, file_data)
+
+    expected = json.dumps(
+        {k: v.model_dump() for k, v in STRUCTURE.items()}, ensure_ascii=False, indent=2
+    )
+    assert output_path.read_text(encoding="utf-8") == expected
+
+
+def test_compact_and_empty_output(tmp_path):
+    output_path = tmp_path / "compact.json"
+    with JsonStructureWriter(output_path, indent=None) as writer:
+        for file_path, file_data in STRUCTURE.items():
+            writer.write(file_path, file_data)
+    content = output_path.read_text(encoding="utf-8")
+    assert "\n" not in content.replace("\\n", "")
+    assert json.loads(content)["a.py"] == STRUCTURE["a.py"].model_dump()
+
+    with JsonStructureWriter(output_path):
+        pass
+    assert json.loads(output_path.read_text(encoding="utf-8")) == {}
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    output_path = tmp_path / "repo_structure.json"
+    output_path.write_text("{}", encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with JsonStructureWriter(output_path) as writer:
+            writer.write("a.py", STRUCTURE["a.py"])
+            raise RuntimeError("parse error")
+
+    assert output_path.read_text(encoding="utf-8") == "{}"
+    assert list(tmp_path.iterdir()) == [output_path]
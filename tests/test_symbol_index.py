@@ -0,0 +1,73 @@
+# test_symbol_index.py
+from agent.file_map import MultiFileMap
+from agent.repo_structure_processor import RepoStructureProcessor
+from agent.structure_store import open_structure
+from agent.symbol_index import SymbolIndex
+
+
+SOURCE = """class Runner(Base):
+    def run(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+def main():
+    pass
+"""
+
+
+def build_structure(tmp_path, output_format="json"):
+    package = tmp_path / "repo" / "pkg"
+    package.mkdir(parents=True)
+    (package / "runner.py").write_text(SOURCE, encoding="utf-8")
+    (package / "other.py").write_text("def main():\n    pass\n", encoding="utf-8")
+    structure_path = tmp_path / f"repo_structure.{output_format}"
+    file_paths = [str(package / "runner.py"), str(package / "other.py")]
+    MultiFileMap(file_paths, structure_path, output_format=output_format).save()
+    return structure_path, file_paths
+
+
+def test_symbol_lookups(tmp_path):
+    for output_format in ("json", "binary"):
+        structure_path, (runner_path, other_path) = build_structure(
+            tmp_path / output_format, output_format
+        )
+        with open_structure(structure_path) as store:
+            index = SymbolIndex(store)
+
+            assert index.get_class(runner_path, "Runner").class_name == "Runner(Base)"
+            assert index.get_method(runner_path, "Runner(Base)", "stop").start_line == 5
+            assert index.lookup(f"{runner_path}::Runner.run").function_name == "run"
+            assert index.lookup(f"{other_path}::main").start_line == 1
+            assert index.find("Runner.run") == [f"{runner_path}::Runner.run"]
+            assert sorted(index.find("main")) == sorted(
+                [f"{runner_path}::main", f"{other_path}::main"]
+            )
+            assert index.resolve_file("pkg/runner.py") == runner_path
+            assert index.resolve_file("wrong/path.py", ["Runner"]) == runner_path
+            assert index.resolve_file("wrong/path.py") is None
+
+
+def test_extract_class_methods_resolves_wrong_path(tmp_path):
+    structure_path, (runner_path, _) = build_structure(tmp_path)
+    with RepoStructureProcessor(structure_path) as processor:
+        results = processor.extract_class_methods(
+            {
+                "runner.py": {
+                    "classes": [
+                        {
+                            "class_name": "Runner",
+                            "functions": [{"function_name": "stop"}],
+                        }
+                    ]
+                }
+            }
+        )
+
+        assert list(results) == [runner_path]
+        (runner,) = results[runner_path].classes
+        assert [func.function_name for func in runner.functions] == ["stop"]
+        # The loaded structure itself is left untouched.
+        assert len(processor.repo_structure[runner_path].classes[0].functions) == 2
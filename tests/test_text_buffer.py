@@ -0,0 +1,52 @@
+# test_text_buffer.py
+import random
+import pytest
+from agent.text_buffer import PieceTable
+
+
+def test_edits_match_str_reference():
+    rng = random.Random(0)
+    alphabet = "ab\nü👋 x\n"
+    text = "".join(rng.choice(alphabet) for _ in range(2000))
+    buffer = PieceTable(text.encode("utf-8"))
+
+    for _ in range(500):
+        start = rng.randint(0, len(text))
+        end = rng.randint(start, min(len(text), start + 10))
+        code = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 6)))
+        start_byte = buffer.char_to_byte(start)
+        end_byte = buffer.char_to_byte(end)
+        assert start_byte == len(text[:start].encode("utf-8"))
+        buffer.replace(start_byte, end_byte, code.encode("utf-8"))
+        text = text[:start] + code + text[end:]
+
+        data = text.encode("utf-8")
+        assert buffer.read() == data
+        assert len(buffer) == len(data)
+        assert buffer.char_length == len(text)
+        assert buffer.line_count == text.count("\n") + 1
+
+        byte = rng.randint(0, len(data))
+        row = data[:byte].count(b"\n")
+        column = byte - (data.rfind(b"\n", 0, byte) + 1)
+        assert buffer.byte_to_point(byte) == (row, column)
+        assert buffer.point_to_byte((row, column)) == byte
+        end_byte = rng.randint(byte, len(data))
+        assert buffer.read(byte, end_byte) == data[byte:end_byte]
+        chunk = buffer.read_chunk(byte)
+        assert data[byte:].startswith(chunk)
+        assert bool(chunk) == (byte < len(data))
+
+
+def test_lines_and_bounds():
+    buffer = PieceTable(b"one\ntwo\n")
+    buffer.insert(4, "zwei\n".encode("utf-8"))
+    buffer.delete(0, 4)
+    assert str(buffer) == "zwei\ntwo\n"
+    assert [buffer.line_to_byte(row) for row in range(buffer.line_count)] == [0, 5, 9]
+    with pytest.raises(IndexError):
+        buffer.line_to_byte(3)
+    with pytest.raises(IndexError):
+        buffer.byte_to_point(10)
+    with pytest.raises(ValueError):
+        buffer.replace(3, 2, b"")
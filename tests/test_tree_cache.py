@@ -0,0 +1,34 @@
+# test_tree_cache.py
+from agent.directory_tree_printer import DirectoryTreePrinter, default_score
+from agent.tree_cache import TreeStringCache
+
+FILES = ["pkg/a.py", "pkg/b.py", "main.py", "README.md"]
+
+
+def test_generate_tree_string_uses_cache(tmp_path, monkeypatch):
+    cache = TreeStringCache(tmp_path / "cache")
+    printer = DirectoryTreePrinter("/tmp/repo", cache=cache)
+    first = printer.generate_tree_string(FILES)
+    assert (cache.stats.hits, cache.stats.misses) == (0, 1)
+
+    def fail_render(*args, **kwargs):
+        raise AssertionError("cached trees must not be rendered")
+
+    monkeypatch.setattr(DirectoryTreePrinter, "iter_path_lines", fail_render)
+    # Another printer sharing the cache directory, with the files in another order.
+    other = DirectoryTreePrinter("/tmp/repo", cache=TreeStringCache(tmp_path / "cache"))
+    assert other.generate_tree_string(list(reversed(FILES)) + ["docs.txt"]) == first
+    assert other.cache.stats.hits == 1
+
+
+def test_cache_key_covers_options(tmp_path):
+    cache = TreeStringCache(tmp_path)
+    paths = [("main.py",), ("pkg", "a.py")]
+    key = cache.make_key("/tmp/repo", "python", paths)
+    assert key == cache.make_key("/tmp/repo", "python", list(paths))
+    assert key != cache.make_key("/tmp/repo", "python", paths[:1])
+    assert key != cache.make_key("/tmp/other", "python", paths)
+    assert key != cache.make_key("/tmp/repo", "java", paths)
+    assert key != cache.make_key("/tmp/repo", "python", paths, budget=1000)
+    assert key != cache.make_key("/tmp/repo", "python", paths, score=default_score)
+    assert cache.make_key("/tmp/repo", "python", paths, score=lambda node: 0) is None